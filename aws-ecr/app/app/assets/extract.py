@@ -2,38 +2,84 @@ import os
 import requests
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from .rate_limit import MarketStackError, RateLimiter
 
 # Loading environment variables
 load_dotenv()
 api_key = os.getenv("API_KEY")
 
-def extract_stock_data(api_key: str) -> pd.DataFrame:
+MARKETSTACK_BASE_URL = "https://api.marketstack.com/v1"
+DEFAULT_SYMBOLS = "AAPL,AMZN,GOOGL,MSFT,NFLX"
+
+def build_eod_params(api_key: str, symbols: str = DEFAULT_SYMBOLS, date_from: str = "2021-01-01",
+                     date_to: str = None, limit: int = 5000) -> dict:
     """
-    Extracts stock data from MarketStack API and returns a DataFrame.
+    Builds the MarketStack EOD query parameters. The offset is set per page.
     """
-    api_url = "https://api.marketstack.com/v1/eod"
-
-    params = {
+    return {
         "access_key": api_key,
-        "symbols": "AAPL,AMZN,GOOGL,MSFT,NFLX",
+        "symbols": symbols,
         "sort": "DESC",
-        "date_from": "2021-01-01",
-        "date_to": datetime.today().strftime("%Y-%m-%d"),
-        "limit": 5000,
-        "offset": 0
+        "date_from": date_from,
+        "date_to": date_to or datetime.today().strftime("%Y-%m-%d"),
+        "limit": limit,
     }
 
-    response = requests.get(api_url, params=params)
+def page_offsets(total: int, limit: int) -> list:
+    """
+    Returns the offsets of every page after the first one.
+    """
+    return list(range(limit, total, limit))
 
-    if response.status_code == 200:
-        data = response.json()
-        df = pd.json_normalize(data['data'])
-        print("Data extraction completed successfully.")
-        return df
-    else:
-        print(f"Error: {response.status_code} - {response.text}")
-        return pd.DataFrame()
+def fetch_eod_page(session: requests.Session, params: dict, offset: int, rate_limiter: RateLimiter) -> dict:
+    """
+    Fetches one EOD page and returns the JSON body.
+    The page goes through the shared rate limiter and is retried on 429/5xx and connection errors.
+    Raises MarketStackError when the page cannot be fetched.
+    """
+    url = os.getenv("MARKETSTACK_BASE_URL", MARKETSTACK_BASE_URL).rstrip("/") + "/eod"
+
+    def send():
+        response = session.get(url, params={**params, "offset": offset})
+        rate_limiter.received(len(response.content))
+        body = response.json() if response.status_code == 200 else response.text
+        return response.status_code, response.headers, body
+
+    return rate_limiter.call(send, retry_exceptions=(requests.ConnectionError, requests.Timeout))
+
+def extract_stock_data_paginated(api_key: str, symbols: str = DEFAULT_SYMBOLS, date_from: str = "2021-01-01",
+                                 date_to: str = None, limit: int = 5000, max_workers: int = 4,
+                                 session: requests.Session = None, rate_limiter: RateLimiter = None) -> pd.DataFrame:
+    """
+    Extracts every page of stock data from MarketStack and returns a DataFrame.
+    The first page gives pagination.total; the remaining pages are fetched on a bounded
+    thread pool and merged in offset order.
+    Raises MarketStackError if any page fails after retries, so a partial history is never loaded.
+    """
+    params = build_eod_params(api_key, symbols=symbols, date_from=date_from, date_to=date_to, limit=limit)
+    session = session or requests.Session()
+    rate_limiter = rate_limiter or RateLimiter.from_env()
+
+    first_page = fetch_eod_page(session, params, 0, rate_limiter)
+    offsets = page_offsets(first_page.get("pagination", {}).get("total", 0), limit)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        pages = list(executor.map(lambda offset: fetch_eod_page(session, params, offset, rate_limiter), offsets))
+
+    records = list(first_page["data"])
+    for page in pages:
+        records.extend(page["data"])
+
+    df = pd.json_normalize(records)
+    print(f"Data extraction completed successfully. ({len(offsets) + 1} pages, {len(df)} rows)")
+    return df
+
+def extract_stock_data(api_key: str) -> pd.DataFrame:
+    """
+    Extracts stock data from MarketStack API and returns a DataFrame.
+    """
+    return extract_stock_data_paginated(api_key)
 
 def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -0,0 +1,160 @@
+# --------------------
+# Import Statements
+# --------------------
+import asyncio
+import aiohttp
+import pandas as pd
+from assets.extract_transform import (
+    DEFAULT_SYMBOLS,
+    build_eod_params,
+    coerce_page,
+    incremental_date_from,
+    marketstack_eod_url,
+    normalize_eod_records,
+    page_offsets,
+)
+from assets.rate_limit import RateLimiter
+from assets.response_cache import ResponseCache
+from assets.decode import EodColumns, decode_eod_page
+
+# --------------------
+# Async Extract Engine
+# --------------------
+async def fetch_eod_page_async(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    rate_limiter: RateLimiter,
+    params: dict,
+    offset: int,
+    response_cache: ResponseCache = None,
+    raw: bool = False,
+):
+    """
+    Fetches a single page of the EOD endpoint on the shared session (undecoded text when `raw`).
+    The semaphore caps the number of requests in flight across every symbol;
+    the rate limiter spaces them out and retries the page on 429/5xx.
+    Response cache lookups and writes run in worker threads, so they never block the event loop.
+    """
+    query = {key: str(value) for key, value in params.items()}
+    query["offset"] = str(offset)
+    url = marketstack_eod_url()
+    # Cache reads and writes are blocking disk I/O (gzip, atomic replace), so they run on the default executor
+    if response_cache is not None:
+        cached_page = await asyncio.to_thread(response_cache.get, url, query)
+        if cached_page is not None:
+            return coerce_page(cached_page, raw)
+
+    async def send():
+        async with semaphore:
+            async with session.get(url, params=query) as response:
+                rate_limiter.received(len(await response.read()))
+                body = await response.json() if response.status == 200 and not raw else await response.text()
+                return response.status, response.headers, body
+
+    page = await rate_limiter.call_async(send, retry_exceptions=(aiohttp.ClientConnectionError, asyncio.TimeoutError))
+    if response_cache is not None:
+        await asyncio.to_thread(response_cache.put, url, query, page)
+    return page
+
+
+async def fetch_symbol_records(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    rate_limiter: RateLimiter,
+    params: dict,
+    response_cache: ResponseCache = None,
+    columnar: bool = False,
+):
+    """
+    Fetches every page for one symbol: the first page for pagination.total,
+    then the remaining offsets concurrently. Records are returned in offset order,
+    as a list of dicts or, with `columnar` set, as stream-decoded EodColumns.
+    """
+    async def fetch(offset):
+        page = await fetch_eod_page_async(session, semaphore, rate_limiter, params, offset, response_cache, columnar)
+        return decode_eod_page(page) if columnar else page
+
+    first_page = await fetch(0)
+    pagination = first_page[0] if columnar else first_page.get("pagination", {})
+    offsets = page_offsets(pagination.get("total", 0), params["limit"])
+    pages = await asyncio.gather(*(fetch(offset) for offset in offsets))
+
+    if columnar:
+        columns = EodColumns()
+        for _, page_columns in [first_page] + list(pages):
+            columns.extend(page_columns)
+        return columns
+
+    records = list(first_page["data"])
+    for page in pages:
+        records.extend(page["data"])
+    return records
+
+
+async def extract_stock_data_async(
+    api_key: str,
+    symbols: str = DEFAULT_SYMBOLS,
+    date_from: str = "2021-01-01",
+    date_to: str = None,
+    limit: int = 1000,
+    concurrency: int = 8,
+    watermarks: dict = None,
+    overlap_days: int = 3,
+    rate_limiter: RateLimiter = None,
+    response_cache: ResponseCache = None,
+    columnar: bool = False,
+) -> pd.DataFrame:
+    """
+    Extracts stock data from MarketStack with one request fan-out per symbol and page.
+    - All requests share one keep-alive connection pool of `concurrency` connections
+    - Passing `watermarks` ({symbol: max(date)}) switches to incremental start dates
+    - Pages found in `response_cache` are not requested again
+    - `columnar` stream-decodes pages into typed column buffers instead of pd.json_normalize
+    Returns the same columns as extract_stock_data, grouped by symbol in the order given.
+    Raises MarketStackError if any page fails after retries.
+    """
+    if watermarks is None:
+        date_from_by_symbol = {symbol: date_from for symbol in symbols.split(",")}
+    else:
+        date_from_by_symbol = {
+            symbol: group_date_from
+            for group_date_from, group in incremental_date_from(symbols, watermarks, overlap_days, date_from).items()
+            for symbol in group.split(",")
+        }
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    connector = aiohttp.TCPConnector(limit=max(1, concurrency))
+    rate_limiter = rate_limiter or RateLimiter.from_env()
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        per_symbol_records = await asyncio.gather(
+            *(
+                fetch_symbol_records(
+                    session,
+                    semaphore,
+                    rate_limiter,
+                    build_eod_params(api_key, symbols=symbol, date_from=symbol_date_from, date_to=date_to, limit=limit),
+                    response_cache,
+                    columnar,
+                )
+                for symbol, symbol_date_from in date_from_by_symbol.items()
+            )
+        )
+
+    if columnar:
+        columns = EodColumns()
+        for symbol_columns in per_symbol_records:
+            columns.extend(symbol_columns)
+        df = columns.to_dataframe()
+    else:
+        records = [record for symbol_records in per_symbol_records for record in symbol_records]
+        df = normalize_eod_records(records)
+    print(f"Async data extraction completed successfully. ({len(date_from_by_symbol)} symbols, {len(df)} rows)")
+    return df
+
+
+def extract_stock_data_concurrent(api_key: str, **kwargs) -> pd.DataFrame:
+    """
+    Synchronous wrapper around extract_stock_data_async, usable wherever extract_stock_data is.
+    """
+    return asyncio.run(extract_stock_data_async(api_key, **kwargs))
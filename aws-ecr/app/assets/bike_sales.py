@@ -0,0 +1,60 @@
+# --------------------
+# Import Statements
+# --------------------
+import pyarrow as pa
+import pyarrow.csv as pv
+
+# Bytes of CSV parsed per block; each block becomes one RecordBatch
+CSV_BLOCK_SIZE = 4 * 1024 * 1024
+
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# CSV header -> (column name, Arrow type). Low-cardinality text columns are dictionary-encoded.
+BIKE_SALES_COLUMNS = {
+    "State": ("state", _CATEGORY),
+    "Avg Daily Distance (km)": ("avg_daily_distance_km", pa.float64()),
+    "Brand": ("brand", _CATEGORY),
+    "Model": ("model", _CATEGORY),
+    "Price (INR)": ("price_inr", pa.int64()),
+    "Year of Manufacture": ("year_of_manufacture", pa.int16()),
+    "Engine Capacity (cc)": ("engine_capacity_cc", pa.int32()),
+    "Fuel Type": ("fuel_type", _CATEGORY),
+    "Mileage (km/l)": ("mileage_km_l", pa.float64()),
+    "Owner Type": ("owner_type", _CATEGORY),
+    "Registration Year": ("registration_year", pa.int16()),
+    "Insurance Status": ("insurance_status", _CATEGORY),
+    "Seller Type": ("seller_type", _CATEGORY),
+    "Resale Price (INR)": ("resale_price_inr", pa.float64()),
+    "City Tier": ("city_tier", _CATEGORY),
+}
+
+BIKE_SALES_SCHEMA = pa.schema([pa.field(name, arrow_type) for name, arrow_type in BIKE_SALES_COLUMNS.values()])
+
+
+# --------------------
+# Extract and Type the CSV
+# --------------------
+def read_bike_sales_batches(path: str, block_size: int = CSV_BLOCK_SIZE):
+    """
+    Streams bike_sales_india.csv as typed RecordBatches of BIKE_SALES_SCHEMA, one per CSV block.
+    - Parsing and conversion run on Arrow's thread pool; only one block is held in memory at a time
+    - Column types come from BIKE_SALES_COLUMNS instead of being inferred from the first rows
+    - Headers are renamed to snake_case column names
+    Raises ValueError if the CSV header does not match BIKE_SALES_COLUMNS.
+    """
+    reader = pv.open_csv(
+        path,
+        read_options=pv.ReadOptions(use_threads=True, block_size=block_size),
+        convert_options=pv.ConvertOptions(
+            column_types={header: arrow_type for header, (_, arrow_type) in BIKE_SALES_COLUMNS.items()},
+            strings_can_be_null=True,
+        ),
+    )
+    missing = set(BIKE_SALES_COLUMNS) - set(reader.schema.names)
+    if missing:
+        raise ValueError(f"{path} is missing column(s): {', '.join(sorted(missing))}")
+
+    for batch in reader:
+        yield pa.RecordBatch.from_arrays(
+            [batch.column(header) for header in BIKE_SALES_COLUMNS], schema=BIKE_SALES_SCHEMA
+        )
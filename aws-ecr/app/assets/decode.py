@@ -0,0 +1,150 @@
+# --------------------
+# Import Statements
+# --------------------
+import json
+import re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# The only MarketStack fields transform_data keeps
+FLOAT_FIELDS = ("open", "close", "volume", "dividend")
+STRING_FIELDS = ("symbol", "exchange", "date")
+EOD_COLUMNS = ["open", "close", "volume", "dividend", "symbol", "exchange", "date"]
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_WHITESPACE_CHARS = " \t\n\r"
+
+# Records are decoded in chunks so only CHUNK_ROWS dicts are alive at a time
+CHUNK_ROWS = 4096
+
+
+# --------------------
+# Column Buffers
+# --------------------
+class EodColumns:
+    """
+    Typed column buffers for EOD records.
+    Numeric fields go into float64 arrays, string fields into lists of interned strings;
+    every other MarketStack field is dropped as soon as its chunk of records is read.
+    """
+
+    def __init__(self):
+        self.floats = {field: [] for field in FLOAT_FIELDS}
+        self.strings = {field: [] for field in STRING_FIELDS}
+        self.interned = {}
+        self.rows = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def append_records(self, records: list) -> None:
+        """
+        Copies the kept fields of a chunk of decoded records into the column buffers.
+        """
+        intern = self.interned.setdefault
+        for field in FLOAT_FIELDS:
+            # None becomes NaN when converted with dtype float64
+            self.floats[field].append(np.array([record.get(field) for record in records], dtype=np.float64))
+        for field in STRING_FIELDS:
+            values = [record.get(field) for record in records]
+            self.strings[field].extend([value if value is None else intern(value, value) for value in values])
+        self.rows += len(records)
+
+    def extend(self, other: "EodColumns") -> None:
+        for field in FLOAT_FIELDS:
+            self.floats[field].extend(other.floats[field])
+        for field in STRING_FIELDS:
+            self.strings[field].extend(other.strings[field])
+        self.rows += other.rows
+
+    def to_numpy(self) -> dict:
+        columns = {
+            field: np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float64)
+            for field, chunks in self.floats.items()
+        }
+        columns.update({field: np.array(self.strings[field], dtype=object) for field in STRING_FIELDS})
+        return columns
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns the same seven columns transform_data selects from the json_normalize frame.
+        """
+        return pd.DataFrame(self.to_numpy(), columns=EOD_COLUMNS)
+
+    def to_arrow(self) -> pa.Table:
+        columns = self.to_numpy()
+        arrays = [pa.array(columns[field]) for field in FLOAT_FIELDS]
+        arrays += [pa.array(self.strings[field], type=pa.string()) for field in STRING_FIELDS]
+        return pa.Table.from_arrays(arrays, names=list(FLOAT_FIELDS + STRING_FIELDS)).select(EOD_COLUMNS)
+
+
+# --------------------
+# Streaming Decoder
+# --------------------
+def _skip_whitespace(text: str, index: int) -> int:
+    if text[index:index + 1] in _WHITESPACE_CHARS:
+        return _WHITESPACE.match(text, index).end()
+    return index
+
+
+def _expect(text: str, index: int, token: str) -> int:
+    index = _skip_whitespace(text, index)
+    if text[index:index + 1] != token:
+        raise ValueError(f"Expected {token!r} at position {index} of the EOD response")
+    return index + 1
+
+
+def _decode_data_array(text: str, index: int, columns: EodColumns) -> int:
+    """
+    Decodes the `data` array one record at a time straight into `columns`.
+    Returns the position just after the closing bracket.
+    """
+    index = _expect(text, index, "[")
+    index = _skip_whitespace(text, index)
+    if text[index:index + 1] == "]":
+        return index + 1
+
+    scan_once = _decoder.scan_once
+    chunk = []
+    while True:
+        record, index = scan_once(text, _skip_whitespace(text, index))
+        chunk.append(record)
+        if len(chunk) == CHUNK_ROWS:
+            columns.append_records(chunk)
+            chunk = []
+        index = _skip_whitespace(text, index)
+        if text[index:index + 1] == "]":
+            columns.append_records(chunk)
+            return index + 1
+        index = _expect(text, index, ",")
+
+
+def decode_eod_page(text: str, columns: EodColumns = None):
+    """
+    Decodes a raw MarketStack EOD response body without building the full JSON tree.
+    The `data` records are written into `columns` (a new EodColumns if not given) as they are parsed.
+    Returns (pagination, columns).
+    """
+    columns = columns if columns is not None else EodColumns()
+    pagination = {}
+
+    index = _expect(text, 0, "{")
+    index = _skip_whitespace(text, index)
+    if text[index:index + 1] == "}":
+        return pagination, columns
+
+    while True:
+        key, index = _decoder.raw_decode(text, _skip_whitespace(text, index))
+        index = _expect(text, index, ":")
+        if key == "data":
+            index = _decode_data_array(text, index, columns)
+        else:
+            value, index = _decoder.raw_decode(text, _skip_whitespace(text, index))
+            if key == "pagination":
+                pagination = value
+        index = _skip_whitespace(text, index)
+        if text[index:index + 1] == "}":
+            return pagination, columns
+        index = _expect(text, index, ",")
@@ -1,47 +1,247 @@
 # --------------------
 # Import Statements
 # --------------------
+import json
+import time
 import requests
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy import create_engine
 from sqlalchemy.engine import URL
+from assets.rate_limit import RateLimiter
+from assets.response_cache import ResponseCache
+from assets.decode import EodColumns, decode_eod_page
 # --------------------
 # Step 1: Extract Data
 # --------------------
-def extract_stock_data(api_key: str) -> pd.DataFrame:
+MARKETSTACK_BASE_URL = "https://api.marketstack.com/v1"
+DEFAULT_SYMBOLS = "AAPL,AMZN,GOOGL,MSFT,NFLX"
+
+# Fields of an EOD record, in the order the API sends them
+MARKETSTACK_EOD_FIELDS = [
+    "open", "high", "low", "close", "volume", "adj_high", "adj_low", "adj_close", "adj_open", "adj_volume",
+    "split_factor", "dividend", "symbol", "exchange", "date",
+]
+
+
+def marketstack_eod_url() -> str:
     """
-    Extracts stock data from MarketStack API.
-    Returns a DataFrame with the extracted data.
+    The EOD endpoint under MARKETSTACK_BASE_URL (default https://api.marketstack.com/v1), read per call,
+    so extraction can be pointed at a stand-in such as benchmarks/marketstack_server.py.
     """
-    # Define the API endpoint
-    api_url = "https://api.marketstack.com/v1/eod"
+    return os.getenv("MARKETSTACK_BASE_URL", MARKETSTACK_BASE_URL).rstrip("/") + "/eod"
 
-    # Define request parameters dynamically
-    params = {
+
+def build_eod_params(
+    api_key: str,
+    symbols: str = DEFAULT_SYMBOLS,
+    date_from: str = "2021-01-01",
+    date_to: str = None,
+    limit: int = 1000,
+) -> dict:
+    """
+    Builds the query parameters for the MarketStack EOD endpoint.
+    The offset is left out and set per page by the paginated extractor.
+    """
+    return {
         "access_key": api_key,  # MarketStack API Key from .env
-        "symbols": "AAPL,AMZN,GOOGL,MSFT,NFLX",  # Stock symbols
+        "symbols": symbols,  # Stock symbols
         "sort": "DESC",  # Sort results from latest to oldest
-        "date_from": "2021-01-01",  # Start date (YYYY-MM-DD)
-        "date_to": datetime.today().strftime("%Y-%m-%d"),  # End date (YYYY-MM-DD)
-        "limit": 1000,  # Number of results per request (max: 1000 for paid plans)
-        "offset": 0  # Pagination offset (0 starts from the first record)
+        "date_from": date_from,  # Start date (YYYY-MM-DD)
+        "date_to": date_to or datetime.today().strftime("%Y-%m-%d"),  # End date (YYYY-MM-DD)
+        "limit": limit,  # Number of results per request (max: 1000 for paid plans)
     }
 
-    # Send GET request to the MarketStack API
-    response = requests.get(api_url, params=params)
 
-    # Check if the response is successful (status code 200)
-    if response.status_code == 200:
-        data = response.json()  # Convert response to JSON
-        # Normalize the 'data' field to create a DataFrame
-        df = pd.json_normalize(data['data'])
-        print("Data extraction completed successfully.")
+def normalize_eod_records(records: list) -> pd.DataFrame:
+    """
+    Builds the extracted DataFrame from EOD records with the known fields first, in the API's order.
+    pd.json_normalize orders columns by first appearance, so a first record without e.g. dividend would
+    otherwise move that column; this way every extractor returns the same layout, and the columnar frames
+    are exactly this one restricted to EOD_COLUMNS.
+    """
+    df = pd.json_normalize(records)
+    known = [field for field in MARKETSTACK_EOD_FIELDS if field in df.columns]
+    return df.loc[:, known + [column for column in df.columns if column not in known]]
+
+
+def page_offsets(total: int, limit: int) -> list:
+    """
+    Returns the offsets of every page after the first one for a result set of `total` rows.
+    """
+    return list(range(limit, total, limit))
+
+
+def coerce_page(page, raw: bool):
+    """
+    Returns a cached page in the requested form: response text when `raw`, decoded JSON otherwise.
+    """
+    if raw and not isinstance(page, str):
+        return json.dumps(page)
+    if not raw and isinstance(page, str):
+        return json.loads(page)
+    return page
+
+
+def fetch_eod_page(
+    session: requests.Session,
+    params: dict,
+    offset: int,
+    rate_limiter: RateLimiter = None,
+    response_cache: ResponseCache = None,
+    raw: bool = False,
+):
+    """
+    Fetches a single page of the EOD endpoint and returns the decoded JSON body
+    (or the undecoded response text when `raw` is set).
+    The page goes through the rate limiter and is retried on its own on 429/5xx.
+    A cached response is returned without calling the API when `response_cache` has one.
+    Raises MarketStackError when the page cannot be fetched.
+    """
+    page_params = {**params, "offset": offset}
+    url = marketstack_eod_url()
+    if response_cache is not None:
+        cached_page = response_cache.get(url, page_params)
+        if cached_page is not None:
+            return coerce_page(cached_page, raw)
+
+    rate_limiter = rate_limiter or RateLimiter.from_env()
+
+    def send():
+        response = session.get(url, params=page_params)
+        rate_limiter.received(len(response.content))
+        body = response.json() if response.status_code == 200 and not raw else response.text
+        return response.status_code, response.headers, body
+
+    page = rate_limiter.call(send, retry_exceptions=(requests.ConnectionError, requests.Timeout))
+    if response_cache is not None:
+        response_cache.put(url, page_params, page)
+    return page
+
+
+def extract_stock_data_paginated(
+    api_key: str,
+    symbols: str = DEFAULT_SYMBOLS,
+    date_from: str = "2021-01-01",
+    date_to: str = None,
+    limit: int = 1000,
+    max_workers: int = 4,
+    session: requests.Session = None,
+    rate_limiter: RateLimiter = None,
+    response_cache: ResponseCache = None,
+    columnar: bool = False,
+    timings: dict = None,
+) -> pd.DataFrame:
+    """
+    Extracts every page of stock data from the MarketStack API.
+    - Reads pagination.total from the first page
+    - Fetches the remaining offset windows concurrently on a bounded thread pool
+    - Merges the pages into one DataFrame in offset order
+    With `columnar` set, pages are stream-decoded into typed column buffers that keep only
+    the fields transform_data uses, instead of going through pd.json_normalize.
+    Raises MarketStackError if any page fails after retries, so a partial history is never loaded.
+    A `timings` dict is incremented with fetch_seconds (requests, plus page decoding when columnar)
+    and decode_seconds (building the DataFrame).
+    """
+    timings = timings if timings is not None else {}
+    fetch_start = time.perf_counter()
+    params = build_eod_params(api_key, symbols=symbols, date_from=date_from, date_to=date_to, limit=limit)
+    session = session or requests.Session()
+    rate_limiter = rate_limiter or RateLimiter.from_env()
+
+    def fetch(offset):
+        page = fetch_eod_page(session, params, offset, rate_limiter, response_cache, raw=columnar)
+        return decode_eod_page(page) if columnar else page
+
+    first_page = fetch(0)
+    pagination = first_page[0] if columnar else first_page.get("pagination", {})
+    offsets = page_offsets(pagination.get("total", 0), limit)
+
+    # executor.map yields results in submission order, which keeps the merge deterministic
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        pages = list(executor.map(fetch, offsets))
+
+    decode_start = time.perf_counter()
+    timings["fetch_seconds"] = timings.get("fetch_seconds", 0.0) + decode_start - fetch_start
+    if columnar:
+        columns = EodColumns()
+        for _, page_columns in [first_page] + pages:
+            columns.extend(page_columns)
+        df = columns.to_dataframe()
+        timings["decode_seconds"] = timings.get("decode_seconds", 0.0) + time.perf_counter() - decode_start
+        print(f"Data extraction completed successfully. ({len(offsets) + 1} pages, {len(df)} rows)")
         return df
-    else:
-        print("Error:", response.status_code, response.text)  # Print error message if request fails
-        return pd.DataFrame()  # Return an empty DataFrame on error
+
+    records = list(first_page["data"])
+    for page in pages:
+        records.extend(page["data"])
+
+    # Normalize the merged 'data' records to create a DataFrame
+    df = normalize_eod_records(records)
+    timings["decode_seconds"] = timings.get("decode_seconds", 0.0) + time.perf_counter() - decode_start
+    print(f"Data extraction completed successfully. ({len(offsets) + 1} pages, {len(df)} rows)")
+    return df
+
+
+def incremental_date_from(
+    symbols: str,
+    watermarks: dict,
+    overlap_days: int = 3,
+    default_date_from: str = "2021-01-01",
+) -> dict:
+    """
+    Works out the date_from of every symbol for an incremental run.
+    - Symbols with a high-watermark restart `overlap_days` before it, so late corrections are picked up
+    - Symbols without one fall back to `default_date_from` (full backfill)
+    Returns {date_from: "SYM1,SYM2"} so symbols sharing a start date share one paginated request.
+    """
+    groups = {}
+    for symbol in symbols.split(","):
+        watermark = watermarks.get(symbol)
+        if watermark is None:
+            date_from = default_date_from
+        else:
+            date_from = (watermark - timedelta(days=overlap_days)).strftime("%Y-%m-%d")
+        groups.setdefault(date_from, []).append(symbol)
+
+    return {date_from: ",".join(group) for date_from, group in sorted(groups.items())}
+
+
+def extract_stock_data_incremental(
+    api_key: str,
+    watermarks: dict,
+    symbols: str = DEFAULT_SYMBOLS,
+    overlap_days: int = 3,
+    default_date_from: str = "2021-01-01",
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Extracts only the bars after each symbol's high-watermark (minus the overlap window).
+    `watermarks` is {symbol: max(date)} as read from the target table.
+    Extra keyword arguments are passed on to extract_stock_data_paginated.
+    """
+    kwargs.setdefault("rate_limiter", RateLimiter.from_env())  # One request budget for every symbol group
+    frames = []
+    for date_from, symbol_group in incremental_date_from(symbols, watermarks, overlap_days, default_date_from).items():
+        print(f"Extracting {symbol_group} from {date_from}.")
+        df = extract_stock_data_paginated(api_key, symbols=symbol_group, date_from=date_from, **kwargs)
+        if not df.empty:
+            frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def extract_stock_data(api_key: str, response_cache: ResponseCache = None, columnar: bool = False) -> pd.DataFrame:
+    """
+    Extracts stock data from MarketStack API.
+    Returns a DataFrame with the extracted data.
+    """
+    return extract_stock_data_paginated(api_key, response_cache=response_cache, columnar=columnar)
 
 # --------------------
 # Step 2: Transform Data
@@ -84,6 +284,75 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     return df_stocks_selected
 
 
+# Fixed output schema of transform_data_compact
+COMPACT_SCHEMA = {
+    "open": "float64",
+    "close": "float64",
+    "volume": "Int64",
+    "dividend": "float64",
+    "symbol": "category",
+    "exchange": "category",
+    "date": "datetime64[ns, UTC]",
+    "unique_id": "object",
+}
+
+
+def build_unique_id(symbol: pd.Series, date: pd.Series) -> np.ndarray:
+    """
+    Builds symbol + "_" + YYYY-MM-DD without formatting every row:
+    each distinct day and each symbol category is formatted once, then picked by code.
+    `symbol` must be categorical and `date` tz-aware.
+    """
+    days = date.dt.tz_convert("UTC").dt.tz_localize(None).values.astype("datetime64[D]")
+    day_codes, unique_days = pd.factorize(days)
+    day_strings = np.datetime_as_string(unique_days, unit="D").astype(object)
+    symbol_prefixes = symbol.cat.categories.values.astype(object) + "_"
+    return symbol_prefixes[symbol.cat.codes.values] + day_strings[day_codes]
+
+
+def transform_data_compact(df: pd.DataFrame, include_unique_id: bool = True) -> pd.DataFrame:
+    """
+    Vectorized version of transform_data producing COMPACT_SCHEMA.
+    - symbol/exchange become categoricals, volume a nullable Int64
+    - Prices and dividends stay float64: float32 would change the values written to Postgres
+    - Each distinct date string is parsed once and the result mapped back by code
+    - unique_id is built by build_unique_id instead of a per-row strftime; tables keyed
+      on (symbol, date) do not need it, so include_unique_id=False skips it
+    """
+    if df.empty:
+        print("No data to transform.")
+        return pd.DataFrame()
+
+    df_stocks = df.loc[:, ["open", "close", "volume", "dividend", "symbol", "exchange", "date"]]
+
+    # Remove rows with missing or empty Symbol or Date
+    df_stocks = df_stocks[df_stocks["symbol"].notna() & df_stocks["symbol"].ne("") & df_stocks["date"].notna()]
+
+    # Parse the distinct dates once; rows whose date does not parse are dropped
+    date_codes, unique_dates = pd.factorize(df_stocks["date"])
+    dates = pd.to_datetime(pd.Index(unique_dates), errors="coerce", utc=True).take(date_codes)
+    valid = ~dates.isna()
+    df_stocks = df_stocks[valid]
+
+    volume = pd.to_numeric(df_stocks["volume"], errors="coerce").round().astype("Int64")
+    df_compact = pd.DataFrame(
+        {
+            "open": pd.to_numeric(df_stocks["open"], errors="coerce").astype("float64").values,
+            "close": pd.to_numeric(df_stocks["close"], errors="coerce").astype("float64").values,
+            "volume": volume.array,
+            "dividend": pd.to_numeric(df_stocks["dividend"], errors="coerce").astype("float64").values,
+            "symbol": pd.Categorical(df_stocks["symbol"].values),
+            "exchange": pd.Categorical(df_stocks["exchange"].values),
+            "date": dates[valid],
+        }
+    )
+    if include_unique_id:
+        df_compact["unique_id"] = build_unique_id(df_compact["symbol"], df_compact["date"])
+
+    print("Data transformation completed successfully.")
+    return df_compact
+
+
 
 # --------------------
 # Step 3: Load Data with Bulk Upsert
@@ -0,0 +1,156 @@
+# --------------------
+# Import Statements
+# --------------------
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Schema metadata key holding {symbol: [first row, end row]} of the sorted file
+SYMBOL_INDEX_KEY = b"symbol_index"
+
+
+# --------------------
+# Write Arrow IPC History
+# --------------------
+def write_history(data, path: str) -> str:
+    """
+    Writes stock bars (a DataFrame or pyarrow Table with symbol and date columns) as one
+    uncompressed Arrow IPC file sorted by (symbol, date), with a symbol -> row range index
+    in the schema metadata. Uncompressed IPC is what lets HistoryReader map it without copying.
+    The file is written to a temporary name and renamed, so readers never see a partial file.
+    """
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+    symbols = table.column("symbol")
+    if pa.types.is_dictionary(symbols.type):
+        symbols = symbols.cast(pa.string())
+    table = table.set_column(table.schema.get_field_index("symbol"), "symbol", symbols)
+    table = table.sort_by([("symbol", "ascending"), ("date", "ascending")]).combine_chunks()
+
+    symbol_values = table.column("symbol").to_numpy(zero_copy_only=False)
+    unique_symbols, starts = np.unique(symbol_values, return_index=True)
+    ends = list(starts[1:]) + [len(table)]
+    index = {symbol: [int(start), int(end)] for symbol, start, end in zip(unique_symbols, starts, ends)}
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[SYMBOL_INDEX_KEY] = json.dumps(index).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(file_descriptor)
+    with pa.OSFile(temp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        # One record batch, so every column is a single contiguous buffer
+        writer.write_table(table, max_chunksize=max(len(table), 1))
+    os.replace(temp_path, path)
+    return path
+
+# --------------------
+# Memory-Mapped Reader
+# --------------------
+class HistoryReader:
+    """
+    Read-only view over historical bars in an Arrow IPC file written by write_history.
+    - The file is memory-mapped: opening it reads only the footer, and column buffers are
+      paged in by the OS as queries touch them
+    - query() returns zero-copy pyarrow slices: a symbol is a row range from the index and a
+      date range a binary search within it
+    - Nothing becomes pandas until to_pandas() is called, and then only the selected rows and columns
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.source = pa.memory_map(path, "r")
+        self.table = pa.ipc.open_file(self.source).read_all()
+        self.index = json.loads((self.table.schema.metadata or {}).get(SYMBOL_INDEX_KEY, b"{}"))
+
+    @classmethod
+    def from_landing_zone(cls, zone, path: str, run_id: str = None):
+        """
+        Exports one transformed run of a LandingZone (the latest by default) to `path` and opens it.
+        Parquet is compressed and encoded, so it cannot be mapped without decoding; the export
+        decodes it once and every later query maps the result.
+        """
+        run_id, entry = zone.stage_entry("transformed", run_id)
+        write_history(zone.dataset("transformed", run_id).to_table(columns=entry["columns"]), path)
+        return cls(path)
+
+    def close(self) -> None:
+        self.table = None
+        self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def symbols(self) -> list:
+        return list(self.index)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _date_bounds(self, start: int, end: int, date_from, date_to):
+        """
+        Narrows [start, end) of one symbol to date_from <= date <= date_to by binary search.
+        """
+        dates = self.table.column("date").chunk(0).slice(start, end - start)
+        ticks = dates.to_numpy(zero_copy_only=True).view("int64")
+        low = 0
+        high = len(ticks)
+        if date_from is not None:
+            low = int(np.searchsorted(ticks, _to_ticks(date_from, dates.type.unit), side="left"))
+        if date_to is not None:
+            high = int(np.searchsorted(ticks, _to_ticks(date_to, dates.type.unit), side="right"))
+        return start + low, start + max(low, high)
+
+    def query(self, symbols: list = None, date_from=None, date_to=None, columns: list = None) -> pa.Table:
+        """
+        Returns the bars of `symbols` (all by default) between date_from and date_to (inclusive)
+        as a pyarrow Table of zero-copy slices of the mapped file.
+        """
+        table = self.table.select(columns) if columns else self.table
+        selected = self.index if symbols is None else {symbol: self.index[symbol] for symbol in symbols if symbol in self.index}
+
+        slices = []
+        for start, end in selected.values():
+            if date_from is not None or date_to is not None:
+                start, end = self._date_bounds(start, end, date_from, date_to)
+            if end > start:
+                slices.append(table.slice(start, end - start))
+        if not slices:
+            return table.slice(0, 0)
+        return pa.concat_tables(slices)
+
+    def column(self, name: str, symbol: str, date_from=None, date_to=None) -> np.ndarray:
+        """
+        Returns one numeric column of one symbol as a read-only NumPy view over the mapped file.
+        Raises ArrowInvalid if the column has nulls, since those cannot be viewed without a copy.
+        """
+        start, end = self.index[symbol]
+        if date_from is not None or date_to is not None:
+            start, end = self._date_bounds(start, end, date_from, date_to)
+        return self.table.column(name).chunk(0).slice(start, end - start).to_numpy(zero_copy_only=True)
+
+    def to_pandas(self, symbols: list = None, date_from=None, date_to=None, columns: list = None) -> pd.DataFrame:
+        """
+        Materializes a query as a DataFrame, with symbol as a categorical.
+        """
+        df = self.query(symbols, date_from, date_to, columns).to_pandas()
+        if "symbol" in df.columns:
+            df["symbol"] = df["symbol"].astype("category")
+        return df
+
+
+def _to_ticks(value, unit: str) -> int:
+    """
+    Converts a date bound to the integer ticks of a timestamp column in `unit` (s, ms, us or ns).
+    """
+    timestamp = pd.Timestamp(value)
+    timestamp = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+    return timestamp.value // {"s": 10 ** 9, "ms": 10 ** 6, "us": 10 ** 3, "ns": 1}[unit]
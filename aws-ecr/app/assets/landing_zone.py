@@ -0,0 +1,200 @@
+# --------------------
+# Import Statements
+# --------------------
+import json
+import os
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# "raw": extracted EOD records as returned by the API; "transformed": the load-ready frame
+STAGES = ("raw", "transformed")
+
+MANIFEST_NAME = "manifest.json"
+
+# Directory partition columns: `year` comes from date; `symbol` can be added as an outer level
+PARTITION_COLUMNS = ("symbol", "year")
+DEFAULT_PARTITION_BY = ("year",)
+
+# Rows per Parquet row group; files are sorted by symbol, so row-group statistics prune symbol filters
+ROW_GROUP_ROWS = 64 * 1024
+
+PARTITION_TYPES = {"symbol": pa.string(), "year": pa.int32()}
+
+
+class LandingZoneError(Exception):
+    """
+    Raised when a requested run or stage is not in the landing zone.
+    """
+
+
+def new_run_id() -> str:
+    """
+    Returns a sortable run id, e.g. 20250224T210501Z-1a2b3c4d.
+    """
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:8]}"
+
+
+class LandingZone:
+    """
+    A Parquet landing zone for extracted and transformed stock data.
+    - Files live under {root}/{stage}/run_id={run_id}/year={year}/ (hive-style), sorted by symbol and date;
+      partition_by=("symbol", "year") adds a symbol={symbol}/ level
+    - Readers prune by year through directories and by symbol through row-group statistics
+      (or directories when symbol is a partition column)
+    - manifest.json lists every run with its stages, row counts, date range, columns and files
+    - A stage is only added to the manifest once its files are written, so readers never see partial runs
+    Yearly partitions are the default because a symbol/day or even a symbol/year layout produces one small
+    file per ticker and period: with hundreds of tickers, opening files then dominates the read.
+    """
+
+    def __init__(self, root: str, partition_by: tuple = DEFAULT_PARTITION_BY):
+        unknown = set(partition_by) - set(PARTITION_COLUMNS)
+        if unknown:
+            raise ValueError(f"partition_by must be made of {PARTITION_COLUMNS}, got {partition_by!r}")
+        self.root = root
+        self.partition_by = [column for column in PARTITION_COLUMNS if column in partition_by]
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds a landing zone from LANDING_ZONE_DIR and LANDING_ZONE_PARTITION_BY (e.g. "symbol,year").
+        Returns None when LANDING_ZONE_DIR is not set.
+        """
+        root = os.getenv("LANDING_ZONE_DIR")
+        if not root:
+            return None
+        partition_by = os.getenv("LANDING_ZONE_PARTITION_BY")
+        return cls(root, tuple(partition_by.split(",")) if partition_by else DEFAULT_PARTITION_BY)
+
+    # --------------------
+    # Manifest
+    # --------------------
+    def manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"runs": {}}
+
+    def _write_manifest(self, manifest: dict) -> None:
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def latest_run(self, stage: str = "transformed") -> str:
+        """
+        Returns the most recent run id that has `stage`.
+        """
+        runs = [run_id for run_id, run in self.manifest()["runs"].items() if stage in run["stages"]]
+        if not runs:
+            raise LandingZoneError(f"No run with a {stage} stage in {self.root}")
+        return max(runs)
+
+    # --------------------
+    # Write
+    # --------------------
+    def stage_path(self, stage: str, run_id: str) -> str:
+        return os.path.join(self.root, stage, f"run_id={run_id}")
+
+    def write(self, df: pd.DataFrame, stage: str, run_id: str) -> dict:
+        """
+        Writes a frame for one stage of a run and records it in the manifest.
+        The frame needs `symbol` and `date` columns (date as ISO strings or datetimes).
+        Returns the manifest entry of the stage.
+        """
+        if stage not in STAGES:
+            raise ValueError(f"stage must be one of {STAGES}, got {stage!r}")
+
+        path = self.stage_path(stage, run_id)
+        dates = pd.to_datetime(df["date"], errors="coerce", utc=True)
+        order = np.lexsort((dates.values, df["symbol"].astype(str).values))
+        table = pa.Table.from_pandas(
+            df.assign(symbol=df["symbol"].astype(str), year=dates.dt.year.fillna(0).astype("int32")).iloc[order],
+            preserve_index=False,
+        )
+
+        written = []
+        ds.write_dataset(
+            table,
+            path,
+            format="parquet",
+            partitioning=self.partition_by,
+            partitioning_flavor="hive",
+            max_rows_per_group=ROW_GROUP_ROWS,
+            existing_data_behavior="delete_matching",
+            file_visitor=lambda file: written.append(file.path),
+        )
+
+        entry = {
+            "written_at": datetime.now(timezone.utc).isoformat(),
+            "rows": len(df),
+            "symbols": sorted(df["symbol"].astype(str).unique().tolist()),
+            "date_min": dates.min().isoformat() if len(df) else None,
+            "date_max": dates.max().isoformat() if len(df) else None,
+            "columns": list(df.columns),
+            "partition_by": self.partition_by,
+            "dtypes": {column: str(dtype) for column, dtype in df.dtypes.items()},
+            "files": sorted(os.path.relpath(file_path, self.root) for file_path in written),
+        }
+        with self.lock:
+            manifest = self.manifest()
+            manifest["runs"].setdefault(run_id, {"stages": {}})["stages"][stage] = entry
+            self._write_manifest(manifest)
+
+        print(f"Landed {len(df)} {stage} rows for run {run_id} ({len(written)} files).")
+        return entry
+
+    # --------------------
+    # Read
+    # --------------------
+    def stage_entry(self, stage: str = "transformed", run_id: str = None):
+        """
+        Returns (run_id, manifest entry) of one stage of a run, the latest run by default.
+        """
+        run_id = run_id or self.latest_run(stage)
+        entry = self.manifest()["runs"].get(run_id, {}).get("stages", {}).get(stage)
+        if entry is None:
+            raise LandingZoneError(f"Run {run_id} has no {stage} stage in {self.root}")
+        return run_id, entry
+
+    def dataset(self, stage: str = "transformed", run_id: str = None) -> ds.Dataset:
+        """
+        Returns a pyarrow Dataset over one stage of a run, partition columns included.
+        Only the files the manifest lists are part of it, so leftovers of an interrupted write are never read.
+        """
+        run_id, entry = self.stage_entry(stage, run_id)
+        return ds.dataset(
+            [os.path.join(self.root, file_path) for file_path in entry["files"]],
+            format="parquet",
+            partition_base_dir=self.stage_path(stage, run_id),
+            partitioning=ds.partitioning(
+                pa.schema([(column, PARTITION_TYPES[column]) for column in entry["partition_by"]]), flavor="hive"
+            ),
+        )
+
+    def read(self, stage: str = "transformed", run_id: str = None, symbols: list = None, years: list = None) -> pd.DataFrame:
+        """
+        Reads one stage of a run (the latest run by default) back into a DataFrame.
+        `symbols` and `years` are pushed down to the scan (directories and row-group statistics).
+        Columns come back in their original order and dtypes (categoricals included).
+        """
+        run_id, entry = self.stage_entry(stage, run_id)
+        expression = None
+        if symbols:
+            expression = ds.field("symbol").isin(list(symbols))
+        if years:
+            year_filter = ds.field("year").isin([int(year) for year in years])
+            expression = year_filter if expression is None else expression & year_filter
+
+        df = self.dataset(stage, run_id).to_table(columns=entry["columns"], filter=expression).to_pandas()
+        return df.astype({column: dtype for column, dtype in entry["dtypes"].items() if dtype == "category"})
@@ -0,0 +1,219 @@
+# --------------------
+# Import Statements
+# --------------------
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+# Status codes worth retrying: throttling and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class MarketStackError(Exception):
+    """
+    Raised when a MarketStack request fails for good (non-retryable status or retries exhausted).
+    """
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# --------------------
+# Token Bucket
+# --------------------
+class TokenBucket:
+    """
+    A thread-safe token bucket refilled at `rate` tokens per second, holding at most `capacity`.
+    The rate adapts: a throttled response halves it, each success recovers it towards the configured rate.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, min_rate: float = 0.1):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes one token and returns how many seconds the caller must wait before using it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def throttled(self) -> None:
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def succeeded(self) -> None:
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+
+# --------------------
+# Rate Limiter with Retries
+# --------------------
+def parse_retry_after(headers) -> float:
+    """
+    Returns the Retry-After delay in seconds (delta-seconds or HTTP-date), or None if absent or invalid.
+    """
+    value = (headers or {}).get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Shared request budget and retry policy for every MarketStack extractor.
+    - Each request takes a token from the bucket (requests_per_second, burst)
+    - 429/5xx and connection errors are retried on their own with jittered exponential backoff
+    - Retry-After is honoured when the API sends it
+    - calls, retries and bytes_received count this limiter's traffic; shared() limiters count their own
+      while drawing from the same bucket
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 5.0,
+        burst: float = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.calls = 0
+        self.bytes_received = 0
+        self.counter_lock = threading.Lock()
+
+    def shared(self) -> "RateLimiter":
+        """
+        Returns a limiter with the same request budget and retry policy, but its own counters.
+        """
+        limiter = RateLimiter(max_retries=self.max_retries, base_delay=self.base_delay, max_delay=self.max_delay)
+        limiter.bucket = self.bucket
+        return limiter
+
+    def received(self, size: int) -> None:
+        """
+        Counts one response of `size` bytes.
+        """
+        with self.counter_lock:
+            self.calls += 1
+            self.bytes_received += size
+
+    def _count_retry(self) -> None:
+        with self.counter_lock:
+            self.retries += 1
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """
+        Builds a limiter from MARKETSTACK_REQUESTS_PER_SECOND, MARKETSTACK_BURST and MARKETSTACK_MAX_RETRIES.
+        """
+        burst = os.getenv("MARKETSTACK_BURST")
+        return cls(
+            requests_per_second=float(os.getenv("MARKETSTACK_REQUESTS_PER_SECOND", 5)),
+            burst=float(burst) if burst else None,
+            max_retries=int(os.getenv("MARKETSTACK_MAX_RETRIES", 5)),
+        )
+
+    def backoff(self, attempt: int, headers=None) -> float:
+        """
+        Returns the delay before retry number `attempt` (0-based): Retry-After if given, else full-jitter backoff.
+        """
+        retry_after = parse_retry_after(headers)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _handle(self, attempt: int, status_code: int, headers, body):
+        """
+        Returns (done, result_or_delay). Raises MarketStackError for non-retryable failures or when retries run out.
+        """
+        if 200 <= status_code < 300:
+            self.bucket.succeeded()
+            return True, body
+        if status_code not in RETRYABLE_STATUS_CODES:
+            raise MarketStackError(f"MarketStack request failed: {status_code} {body}", status_code)
+        if attempt >= self.max_retries:
+            raise MarketStackError(
+                f"MarketStack request failed after {self.max_retries} retries: {status_code} {body}", status_code
+            )
+        if status_code == 429:
+            self.bucket.throttled()
+        self._count_retry()
+        return False, self.backoff(attempt, headers)
+
+    def call(self, send, retry_exceptions: tuple = ()):
+        """
+        Runs `send()` under the rate limit and retries it until it succeeds.
+        `send` returns (status_code, headers, body); the body of the first successful answer is returned.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                status_code, headers, body = send()
+            except retry_exceptions as e:
+                if attempt >= self.max_retries:
+                    raise MarketStackError(f"MarketStack request failed after {self.max_retries} retries: {e}") from e
+                self._count_retry()
+                time.sleep(self.backoff(attempt))
+                continue
+
+            done, result = self._handle(attempt, status_code, headers, body)
+            if done:
+                return result
+            time.sleep(result)
+
+    async def call_async(self, send, retry_exceptions: tuple = ()):
+        """
+        Async counterpart of call: `send` is a coroutine function returning (status_code, headers, body).
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire_async()
+            try:
+                status_code, headers, body = await send()
+            except retry_exceptions as e:
+                if attempt >= self.max_retries:
+                    raise MarketStackError(f"MarketStack request failed after {self.max_retries} retries: {e}") from e
+                self._count_retry()
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+
+            done, result = self._handle(attempt, status_code, headers, body)
+            if done:
+                return result
+            await asyncio.sleep(result)
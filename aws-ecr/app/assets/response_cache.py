@@ -0,0 +1,192 @@
+# --------------------
+# Import Statements
+# --------------------
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Query parameters that never take part in the cache key
+EXCLUDED_PARAMS = {"access_key"}
+
+# Defaults to the day of the run (see build_eod_params), so replays on a later day look it up by request instead
+FLOATING_PARAM = "date_to"
+
+
+class ResponseCacheMiss(Exception):
+    """
+    Raised in replay-only mode when a request has no cached response.
+    """
+
+
+class ResponseCache:
+    """
+    A content-addressed on-disk cache of API responses.
+    - Keys are the sha256 of the endpoint plus the sorted params, without the access key
+    - Entries are gzip-compressed JSON; the file mtime is the write time, the atime the last read
+    - Entries older than `ttl_seconds` are ignored, and the least recently read ones are
+      evicted once the cache grows past `max_bytes`
+    - In `replay_only` mode a miss raises ResponseCacheMiss instead of calling the API
+    - Every entry with a date_to is also indexed by its request without date_to, so a replay on a later day
+      (where date_to defaults to the new day) falls back on the latest recorded response whose date_to is
+      not past the requested one
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = None, max_bytes: int = 1024 ** 3, replay_only: bool = False):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(size for _, size, _ in self.entries())
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds a cache from RESPONSE_CACHE_DIR, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_BYTES
+        and RESPONSE_CACHE_REPLAY_ONLY. Returns None when RESPONSE_CACHE_DIR is not set.
+        """
+        directory = os.getenv("RESPONSE_CACHE_DIR")
+        if not directory:
+            return None
+        ttl_seconds = os.getenv("RESPONSE_CACHE_TTL_SECONDS")
+        return cls(
+            directory,
+            ttl_seconds=float(ttl_seconds) if ttl_seconds else None,
+            max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 1024 ** 3)),
+            replay_only=os.getenv("RESPONSE_CACHE_REPLAY_ONLY", "false").lower() in ("1", "true", "yes"),
+        )
+
+    @staticmethod
+    def cache_key(endpoint: str, params: dict) -> str:
+        normalized = {str(key): str(value) for key, value in params.items() if key not in EXCLUDED_PARAMS}
+        return hashlib.sha256(json.dumps([endpoint, sorted(normalized.items())]).encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def read(self, path: str):
+        """
+        Returns the payload stored at `path`, or None if it is missing, unreadable or past the TTL.
+        """
+        try:
+            written_at = os.stat(path).st_mtime
+            if self.ttl_seconds is None or time.time() - written_at <= self.ttl_seconds:
+                with gzip.open(path, "rt", encoding="utf-8") as file:
+                    payload = json.load(file)
+                os.utime(path, (time.time(), written_at))  # Record the read for LRU eviction
+                return payload
+        except (OSError, EOFError, ValueError):
+            pass
+        return None
+
+    def replay_index_path(self, endpoint: str, params: dict) -> str:
+        key = self.cache_key(endpoint, {name: value for name, value in params.items() if name != FLOATING_PARAM})
+        return os.path.join(self.directory, key[:2], f"{key}.replay")
+
+    def read_replay_index(self, path: str):
+        try:
+            with open(path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, endpoint: str, params: dict):
+        """
+        Returns the cached payload, or None on a miss (ResponseCacheMiss in replay-only mode).
+        In replay-only mode, an exact miss falls back on the replay index (see the class docstring).
+        """
+        payload = self.read(self.path_for(self.cache_key(endpoint, params)))
+        if payload is None and self.replay_only and params.get(FLOATING_PARAM):
+            index = self.read_replay_index(self.replay_index_path(endpoint, params))
+            if index is not None and index[FLOATING_PARAM] <= str(params[FLOATING_PARAM]):
+                payload = self.read(self.path_for(index["key"]))
+
+        with self.lock:
+            if payload is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if payload is None and self.replay_only:
+            raise ResponseCacheMiss(f"No cached response for {endpoint} {self.cache_key(endpoint, params)}")
+        return payload
+
+    def put(self, endpoint: str, params: dict, payload) -> None:
+        """
+        Stores the payload atomically, then evicts least recently read entries if over max_bytes.
+        """
+        path = self.path_for(self.cache_key(endpoint, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(file_descriptor, "wb") as raw_file, gzip.GzipFile(fileobj=raw_file, mode="wb") as file:
+            file.write(json.dumps(payload).encode("utf-8"))
+        size = os.path.getsize(temp_path)
+        try:
+            replaced_size = os.path.getsize(path)  # Re-fetches after expiry and stage retries overwrite entries
+        except FileNotFoundError:
+            replaced_size = 0
+        os.replace(temp_path, path)
+        if params.get(FLOATING_PARAM):
+            self.index_for_replay(endpoint, params)
+
+        with self.lock:
+            self.total_bytes += size - replaced_size
+            over_budget = self.total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def index_for_replay(self, endpoint: str, params: dict) -> None:
+        """
+        Points the request's replay index at this entry, unless it already points at a later date_to.
+        """
+        index_path = self.replay_index_path(endpoint, params)
+        date_to = str(params[FLOATING_PARAM])
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with self.lock:
+            index = self.read_replay_index(index_path)
+            if index is not None and index[FLOATING_PARAM] > date_to:
+                return
+            file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(index_path), suffix=".tmp")
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                json.dump({"key": self.cache_key(endpoint, params), FLOATING_PARAM: date_to}, file)
+            os.replace(temp_path, index_path)
+
+    def entries(self) -> list:
+        """
+        Returns (atime, size, path) for every cache entry on disk.
+        """
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json.gz"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_atime, stat.st_size, path))
+        return entries
+
+    def evict(self) -> None:
+        """
+        Removes the least recently read entries until the cache is back under 90% of max_bytes,
+        so a full cache is not rescanned on every write.
+        """
+        with self.lock:
+            entries = sorted(self.entries())
+            total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total_bytes <= self.max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_bytes -= size
+            self.total_bytes = total_bytes
@@ -0,0 +1,235 @@
+# --------------------
+# Import Statements
+# --------------------
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+import pandas as pd
+import pyarrow
+import sqlalchemy
+from assets.decode import decode_eod_page
+from assets.extract_transform import transform_data, transform_data_compact
+from benchmarks.synthetic import iter_eod_frames, make_eod_page
+from connectors.db_connector import (
+    LoadResult, get_engine, load_data, load_data_copy, load_data_parallel, load_data_transactional
+)
+from connectors.postgresql import PG8000_MAX_PARAMETERS
+
+LOAD_STRATEGIES = ("upsert", "copy", "transactional", "parallel")
+
+# Rows per MarketStack page in the decode benchmark
+PAGE_ROWS = 1000
+
+# --------------------
+# Benchmarks
+# --------------------
+def upsert_in_statements(df, engine, table_name):
+    """
+    The default load_data path, one multi-VALUES statement per pg8000 parameter budget:
+    a single statement for the whole frame fails past PG8000_MAX_PARAMETERS.
+    """
+    statement_rows = PG8000_MAX_PARAMETERS // len(df.columns)
+    for start in range(0, len(df), statement_rows):
+        load_data(df.iloc[start:start + statement_rows], engine, table_name)
+
+
+def load_with(strategy, df, engine, table_name, workers):
+    if strategy == "upsert":
+        return upsert_in_statements(df, engine, table_name)
+    if strategy == "copy":
+        return load_data_copy(df, engine, table_name)
+    if strategy == "transactional":
+        return load_data_transactional(df, engine, table_name)
+    return load_data_parallel(df, engine, table_name, workers=workers)
+
+
+class Timings:
+    """
+    Accumulates seconds and rows per benchmark over the chunks of one run.
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    def add(self, name, seconds, rows, **extra):
+        result = self.results.setdefault(name, {"benchmark": name, "seconds": 0.0, "rows": 0})
+        result["seconds"] += seconds
+        result["rows"] += rows
+        for key, value in extra.items():
+            result[key] = result.get(key, 0) + value
+
+    def timed(self, name, func, rows, *args, **kwargs):
+        start = time.perf_counter()
+        output = func(*args, **kwargs)
+        self.add(name, time.perf_counter() - start, rows)
+        return output
+
+    def as_list(self):
+        for result in self.results.values():
+            result["rows_per_second"] = result["rows"] / result["seconds"] if result["seconds"] else None
+        return list(self.results.values())
+
+
+def bench_decode(timings, raw):
+    """
+    Times both ways of turning raw /eod pages into a frame: json.loads + pd.json_normalize, and the columnar decoder.
+    """
+    pages = [make_eod_page(raw.iloc[start:start + PAGE_ROWS], start, len(raw)) for start in range(0, len(raw), PAGE_ROWS)]
+    size = sum(len(page) for page in pages)
+
+    def json_normalize():
+        records = []
+        for page in pages:
+            records.extend(json.loads(page)["data"])
+        return pd.json_normalize(records)
+
+    def columnar():
+        columns = None
+        for page in pages:
+            _, columns = decode_eod_page(page, columns)
+        return columns.to_dataframe()
+
+    for name, decode in (("decode:json_normalize", json_normalize), ("decode:columnar", columnar)):
+        start = time.perf_counter()
+        decode()
+        timings.add(name, time.perf_counter() - start, len(raw), payload_bytes=size)
+
+
+def table_rows(engine, table_name):
+    return engine.execute(f'SELECT count(*) FROM "{table_name}"').scalar()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args, engine):
+    """
+    Streams the synthetic data in chunks: each chunk is decoded (up to --decode-rows), transformed,
+    then loaded with every strategy into its own table. With --reload the same data is loaded a second
+    time, which measures the all-unchanged upsert path.
+    """
+    timings = Timings()
+    strategies = [strategy for strategy in args.loads.split(",") if strategy] if engine is not None else []
+    tables = {strategy: f"{args.table_prefix}_{strategy}" for strategy in strategies}
+    for table_name in tables.values():
+        engine.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+
+    passes = ["load"] + (["reload"] if args.reload else [])
+    decoded = 0
+    for load_pass in passes:
+        for raw in iter_eod_frames(args.rows, args.symbols, args.chunk_rows, args.seed):
+            if load_pass == "load":
+                if decoded < args.decode_rows:
+                    bench_decode(timings, raw.iloc[:args.decode_rows - decoded])
+                    decoded += min(len(raw), args.decode_rows - decoded)
+                timings.timed("transform:transform_data", transform_data, len(raw), raw)
+            df = timings.timed("transform:transform_data_compact", transform_data_compact, len(raw), raw) \
+                if load_pass == "load" else transform_data_compact(raw)
+
+            for strategy, table_name in tables.items():
+                start = time.perf_counter()
+                result = load_with(strategy, df, engine, table_name, args.workers)
+                extra = {}
+                if isinstance(result, LoadResult):
+                    extra = {"inserted": result.inserted, "updated": result.updated, "unchanged": result.unchanged}
+                timings.add(f"{load_pass}:{strategy}", time.perf_counter() - start, len(df), **extra)
+
+    results = timings.as_list()
+    for result in results:
+        load_pass, _, strategy = result["benchmark"].partition(":")
+        if load_pass in passes and strategy in tables:
+            # A load that silently dropped rows must not look fast
+            result["rows_in_table"] = table_rows(engine, tables[strategy])
+            result["verified"] = result["rows_in_table"] == args.rows
+    if not args.keep_tables:
+        for table_name in tables.values():
+            engine.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+    return results
+
+
+def compare(results, baseline_path):
+    """
+    Prints rows/s of each benchmark against a previous results file.
+    """
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {result["benchmark"]: result for result in json.load(file)["results"]}
+    print(f"{'benchmark':<36} {'baseline rows/s':>16} {'rows/s':>12} {'change':>8}")
+    for result in results:
+        before = baseline.get(result["benchmark"], {}).get("rows_per_second")
+        after = result.get("rows_per_second")
+        if before and after:
+            print(f"{result['benchmark']:<36} {before:16,.0f} {after:12,.0f} {after / before - 1:+8.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark decode, transform and every load strategy on synthetic EOD data.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Total rows, e.g. 10000 to 50000000")
+    parser.add_argument("--symbols", type=int, default=50, help="Distinct symbols, e.g. 5 to 5000")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000, help="Rows generated and processed at a time")
+    parser.add_argument("--decode-rows", type=int, default=1_000_000, help="Rows rendered as JSON pages and decoded")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--loads", default=",".join(LOAD_STRATEGIES), help="Comma-separated load strategies")
+    parser.add_argument("--workers", type=int, default=4, help="Workers of the parallel load")
+    parser.add_argument("--reload", action="store_true", help="Load the same data twice (the unchanged-rows path)")
+    parser.add_argument("--no-db", action="store_true", help="Only decode and transform")
+    parser.add_argument("--table-prefix", default="bench_stocks")
+    parser.add_argument("--keep-tables", action="store_true")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/<commit>-<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare rows/s against")
+    args = parser.parse_args()
+
+    # Same DB_* variables as the pipeline, plus DB_PORT for a local Postgres
+    engine = None
+    if not args.no_db:
+        engine = get_engine(
+            os.getenv("DB_USER"), os.getenv("DB_PASSWORD"), os.getenv("DB_SERVER_NAME"), os.getenv("DB_DATABASE_NAME"),
+            port=int(os.getenv("DB_PORT", 5432)),
+        )
+
+    started_at = datetime.now(timezone.utc)
+    results = run_benchmarks(args, engine)
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "started_at": started_at.isoformat(),
+            "rows": args.rows,
+            "symbols": args.symbols,
+            "chunk_rows": args.chunk_rows,
+            "seed": args.seed,
+            "workers": args.workers,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "pyarrow": pyarrow.__version__,
+            "sqlalchemy": sqlalchemy.__version__,
+            "postgres": engine.execute("SHOW server_version").scalar() if engine is not None else None,
+            "cpus": os.cpu_count(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"{commit or 'nocommit'}-{started_at:%Y%m%dT%H%M%SZ}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    for result in results:
+        rate = f"{result['rows_per_second']:12,.0f} rows/s" if result.get("rows_per_second") else ""
+        check = "" if result.get("verified", True) else f"  ROW COUNT MISMATCH ({result['rows_in_table']})"
+        print(f"{result['benchmark']:<36} {result['seconds']:9.2f} s {rate}{check}")
+    print(f"Results written to {output}")
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,40 @@
+# --------------------
+# Import Statements
+# --------------------
+import argparse
+import time
+import tracemalloc
+from assets.extract_transform import transform_data, transform_data_compact
+from benchmarks.synthetic import make_eod_frame
+
+# --------------------
+# Transform Benchmark
+# --------------------
+def measure(transform, df):
+    """
+    Returns (seconds, peak traced MB, output MB) for `transform`.
+    Timing and memory come from separate runs, since tracemalloc slows allocation-heavy code down.
+    """
+    start = time.perf_counter()
+    result = transform(df)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    transform(df)
+    peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return seconds, peak_mb, result.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare transform_data and transform_data_compact.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    args = parser.parse_args()
+
+    df = make_eod_frame(args.rows, args.symbols)
+    print(f"Input: {len(df)} rows, {args.symbols} symbols, {df.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB")
+
+    for transform in (transform_data, transform_data_compact):
+        seconds, peak_mb, output_mb = measure(transform, df)
+        print(f"{transform.__name__:<24} {seconds:8.2f} s  peak {peak_mb:8.1f} MB  output {output_mb:8.1f} MB")
@@ -0,0 +1,279 @@
+# --------------------
+# Import Statements
+# --------------------
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+import numpy as np
+import pandas as pd
+from aiohttp import web
+from pipelines.trading_calendar import TradingCalendar
+
+# First bar served for every symbol
+DATA_START = date(2000, 1, 3)
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+EOD_FIELDS = [
+    "open", "high", "low", "close", "volume", "adj_high", "adj_low", "adj_close", "adj_open", "adj_volume",
+    "split_factor", "dividend", "symbol", "exchange", "date",
+]
+
+
+@dataclass
+class ServerConfig:
+    """
+    Behaviour of the stand-in.
+    - seed: changes every generated price (the same seed always serves the same data)
+    - end_date: last trading day served (default today)
+    - requests_per_second / burst: per access key token bucket; excess requests get 429
+    - latency_ms / jitter_ms: added to every /eod response
+    - error_rate / error_status: fraction of /eod requests answered with a server error
+    - retry_after: send a Retry-After header with 429s
+    """
+    seed: int = 0
+    end_date: str = None
+    requests_per_second: float = None
+    burst: float = None
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    retry_after: bool = False
+
+# --------------------
+# Deterministic Data
+# --------------------
+def hash_unit(keys: np.ndarray) -> np.ndarray:
+    """
+    Maps uint64 keys to uniform floats in [0, 1) with the splitmix64 finalizer: the same key, the same value.
+    """
+    with np.errstate(over="ignore"):
+        z = keys.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / 2.0 ** 53
+
+
+def trading_days(end_date: date) -> np.ndarray:
+    """
+    Trading days from DATA_START to end_date (inclusive) on the exchange calendar, as datetime64[D].
+    """
+    calendar = TradingCalendar()
+    days = pd.date_range(DATA_START, end_date, freq="B")
+    return np.array([day for day in days.date if calendar.is_trading_day(day)], dtype="datetime64[D]")
+
+
+def make_bars(symbols: list, day_index: np.ndarray, symbol_index: np.ndarray, days: np.ndarray, seed: int) -> pd.DataFrame:
+    """
+    Generates the bars of (symbols[symbol_index[i]], days[day_index[i]]) as MarketStack EOD records.
+    Every value is a pure function of (seed, symbol, day), so pages can be generated in any order.
+    """
+    symbol_keys = np.array([zlib.crc32(symbol.encode("utf-8")) for symbol in symbols], dtype=np.uint64)[symbol_index]
+    symbol_keys = symbol_keys ^ (np.uint64(seed & 0xFFFFFFFF) << np.uint64(32))
+
+    def unit(salt, keys):
+        return hash_unit(keys ^ (np.uint64(salt) << np.uint64(56)))
+
+    day_keys = (symbol_keys << np.uint64(20)) ^ day_index.astype(np.uint64)
+    base = 20 + 480 * unit(1, symbol_keys)
+    period = 250 + 500 * unit(2, symbol_keys)
+    phase = 2 * math.pi * unit(3, symbol_keys)
+    close = base * np.exp(0.4 * np.sin(2 * math.pi * day_index / period + phase)) * (1 + 0.04 * (unit(4, day_keys) - 0.5))
+    open_ = close * (1 + 0.02 * (unit(5, day_keys) - 0.5))
+    high = np.maximum(open_, close) * (1 + 0.01 * unit(6, day_keys))
+    low = np.minimum(open_, close) * (1 - 0.01 * unit(7, day_keys))
+    volume = np.round(1e5 + 1e8 * unit(8, day_keys))
+    dividend = np.where(unit(9, day_keys) < 0.01, 0.25, 0.0)
+
+    open_, high, low, close = (np.round(values, 2) for values in (open_, high, low, close))
+    dates = pd.DatetimeIndex(days[day_index]).strftime("%Y-%m-%dT00:00:00+0000")
+    return pd.DataFrame(
+        {
+            "open": open_, "high": high, "low": low, "close": close, "volume": volume,
+            "adj_high": high, "adj_low": low, "adj_close": close, "adj_open": open_, "adj_volume": volume,
+            "split_factor": 1.0, "dividend": dividend,
+            "symbol": np.array(symbols, dtype=object)[symbol_index], "exchange": "XNAS", "date": dates,
+        },
+        columns=EOD_FIELDS,
+    )
+
+# --------------------
+# /eod Handler
+# --------------------
+def error_response(status: int, code: str, message: str, headers: dict = None) -> web.Response:
+    return web.json_response({"error": {"code": code, "message": message}}, status=status, headers=headers)
+
+
+def parse_day(value: str) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+class MarketStackStandIn:
+    """
+    A local /eod endpoint following MarketStack's contract.
+    - access_key and symbols (comma-separated, any ticker) are required
+    - date_from / date_to (inclusive), sort=DESC (default) or ASC, limit (default 100, max 1000) and offset
+    - Records are ordered by date, then by the order of `symbols`; pagination.total counts every match
+    - Bars exist for every symbol on every trading day of the exchange calendar from DATA_START
+    GET /stats reports request, throttle and injected-error counts.
+    """
+
+    def __init__(self, config: ServerConfig = None):
+        self.config = config or ServerConfig()
+        end_date = pd.Timestamp(self.config.end_date).date() if self.config.end_date else date.today()
+        self.days = trading_days(end_date)
+        self.random = random.Random(self.config.seed)
+        self.buckets = {}
+        self.stats = {"requests": 0, "served": 0, "rows": 0, "throttled": 0, "errors": 0, "rejected": 0}
+
+    def take_token(self, access_key: str):
+        """
+        Returns 0 if the key may make a request now, or the seconds until its next token.
+        """
+        rate = self.config.requests_per_second
+        if not rate:
+            return 0.0
+        capacity = self.config.burst or max(1.0, rate)
+        now = time.monotonic()
+        tokens, updated_at = self.buckets.get(access_key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        if tokens < 1:
+            self.buckets[access_key] = (tokens, now)
+            return (1 - tokens) / rate
+        self.buckets[access_key] = (tokens - 1, now)
+        return 0.0
+
+    async def eod(self, request: web.Request) -> web.Response:
+        config = self.config
+        query = request.query
+        self.stats["requests"] += 1
+
+        if config.latency_ms or config.jitter_ms:
+            await asyncio.sleep((config.latency_ms + config.jitter_ms * self.random.random()) / 1000)
+
+        access_key = query.get("access_key")
+        if not access_key:
+            self.stats["rejected"] += 1
+            return error_response(401, "missing_access_key", "You have not supplied an API Access Key.")
+
+        wait = self.take_token(access_key)
+        if wait:
+            self.stats["throttled"] += 1
+            headers = {"Retry-After": str(max(1, math.ceil(wait)))} if config.retry_after else None
+            return error_response(429, "rate_limit_reached", "You have exceeded the maximum rate limitation allowed.", headers)
+
+        if config.error_rate and self.random.random() < config.error_rate:
+            self.stats["errors"] += 1
+            return error_response(config.error_status, "internal_error", "Injected error.")
+
+        try:
+            symbols = [symbol for symbol in query.get("symbols", "").split(",") if symbol]
+            limit = min(int(query.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+            offset = int(query.get("offset", 0))
+            sort = query.get("sort", "DESC").upper()
+            date_from = parse_day(query["date_from"]) if query.get("date_from") else None
+            date_to = parse_day(query["date_to"]) if query.get("date_to") else None
+            if not symbols or limit < 1 or offset < 0 or sort not in ("ASC", "DESC"):
+                raise ValueError("symbols, limit, offset or sort")
+        except (ValueError, TypeError) as e:
+            self.stats["rejected"] += 1
+            return error_response(422, "validation_error", f"Request failed with validation error: {e}")
+
+        low = 0 if date_from is None else int(np.searchsorted(self.days, date_from, side="left"))
+        high = len(self.days) if date_to is None else int(np.searchsorted(self.days, date_to, side="right"))
+        day_count = max(0, high - low)
+        total = day_count * len(symbols)
+
+        # Row k of the result is day k // len(symbols), symbol k % len(symbols), counted from the sort's first day
+        rows = np.arange(offset, min(offset + limit, total), dtype=np.int64)
+        day_offset = rows // len(symbols)
+        day_index = low + day_offset if sort == "ASC" else high - 1 - day_offset
+        bars = make_bars(symbols, day_index, rows % len(symbols), self.days, config.seed)
+
+        self.stats["served"] += 1
+        self.stats["rows"] += len(bars)
+        pagination = {"limit": limit, "offset": offset, "count": len(bars), "total": total}
+        body = '{"pagination":' + json.dumps(pagination) + ',"data":' + bars.to_json(orient="records") + "}"
+        return web.Response(text=body, content_type="application/json")
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v1/eod", self.eod)
+        app.router.add_get("/eod", self.eod)
+        app.router.add_get("/stats", self.stats_handler)
+        return app
+
+
+@contextmanager
+def serve_in_thread(config: ServerConfig = None, host: str = "127.0.0.1", port: int = 0):
+    """
+    Runs a stand-in on a background thread and yields its base URL (for MARKETSTACK_BASE_URL) and the server.
+    port=0 picks a free port.
+    """
+    server = MarketStackStandIn(config)
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(server.make_app())
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, host, port).start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name="marketstack-stand-in", daemon=True)
+    thread.start()
+    started.wait()
+    try:
+        bound_host, bound_port = runner.addresses[0][:2]
+        yield f"http://{bound_host}:{bound_port}/v1", server
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for MarketStack's /eod endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end-date", help="Last trading day served (default today)")
+    parser.add_argument("--requests-per-second", type=float, help="Per access key; excess requests get 429")
+    parser.add_argument("--burst", type=float)
+    parser.add_argument("--retry-after", action="store_true", help="Send Retry-After with 429s")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=500)
+    args = parser.parse_args()
+
+    config = ServerConfig(
+        seed=args.seed,
+        end_date=args.end_date,
+        requests_per_second=args.requests_per_second,
+        burst=args.burst,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+    )
+    print(f"MarketStack stand-in on http://{args.host}:{args.port}/v1 (set MARKETSTACK_BASE_URL to this)")
+    web.run_app(MarketStackStandIn(config).make_app(), host=args.host, port=args.port, print=None)
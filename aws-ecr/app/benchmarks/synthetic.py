@@ -0,0 +1,74 @@
+# --------------------
+# Import Statements
+# --------------------
+import json
+import numpy as np
+import pandas as pd
+
+# Days from 2000-01-01 that pandas timestamps can represent (up to 2262)
+MAX_DAYS = 95_000
+
+# --------------------
+# Synthetic MarketStack Data
+# --------------------
+def make_symbols(count: int) -> np.ndarray:
+    """
+    Returns `count` distinct ticker-like symbols (S0000, S0001, ...).
+    """
+    return np.array([f"S{i:04d}" for i in range(count)], dtype=object)
+
+
+def make_eod_frame(rows: int, symbols: int = 5, seed: int = 42, start: int = 0) -> pd.DataFrame:
+    """
+    Builds a frame shaped like pd.json_normalize over MarketStack EOD records:
+    object-dtype strings, ISO dates with a +0000 offset, one bar per symbol per day.
+    `start` offsets into the same row sequence, so consecutive chunks (start=0, rows, 2*rows, ...)
+    together equal one large frame's layout. The same arguments always return the same data.
+    """
+    rng = np.random.default_rng(seed if not start else [seed, start])
+    index = np.arange(start, start + rows)
+    first_day, last_day = start // symbols, (start + max(rows, 1) - 1) // symbols
+    if last_day >= MAX_DAYS:
+        raise ValueError(f"{start + rows} rows of {symbols} symbols span more than {MAX_DAYS} days; use more symbols.")
+    day_strings = pd.date_range("2000-01-01", periods=last_day + 1, freq="D")[first_day:].strftime("%Y-%m-%dT00:00:00+0000")
+
+    symbol = make_symbols(symbols)[index % symbols]
+    date = day_strings.values.astype(object)[index // symbols - first_day]
+    open_ = np.round(rng.uniform(10, 500, rows), 2)
+
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.round(open_ * 1.02, 2),
+            "low": np.round(open_ * 0.98, 2),
+            "close": np.round(open_ * rng.uniform(0.97, 1.03, rows), 2),
+            "volume": np.round(rng.uniform(1e5, 1e8, rows)),
+            "adj_high": None,
+            "adj_low": None,
+            "adj_close": open_,
+            "adj_open": None,
+            "adj_volume": None,
+            "split_factor": 1.0,
+            "dividend": np.where(rng.random(rows) < 0.01, 0.25, 0.0),
+            "symbol": symbol,
+            "exchange": "XNAS",
+            "date": date,
+        }
+    )
+
+
+def iter_eod_frames(rows: int, symbols: int = 5, chunk_rows: int = 1_000_000, seed: int = 42):
+    """
+    Yields make_eod_frame chunks of at most `chunk_rows` that together make up `rows` rows,
+    so sizes far beyond memory (tens of millions of rows) can be streamed.
+    """
+    for start in range(0, rows, chunk_rows):
+        yield make_eod_frame(min(chunk_rows, rows - start), symbols, seed, start)
+
+
+def make_eod_page(df: pd.DataFrame, offset: int = 0, total: int = None, limit: int = 1000) -> str:
+    """
+    Renders a frame as the raw body of one MarketStack /eod page: a pagination block and the `data` records.
+    """
+    pagination = {"limit": limit, "offset": offset, "count": len(df), "total": len(df) if total is None else total}
+    return '{"pagination":' + json.dumps(pagination) + ',"data":' + df.to_json(orient="records") + "}"
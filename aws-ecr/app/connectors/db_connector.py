@@ -1,56 +1,106 @@
 # --------------------
 # Import Statements
 # --------------------
-from sqlalchemy import create_engine, Table, Column, String, MetaData, Float, DateTime
-from sqlalchemy.engine import URL
+import random
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from sqlalchemy import inspect, select, func, table, column
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy import exc
+from connectors.pool import build_url, get_pooled_engine
+from connectors.pg_copy import (
+    COPY_CHUNK_ROWS, build_merge_statement, build_upsert_sql, copy_csv_chunks, create_staging_table,
+    iter_arrow_csv_chunks, iter_csv_chunks,
+)
+from connectors.schema import (
+    create_stocks_table, ensure_partitions, get_partitioning, get_table_key, is_partitioned
+)
 
 # --------------------
 # Database Connection
 # --------------------
-def get_engine(db_user, db_password, db_server_name, db_database_name, port=5433):
+def get_engine(db_user, db_password, db_server_name, db_database_name, port=5433, pool_config=None):
     """
-    Creates and returns a SQLAlchemy engine using pg8000 as the driver.
+    Returns the shared SQLAlchemy engine (pg8000 driver) for these credentials.
+    Engines come from the process-wide registry in connectors.pool, so repeated calls reuse one pool.
     """
-    connection_url = URL.create(
-        drivername="postgresql+pg8000",  # Ensure pg8000 is used
-        username=db_user,
-        password=db_password,
-        host=db_server_name, 
-        port=port,
-        database=db_database_name
+    connection_url = build_url(db_user, db_password, db_server_name, db_database_name, port)
+    return get_pooled_engine(connection_url, pool_config)
+
+# --------------------
+# Table Definition
+# --------------------
+def prepare_stocks_table(engine, df, table_name="stocks"):
+    """
+    Returns the Table definition matching the target as it exists in the database
+    (partitioning and key), creating it with the original layout on first use.
+    For a partitioned table, the partitions the DataFrame's dates fall into are created first,
+    so the upsert routes into them.
+    Raises ValueError if the DataFrame lacks one of the table's columns (e.g. unique_id).
+    """
+    partition_by = get_partitioning(engine, table_name)
+    stocks_table = create_stocks_table(engine, table_name, partition_by, get_table_key(engine, table_name) or "unique_id")
+
+    missing = [col.name for col in stocks_table.columns if col.name not in df.columns]
+    if missing and not df.empty:
+        raise ValueError(f"Data has no {', '.join(missing)} column(s) required by table {table_name}")
+    if partition_by is not None and not df.empty:
+        ensure_partitions(engine, table_name, df["date"].min(), df["date"].max(), partition_by)
+    return stocks_table
+
+# --------------------
+# DataFrame Conversion
+# --------------------
+def dataframe_to_records(df):
+    """
+    Converts a DataFrame to a list of dicts with plain Python values.
+    Missing values (NaN, NaT, pd.NA) become None, which the driver sends as NULL.
+    """
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+def dataframe_to_arrays(df, columns):
+    """
+    Converts the given columns to a tuple of lists of plain Python values, one list per column.
+    Missing values become None.
+    """
+    return tuple(df[column].astype(object).where(df[column].notna(), None).tolist() for column in columns)
+
+# --------------------
+# Read High-Watermarks
+# --------------------
+def get_high_watermarks(engine, table_name="stocks"):
+    """
+    Returns {symbol: max(date)} for every symbol already loaded into the target table.
+    Returns an empty dict when the table does not exist yet (first run).
+    """
+    if not inspect(engine).has_table(table_name):
+        return {}
+
+    stocks_table = table(table_name, column("symbol"), column("date"))
+    query = (
+        select(stocks_table.c.symbol, func.max(stocks_table.c.date))
+        .group_by(stocks_table.c.symbol)
     )
-    engine = create_engine(connection_url)
-    return engine
+
+    with engine.connect() as conn:
+        return {symbol: max_date for symbol, max_date in conn.execute(query) if max_date is not None}
 
 # --------------------
 # Load Data into PostgreSQL
 # --------------------
-def load_data(df_stocks_selected, engine):
+def load_data(df_stocks_selected, engine, table_name="stocks"):
     """
     Loads the transformed data into PostgreSQL using bulk upsert logic.
     """
-    # Define metadata and table schema
-    meta = MetaData()
-
-    stocks_table = Table(
-        "stocks", meta, 
-        Column("unique_id", String, primary_key=True),  # Primary key
-        Column("open", Float),
-        Column("close", Float),
-        Column("volume", Float),
-        Column("dividend", Float),
-        Column("symbol", String),
-        Column("exchange", String),
-        Column("date", DateTime(timezone=True))
-    )
+    # Table schema as it exists in the database (created if missing)
+    stocks_table = prepare_stocks_table(engine, df_stocks_selected, table_name)
+    key_columns = [col.name for col in stocks_table.primary_key.columns]
 
-    # Create table if not exists
-    meta.create_all(engine)
-
-    # Convert DataFrame to dictionary
-    data_to_insert = df_stocks_selected.to_dict(orient='records')
+    # Convert the table's columns to dictionaries
+    table_columns = [col.name for col in stocks_table.columns]
+    data_to_insert = dataframe_to_records(df_stocks_selected.loc[:, table_columns]) if not df_stocks_selected.empty else []
 
     # Ensure data exists
     if not data_to_insert:
@@ -64,8 +114,8 @@ def load_data(df_stocks_selected, engine):
 
             # Upsert logic
             upsert_statement = insert_statement.on_conflict_do_update(
-                index_elements=['unique_id'], 
-                set_={col.name: col for col in insert_statement.excluded if col.name != 'unique_id'}
+                index_elements=key_columns,
+                set_={col.name: col for col in insert_statement.excluded if col.name not in key_columns}
             )
 
             conn.execute(upsert_statement)
@@ -73,3 +123,321 @@ def load_data(df_stocks_selected, engine):
 
         except exc.SQLAlchemyError as e:
             print(f"Error during bulk upsert: {e}")
+
+# --------------------
+# Load Results
+# --------------------
+@dataclass
+class LoadResult:
+    """
+    Row counts of one load: new keys inserted, existing keys rewritten, and rows skipped as unchanged.
+    """
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def rows(self):
+        return self.inserted + self.updated + self.unchanged
+
+    def __add__(self, other):
+        return LoadResult(
+            self.inserted + other.inserted, self.updated + other.updated, self.unchanged + other.unchanged
+        )
+
+# --------------------
+# Load Data with COPY
+# --------------------
+def load_data_copy(df_stocks_selected, engine, table_name="stocks", chunk_rows=COPY_CHUNK_ROWS, skip_unchanged=True):
+    """
+    Loads the transformed data into PostgreSQL through a staging table.
+    - Streams the DataFrame into a temporary table with COPY FROM STDIN (CSV)
+    - Merges it into the target with one INSERT ... SELECT ... ON CONFLICT DO UPDATE
+    - With skip_unchanged, only new or actually changed bars are written
+    Runs in a single transaction and needs no parameter-limit batching.
+    Returns a LoadResult with the inserted, updated and unchanged counts.
+    """
+    if df_stocks_selected.empty:
+        print("No data to insert.")
+        return LoadResult()
+
+    stocks_table = prepare_stocks_table(engine, df_stocks_selected, table_name)
+
+    columns = [col.name for col in stocks_table.columns]
+    key_columns = [col.name for col in stocks_table.primary_key.columns]
+    staging_name = f"{table_name}_staging"
+
+    preparer = engine.dialect.identifier_preparer
+    merge_statement = build_merge_statement(
+        preparer, table_name, staging_name, columns, key_columns,
+        skip_unchanged=skip_unchanged, partitioned=is_partitioned(stocks_table),
+    )
+
+    with engine.begin() as conn:
+        create_staging_table(conn, table_name, staging_name)
+        copy_csv_chunks(conn, staging_name, columns, iter_csv_chunks(df_stocks_selected, columns, chunk_rows))
+        inserted, updated, staged = conn.exec_driver_sql(merge_statement).one()
+
+    result = LoadResult(inserted=inserted, updated=updated, unchanged=staged - inserted - updated)
+    print(
+        f"COPY upsert completed successfully. "
+        f"({result.inserted} inserted, {result.updated} updated, {result.unchanged} unchanged)"
+    )
+    return result
+
+# --------------------
+# Transactional Batched Load
+# --------------------
+class LoadError(Exception):
+    """
+    Raised when a load fails. `result` holds the counts that were committed before the failure
+    (always empty when the whole load runs in one transaction).
+    """
+
+    def __init__(self, message, result):
+        super().__init__(message)
+        self.result = result
+
+
+def build_unnest_upsert_sql(engine, stocks_table, skip_unchanged=True):
+    """
+    Builds the upsert that reads its rows from unnest() over one array parameter per column.
+    Arrays are bound as typed parameters, e.g. %s::VARCHAR[].
+    """
+    columns = [col.name for col in stocks_table.columns]
+    key_columns = [col.name for col in stocks_table.primary_key.columns]
+    array_params = ", ".join(f"%s::{col.type.compile(dialect=engine.dialect)}[]" for col in stocks_table.columns)
+    return build_upsert_sql(
+        engine.dialect.identifier_preparer,
+        stocks_table.name,
+        f"SELECT * FROM unnest({array_params})",
+        columns,
+        key_columns,
+        skip_unchanged,
+        is_partitioned(stocks_table),
+    )
+
+
+def upsert_array_batch(conn, upsert_sql, batch, columns):
+    """
+    Runs one unnest upsert for the batch and returns its LoadResult.
+    """
+    arrays = dataframe_to_arrays(batch, columns)
+    inserted_flags = [row[0] for row in conn.exec_driver_sql(upsert_sql, [arrays])]
+    inserted = sum(inserted_flags)
+    return LoadResult(
+        inserted=inserted,
+        updated=len(inserted_flags) - inserted,
+        unchanged=len(batch) - len(inserted_flags),
+    )
+
+
+def load_data_transactional(
+    df_stocks_selected, engine, table_name="stocks", batch_size=5000, commit_every=None, skip_unchanged=True
+):
+    """
+    Loads the transformed data with batched upserts on a single connection.
+    - Each batch is one INSERT ... SELECT FROM unnest(...) with one array parameter per column,
+      so the statement shape and parameter count do not grow with the batch
+    - commit_every=None runs every batch in one transaction: the load is all or nothing
+    - commit_every=N commits after every N batches, bounding transaction size on huge backfills
+    Returns a LoadResult; raises LoadError (with the committed counts) on failure.
+    """
+    if df_stocks_selected.empty:
+        print("No data to insert.")
+        return LoadResult()
+
+    stocks_table = prepare_stocks_table(engine, df_stocks_selected, table_name)
+
+    columns = [col.name for col in stocks_table.columns]
+    key_columns = [col.name for col in stocks_table.primary_key.columns]
+    upsert_sql = build_unnest_upsert_sql(engine, stocks_table, skip_unchanged)
+
+    # ON CONFLICT cannot update the same row twice in one statement
+    df_load = df_stocks_selected.drop_duplicates(subset=key_columns, keep="last")
+    batch_starts = list(range(0, len(df_load), batch_size))
+    group_size = commit_every or len(batch_starts)
+
+    committed = LoadResult()
+    with engine.connect() as conn:
+        for group_start in range(0, len(batch_starts), group_size):
+            group = LoadResult()
+            try:
+                with conn.begin():
+                    for start in batch_starts[group_start:group_start + group_size]:
+                        batch = df_load.iloc[start:start + batch_size]
+                        group = group + upsert_array_batch(conn, upsert_sql, batch, columns)
+            except exc.SQLAlchemyError as e:
+                raise LoadError(f"Error during transactional load: {e}", committed) from e
+            committed = committed + group
+
+    print(
+        f"Transactional upsert completed successfully. "
+        f"({committed.inserted} inserted, {committed.updated} updated, {committed.unchanged} unchanged)"
+    )
+    return committed
+
+# --------------------
+# Parallel Load by Symbol
+# --------------------
+# SQLSTATEs worth retrying: deadlock, serialization failure, lock timeout
+RETRYABLE_SQLSTATES = {"40P01", "40001", "55P03"}
+
+
+def partition_by_symbol(df, partition_rows):
+    """
+    Splits the transformed data into partitions of whole symbols of about `partition_rows` rows each.
+    Rows are sorted by (symbol, date), so every worker takes index locks in key order.
+    Returns a list of (symbols, frame), largest first so the longest partitions start early.
+    """
+    symbols = df["symbol"].astype(str)
+    df = df.iloc[np.lexsort((df["date"].values, symbols.values))]
+    symbol_rows = symbols.value_counts(sort=False).sort_index()
+
+    partitions = []
+    start = 0
+    symbols = []
+    rows = 0
+    for symbol, count in symbol_rows.items():
+        symbols.append(symbol)
+        rows += count
+        if rows >= partition_rows:
+            partitions.append((symbols, df.iloc[start:start + rows]))
+            start += rows
+            symbols = []
+            rows = 0
+    if symbols:
+        partitions.append((symbols, df.iloc[start:start + rows]))
+    return sorted(partitions, key=lambda partition: len(partition[1]), reverse=True)
+
+
+def is_retryable_load_error(error):
+    """
+    True for connection drops and for deadlock / serialization / lock-timeout failures.
+    """
+    if isinstance(error, exc.DBAPIError) and error.connection_invalidated:
+        return True
+    orig = getattr(error, "orig", None)
+    details = orig.args[0] if orig is not None and orig.args else None
+    return isinstance(details, dict) and details.get("C") in RETRYABLE_SQLSTATES
+
+
+def load_partition(engine, upsert_sql, symbols, frame, columns, batch_size, lock_timeout, max_retries, base_delay):
+    """
+    Upserts one partition's rows in a single transaction on its own pooled connection,
+    retrying the whole partition on retryable errors.
+    """
+    attempt = 0
+    while True:
+        try:
+            with engine.begin() as conn:
+                # Fail fast instead of queueing behind another worker's locks
+                conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{int(lock_timeout * 1000)}ms'")
+                result = LoadResult()
+                for start in range(0, len(frame), batch_size):
+                    result = result + upsert_array_batch(conn, upsert_sql, frame.iloc[start:start + batch_size], columns)
+                return result
+        except exc.SQLAlchemyError as e:
+            if attempt >= max_retries or not is_retryable_load_error(e):
+                raise
+            attempt += 1
+            delay = random.uniform(0, base_delay * 2 ** attempt)
+            print(f"Retrying partition {symbols[0]}..{symbols[-1]} in {delay:.2f}s (attempt {attempt}/{max_retries}): {e.__class__.__name__}")
+            time.sleep(delay)
+
+
+def load_data_parallel(
+    df_stocks_selected,
+    engine,
+    table_name="stocks",
+    workers=4,
+    batch_size=5000,
+    partition_rows=50_000,
+    max_retries=3,
+    lock_timeout=10.0,
+    base_delay=0.5,
+    skip_unchanged=True,
+):
+    """
+    Loads the transformed data with one worker thread per pooled connection, partitioned by symbol.
+    - Partitions hold whole symbols, about `partition_rows` rows each (smaller when needed to give
+      every worker one); every key starts with the symbol, so partitions never touch the same keys
+    - Each partition is its own transaction, sorted by key, with a lock_timeout; deadlocks,
+      serialization failures, lock timeouts and dropped connections retry the partition with backoff
+    - `workers` is capped at the pool size so workers never queue on checkouts
+    Returns the summed LoadResult; raises LoadError (with the committed counts) if any partition
+    still fails after its retries. Partitions that succeeded stay committed.
+    """
+    if df_stocks_selected.empty:
+        print("No data to insert.")
+        return LoadResult()
+
+    stocks_table = prepare_stocks_table(engine, df_stocks_selected, table_name)
+
+    columns = [col.name for col in stocks_table.columns]
+    key_columns = [col.name for col in stocks_table.primary_key.columns]
+    upsert_sql = build_unnest_upsert_sql(engine, stocks_table, skip_unchanged)
+
+    # ON CONFLICT cannot update the same row twice in one statement
+    df_load = df_stocks_selected.drop_duplicates(subset=key_columns, keep="last")
+    partition_rows = max(1, min(partition_rows, -(-len(df_load) // max(1, workers))))
+    partitions = partition_by_symbol(df_load, partition_rows)
+    workers = max(1, min(workers, engine.pool.size(), len(partitions)))
+
+    symbol_count = sum(len(symbols) for symbols, _ in partitions)
+
+    committed = LoadResult()
+    failed = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                load_partition, engine, upsert_sql, symbols, frame, columns,
+                batch_size, lock_timeout, max_retries, base_delay,
+            ): symbols
+            for symbols, frame in partitions
+        }
+        for future in as_completed(futures):
+            try:
+                committed = committed + future.result()
+            except exc.SQLAlchemyError as e:
+                for symbol in futures[future]:
+                    failed[symbol] = e
+
+    print(
+        f"Parallel upsert finished on {workers} workers: {symbol_count - len(failed)}/{symbol_count} symbols loaded "
+        f"({committed.inserted} inserted, {committed.updated} updated, {committed.unchanged} unchanged)"
+    )
+    if failed:
+        raise LoadError(f"Parallel load failed for symbols: {', '.join(sorted(failed))}", committed)
+    return committed
+
+# --------------------
+# Load Arrow Batches with COPY
+# --------------------
+def load_batches_copy(batches, engine, table, replace=True):
+    """
+    Streams pyarrow RecordBatches into `table` (a SQLAlchemy Table) with COPY FROM STDIN, in one transaction.
+    - Batches are rendered to CSV one at a time, so memory is bounded by one batch
+    - replace=True truncates the table first. TRUNCATE takes an ACCESS EXCLUSIVE lock, so readers block until
+      the load commits (or rolls back) and then see the new rows; they never see an empty or partial table
+    Creates the table if it does not exist. Returns the number of rows copied.
+    """
+    table.metadata.create_all(engine)
+    columns = [col.name for col in table.columns]
+    preparer = engine.dialect.identifier_preparer
+
+    rows = 0
+
+    def counted(batches):
+        nonlocal rows
+        for batch in batches:
+            rows += batch.num_rows
+            yield batch
+
+    with engine.begin() as conn:
+        if replace:
+            conn.exec_driver_sql(f"TRUNCATE {preparer.quote(table.name)}")
+        copy_csv_chunks(conn, table.name, columns, iter_arrow_csv_chunks(counted(batches), columns))
+
+    print(f"COPY load into {table.name} completed successfully. ({rows} rows)")
+    return rows
@@ -0,0 +1,209 @@
+# --------------------
+# Import Statements
+# --------------------
+import io
+import math
+import numpy as np
+import pandas as pd
+import pyarrow.csv as pv
+
+# Rows rendered to CSV per chunk handed to the driver
+COPY_CHUNK_ROWS = 50_000
+
+# Added to staging tables; numbers rows in COPY order, so the last row of a duplicated key wins the merge
+STAGING_ROW_COLUMN = "staging_row"
+
+# --------------------
+# COPY FROM STDIN Helpers
+# --------------------
+def format_datetimes(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """
+    Returns `df[columns]` with datetime columns pre-rendered as ISO strings.
+    Each distinct timestamp is formatted once and picked by code, which is far cheaper
+    than to_csv formatting every row of a daily-bar table.
+    """
+    df = df.loc[:, columns]
+    for column in columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            codes, uniques = pd.factorize(df[column])
+            rendered = pd.Series(uniques.astype(str).values, dtype=object).take(codes).values
+            rendered[codes == -1] = None
+            df[column] = rendered
+    return df
+
+
+def render_csv_column(values: pd.Series) -> np.ndarray:
+    """
+    Renders one column as CSV fields, the same way csv_field renders single values:
+    missing values are unquoted empty fields (NULL) and text is always quoted, so '' stays ''.
+    """
+    missing = values.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        rendered = values.astype(object).astype(str).to_numpy(dtype=object)
+    else:
+        text = values.astype(object).where(~missing, "").astype(str)
+        rendered = ('"' + text.str.replace('"', '""', regex=False) + '"').to_numpy(dtype=object)
+    rendered[missing] = ""
+    return rendered
+
+
+def iter_csv_chunks(df: pd.DataFrame, columns: list, chunk_rows: int = COPY_CHUNK_ROWS):
+    """
+    Yields the DataFrame as headerless CSV text, `chunk_rows` rows at a time.
+    Missing values are written as unquoted empty fields, which COPY reads as NULL;
+    text values are quoted, so empty strings load as empty strings, as with INSERT.
+    """
+    df = format_datetimes(df, columns)
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        lines = render_csv_column(chunk[columns[0]])
+        for column in columns[1:]:
+            lines = lines + "," + render_csv_column(chunk[column])
+        yield "\n".join(lines) + "\n"
+
+
+def csv_field(value) -> str:
+    """
+    Renders one value as a COPY CSV field, from its Python type.
+    - None, NaN, NaT and pd.NA are unquoted empty fields (NULL); strings are always quoted, so '' stays ''
+    - Integers keep their integer form, whatever else the column holds in other rows
+    """
+    if value is None or value is pd.NaT or value is pd.NA or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def iter_record_csv_chunks(records, columns: list, chunk_rows: int = COPY_CHUNK_ROWS):
+    """
+    Yields any iterable of row dicts as headerless CSV text, read `chunk_rows` rows at a time.
+    Values are rendered one by one (see csv_field) rather than through a DataFrame, which would turn
+    an integer column holding a None into floats. Keys missing from a row are written as NULL.
+    """
+    lines = []
+    for record in records:
+        lines.append(",".join(csv_field(record.get(column)) for column in columns) + "\n")
+        if len(lines) == chunk_rows:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def iter_arrow_csv_chunks(batches, columns: list):
+    """
+    Renders pyarrow RecordBatches as headerless CSV bytes, one chunk per batch, with Arrow's CSV writer.
+    Nulls are written as unquoted empty fields (NULL to COPY) and strings are always quoted,
+    so empty strings stay empty strings. Dictionary columns are written as their values.
+    """
+    for batch in batches:
+        sink = io.BytesIO()
+        pv.write_csv(batch.select(columns), sink, pv.WriteOptions(include_header=False))
+        yield sink.getvalue()
+
+
+def copy_csv_chunks(conn, table_name: str, columns: list, chunks) -> None:
+    """
+    Streams CSV chunks into `table_name` with COPY ... FROM STDIN on the connection's open transaction.
+    `conn` is a SQLAlchemy Connection on the pg8000 driver, which accepts an iterable as the COPY stream.
+    """
+    preparer = conn.dialect.identifier_preparer
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    copy_statement = f"COPY {preparer.quote(table_name)} ({column_list}) FROM STDIN WITH (FORMAT csv)"
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(copy_statement, stream=chunks)
+    finally:
+        cursor.close()
+
+def create_staging_table(conn, table_name: str, staging_name: str) -> None:
+    """
+    Creates a temporary table with the columns of `table_name`, dropped at commit,
+    plus STAGING_ROW_COLUMN numbering the rows in the order they are copied in.
+    """
+    preparer = conn.dialect.identifier_preparer
+    staging = preparer.quote(staging_name)
+    conn.exec_driver_sql(
+        f"CREATE TEMPORARY TABLE {staging} (LIKE {preparer.quote(table_name)} INCLUDING DEFAULTS) ON COMMIT DROP"
+    )
+    conn.exec_driver_sql(f"ALTER TABLE {staging} ADD COLUMN {STAGING_ROW_COLUMN} BIGINT GENERATED ALWAYS AS IDENTITY")
+
+# --------------------
+# Upsert and Merge Statements
+# --------------------
+def build_upsert_ctes(preparer, table_name, source_sql, columns, key_columns, skip_unchanged=True, partitioned=False):
+    """
+    Builds the WITH list of an INSERT ... SELECT ... ON CONFLICT DO UPDATE, ending in a
+    `merged` CTE with one boolean `inserted` row per key written.
+    - `source_sql` is the SELECT producing the rows, one per key
+    - With skip_unchanged, the WHERE clause leaves rows whose values are identical untouched
+      (no new tuple, no WAL, no dead row to vacuum)
+    On plain tables, RETURNING (xmax = 0) tells an insert from an update. Partitioned tables cannot
+    return xmax, so with `partitioned` the keys that existed before the statement are probed instead
+    (every CTE sees the same snapshot).
+    """
+    target = preparer.quote(table_name)
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    key_list = ", ".join(preparer.quote(column) for column in key_columns)
+    value_columns = [preparer.quote(column) for column in columns if column not in key_columns]
+    update_list = ", ".join(f"{column} = EXCLUDED.{column}" for column in value_columns)
+
+    where_clause = ""
+    if skip_unchanged and value_columns:
+        where_clause = (
+            f" WHERE ({', '.join(f'{target}.{column}' for column in value_columns)})"
+            f" IS DISTINCT FROM ({', '.join(f'EXCLUDED.{column}' for column in value_columns)})"
+        )
+    on_conflict = f"ON CONFLICT ({key_list}) DO UPDATE SET {update_list}{where_clause}"
+
+    if not partitioned:
+        return f"merged AS (INSERT INTO {target} ({column_list}) {source_sql} {on_conflict} RETURNING (xmax = 0) AS inserted)"
+
+    return (
+        f"source ({column_list}) AS ({source_sql}), "
+        f"existing AS (SELECT {key_list} FROM {target} WHERE ({key_list}) IN (SELECT {key_list} FROM source)), "
+        f"upserted AS (INSERT INTO {target} ({column_list}) SELECT {column_list} FROM source {on_conflict} "
+        f"RETURNING {key_list}), "
+        f"merged AS (SELECT existing.{preparer.quote(key_columns[0])} IS NULL AS inserted "
+        f"FROM upserted LEFT JOIN existing USING ({key_list}))"
+    )
+
+
+def build_upsert_sql(preparer, table_name, source_sql, columns, key_columns, skip_unchanged=True, partitioned=False):
+    """
+    Builds the upsert as one statement returning an `inserted` flag per key written
+    (see build_upsert_ctes).
+    """
+    ctes = build_upsert_ctes(preparer, table_name, source_sql, columns, key_columns, skip_unchanged, partitioned)
+    return f"WITH {ctes} SELECT inserted FROM merged"
+
+
+def build_merge_statement(
+    preparer, table_name, staging_name, columns, key_columns, skip_unchanged=True, partitioned=False
+):
+    """
+    Builds the statement that merges a staging table (see create_staging_table) into the target.
+    ON CONFLICT cannot update the same row twice, so DISTINCT ON keeps one row per key:
+    the last one copied in, as the INSERT loaders do.
+    The statement returns one row with the inserted and updated counts, plus the staged key count.
+    """
+    staging = preparer.quote(staging_name)
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    key_list = ", ".join(preparer.quote(column) for column in key_columns)
+    source_sql = (
+        f"SELECT DISTINCT ON ({key_list}) {column_list} FROM {staging} "
+        f"ORDER BY {key_list}, {STAGING_ROW_COLUMN} DESC"
+    )
+    ctes = build_upsert_ctes(preparer, table_name, source_sql, columns, key_columns, skip_unchanged, partitioned)
+
+    return (
+        f"WITH {ctes} "
+        f"SELECT "
+        f"(SELECT count(*) FROM merged WHERE inserted), "
+        f"(SELECT count(*) FROM merged WHERE NOT inserted), "
+        f"(SELECT count(*) FROM (SELECT DISTINCT {key_list} FROM {staging}) AS staged_keys)"
+    )
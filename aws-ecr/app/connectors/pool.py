@@ -0,0 +1,149 @@
+# --------------------
+# Import Statements
+# --------------------
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict, astuple
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+from sqlalchemy.pool import QueuePool
+
+# --------------------
+# Pool Configuration
+# --------------------
+@dataclass
+class PoolConfig:
+    """
+    Connection pool settings shared by every connector.
+    """
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+
+    @classmethod
+    def from_env(cls):
+        """
+        Reads DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE and DB_POOL_PRE_PING.
+        """
+        defaults = cls()
+        return cls(
+            pool_size=int(os.getenv("DB_POOL_SIZE", defaults.pool_size)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", defaults.max_overflow)),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", defaults.pool_timeout)),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", defaults.pool_recycle)),
+            pool_pre_ping=os.getenv("DB_POOL_PRE_PING", str(defaults.pool_pre_ping)).lower() in ("1", "true", "yes"),
+        )
+
+# --------------------
+# Pool Metrics
+# --------------------
+class InstrumentedQueuePool(QueuePool):
+    """
+    A QueuePool that records how long each checkout waited for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait_seconds = time.perf_counter() - start
+            with self.metrics_lock:
+                self.checkouts += 1
+                self.total_wait_seconds += wait_seconds
+                self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def recreate(self):
+        # Keep the counters when the engine is disposed and the pool rebuilt
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.total_wait_seconds = self.total_wait_seconds
+        pool.max_wait_seconds = self.max_wait_seconds
+        return pool
+
+
+def pool_metrics(engine) -> dict:
+    """
+    Returns the pool state of an engine: connections in use, idle and in overflow,
+    plus checkout count and wait times for instrumented pools.
+    """
+    pool = engine.pool
+    metrics = {
+        "pool_size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool.metrics_lock:
+            metrics.update(
+                checkouts=pool.checkouts,
+                total_wait_seconds=pool.total_wait_seconds,
+                max_wait_seconds=pool.max_wait_seconds,
+                avg_wait_seconds=pool.total_wait_seconds / pool.checkouts if pool.checkouts else 0.0,
+            )
+    return metrics
+
+# --------------------
+# Engine Registry
+# --------------------
+# {DSN: {pool settings: engine}}, each DSN's first engine being its shared default
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def build_url(username, password, host, database, port=5432) -> URL:
+    """
+    Builds the pg8000 connection URL used by every connector.
+    """
+    return URL.create(
+        drivername="postgresql+pg8000",
+        username=username,
+        password=password,
+        host=host,
+        port=port,
+        database=database,
+    )
+
+
+def get_pooled_engine(connection_url: URL, config: PoolConfig = None):
+    """
+    Returns a process-wide engine for a DSN, creating it on first use.
+    - Without `config`, callers share the first engine registered for the DSN (created from the env if none),
+      so parallel loaders do not each open their own pool
+    - An explicit `config` gets the DSN's engine with exactly those settings: a caller asking for a small
+      dedicated pool (e.g. the run ledger) never silently inherits a bigger shared one
+    """
+    dsn = connection_url.render_as_string(hide_password=False)
+    with _engines_lock:
+        dsn_engines = _engines.setdefault(dsn, {})
+        if config is None:
+            if dsn_engines:
+                return next(iter(dsn_engines.values()))
+            config = PoolConfig.from_env()
+        engine = dsn_engines.get(astuple(config))
+        if engine is None:
+            engine = create_engine(connection_url, poolclass=InstrumentedQueuePool, **asdict(config))
+            dsn_engines[astuple(config)] = engine
+        return engine
+
+
+def dispose_engines() -> None:
+    """
+    Closes every pooled connection and empties the registry.
+    """
+    with _engines_lock:
+        for dsn_engines in _engines.values():
+            for engine in dsn_engines.values():
+                engine.dispose()
+        _engines.clear()
@@ -1,6 +1,52 @@
-from sqlalchemy import create_engine, Table, MetaData
-from sqlalchemy.engine import URL, CursorResult
+from itertools import islice
+from typing import Iterable
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import Table, MetaData, inspect, select, types
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.dialects import postgresql
+from connectors.pool import PoolConfig, build_url, get_pooled_engine, pool_metrics
+from connectors.pg_copy import build_merge_statement, copy_csv_chunks, create_staging_table, iter_record_csv_chunks
+from connectors.schema import is_partitioned
+
+# pg8000 sends the bind parameter count as a signed 16-bit integer
+PG8000_MAX_PARAMETERS = 32767
+
+# Rows fetched per round trip from a server-side cursor
+STREAM_YIELD_PER = 10_000
+
+STREAM_OUTPUTS = ("dict", "dataframe", "arrow")
+
+
+def arrow_type(column_type):
+    """
+    Maps a SQLAlchemy column type to its Arrow type, or None to let Arrow infer it.
+    """
+    if isinstance(column_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, types.Integer):
+        return pa.int64()
+    if isinstance(column_type, types.Float):
+        return pa.float64()
+    if isinstance(column_type, types.String):
+        return pa.string()
+    if isinstance(column_type, types.DateTime):
+        return pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+    if isinstance(column_type, types.Date):
+        return pa.date32()
+    return None
+
+
+def iter_chunks(data: Iterable[dict], size: int):
+    """
+    Yields lists of up to `size` rows from any iterable, without materialising the rest.
+    """
+    iterator = iter(data)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 class PostgreSqlClient:
@@ -15,6 +61,7 @@ class PostgreSqlClient:
         username: str,
         password: str,
         port: int = 5432,
+        pool_config: PoolConfig = None,
     ):
         self.host_name = server_name
         self.database_name = database_name
@@ -22,19 +69,54 @@ class PostgreSqlClient:
         self.password = password
         self.port = port
 
-        connection_url = URL.create(
-            drivername="postgresql+pg8000",
-            username=username,
-            password=password,
-            host=server_name,
-            port=port,
-            database=database_name,
-        )
+        connection_url = build_url(username, password, server_name, database_name, port)
+
+        # Clients with the same DSN share one engine and connection pool
+        self.engine = get_pooled_engine(connection_url, pool_config)
+
+    def pool_metrics(self) -> dict:
+        return pool_metrics(self.engine)
+
+    def select_all(self, table: Table, columns: list = None, where=None) -> list[dict]:
+        return list(self.stream(table, columns=columns, where=where))
 
-        self.engine = create_engine(connection_url)
+    def stream(
+        self,
+        table: Table,
+        columns: list = None,
+        where=None,
+        yield_per: int = STREAM_YIELD_PER,
+        output: str = "dict",
+    ):
+        """
+        Reads a table through a server-side cursor, `yield_per` rows per round trip,
+        so memory stays flat however large the table is.
+        - `columns` projects a subset of column names; `where` is a SQLAlchemy clause run in the database
+        - `output="dict"` yields one dict per row, "dataframe" one DataFrame per fetch
+          and "arrow" one pyarrow RecordBatch per fetch, typed from the table's columns
+        The connection is held until the generator is exhausted or closed.
+        """
+        if output not in STREAM_OUTPUTS:
+            raise ValueError(f"output must be one of {STREAM_OUTPUTS}, got {output!r}")
+        selected = [table.c[name] for name in columns] if columns else list(table.columns)
+        statement = select(*selected)
+        if where is not None:
+            statement = statement.where(where)
+        names = [column.name for column in selected]
 
-    def select_all(self, table: Table) -> list[dict]:
-        return [dict(row) for row in self.engine.execute(table.select()).all()]
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=yield_per).execute(statement)
+            for rows in result.partitions(yield_per):
+                if output == "dict":
+                    yield from (dict(row._mapping) for row in rows)
+                elif output == "dataframe":
+                    yield pd.DataFrame.from_records(rows, columns=names)
+                else:
+                    arrays = [
+                        pa.array(values, type=arrow_type(column.type))
+                        for values, column in zip(zip(*rows), selected)
+                    ]
+                    yield pa.RecordBatch.from_arrays(arrays, names=names)
 
     def create_table(self, metadata: MetaData) -> None:
         """
@@ -45,25 +127,71 @@ class PostgreSqlClient:
     def drop_table(self, table_name: str) -> None:
         self.engine.execute(f"drop table if exists {table_name};")
 
-    def insert(self, data: list[dict], table: Table, metadata: MetaData) -> None:
+    def key_columns(self, table: Table) -> list:
+        """
+        Returns the conflict key of an upsert: the table's primary key as defined in the metadata,
+        or as it exists in the database when the metadata declares none, e.g. (symbol, date).
+        """
+        key_columns = [pk_column.name for pk_column in table.primary_key.columns.values()]
+        if not key_columns:
+            key_columns = inspect(self.engine).get_pk_constraint(table.name)["constrained_columns"]
+        if not key_columns:
+            raise ValueError(f"Table {table.name} has no primary key to upsert on")
+        return key_columns
+
+    def chunk_size(self, table: Table) -> int:
+        """
+        Rows per INSERT so that rows x columns stays under pg8000's bind parameter limit.
+        """
+        return max(1, PG8000_MAX_PARAMETERS // len(table.columns))
+
+    def insert(self, data: Iterable[dict], table: Table, metadata: MetaData, use_copy: bool = False) -> None:
+        """
+        Inserts any iterable of row dicts in one transaction, reading it one chunk at a time.
+        With use_copy, rows are streamed with COPY FROM STDIN instead of INSERT statements.
+        """
         metadata.create_all(self.engine)
-        insert_statement = postgresql.insert(table).values(data)
-        self.engine.execute(insert_statement)
+        columns = [column.name for column in table.columns]
+        with self.engine.begin() as conn:
+            if use_copy:
+                copy_csv_chunks(conn, table.name, columns, iter_record_csv_chunks(data, columns))
+                return
+            for chunk in iter_chunks(data, self.chunk_size(table)):
+                conn.execute(postgresql.insert(table).values(chunk))
 
-    def overwrite(self, data: list[dict], table: Table, metadata: MetaData) -> None:
+    def overwrite(self, data: Iterable[dict], table: Table, metadata: MetaData, use_copy: bool = False) -> None:
         self.drop_table(table.name)
-        self.insert(data=data, table=table, metadata=metadata)
+        self.insert(data=data, table=table, metadata=metadata, use_copy=use_copy)
 
-    def upsert(self, data: list[dict], table: Table, metadata: MetaData) -> None:
+    def upsert(self, data: Iterable[dict], table: Table, metadata: MetaData, use_copy: bool = False) -> None:
+        """
+        Upserts any iterable of row dicts on the table's primary key, one chunk at a time in one transaction.
+        With use_copy, rows are COPYed into a temporary staging table and merged with a single statement.
+        """
         metadata.create_all(self.engine)
-        key_columns = [
-            pk_column.name for pk_column in table.primary_key.columns.values()
-        ]
-        insert_statement = postgresql.insert(table).values(data)
-        upsert_statement = insert_statement.on_conflict_do_update(
-            index_elements=key_columns,
-            set_={
-                c.key: c for c in insert_statement.excluded if c.key not in key_columns
-            },
+        key_columns = self.key_columns(table)
+        with self.engine.begin() as conn:
+            if use_copy:
+                self._copy_upsert(conn, data, table, key_columns)
+                return
+            for chunk in iter_chunks(data, self.chunk_size(table)):
+                insert_statement = postgresql.insert(table).values(chunk)
+                upsert_statement = insert_statement.on_conflict_do_update(
+                    index_elements=key_columns,
+                    set_={
+                        c.key: c for c in insert_statement.excluded if c.key not in key_columns
+                    },
+                )
+                conn.execute(upsert_statement)
+
+    def _copy_upsert(self, conn, data: Iterable[dict], table: Table, key_columns: list) -> None:
+        preparer = self.engine.dialect.identifier_preparer
+        columns = [column.name for column in table.columns]
+        staging_name = f"{table.name}_staging"
+        create_staging_table(conn, table.name, staging_name)
+        copy_csv_chunks(conn, staging_name, columns, iter_record_csv_chunks(data, columns))
+        conn.exec_driver_sql(
+            build_merge_statement(
+                preparer, table.name, staging_name, columns, key_columns, partitioned=is_partitioned(table)
+            )
         )
-        self.engine.execute(upsert_statement)
@@ -0,0 +1,195 @@
+# --------------------
+# Import Statements
+# --------------------
+import os
+import queue
+import threading
+import time
+from sqlalchemy import Table, Column, String, MetaData, Float, Integer, BigInteger, DateTime, Text
+from sqlalchemy.dialects.postgresql import insert
+from connectors.pool import PoolConfig
+
+# Rows buffered before a flush, and the longest an event waits in the buffer
+LEDGER_BATCH_ROWS = 500
+LEDGER_FLUSH_SECONDS = 2.0
+
+# Events beyond this are dropped (and counted) rather than blocking the pipeline
+LEDGER_MAX_QUEUE = 10_000
+
+# --------------------
+# Table Definitions
+# --------------------
+def get_ledger_tables(meta):
+    """
+    Defines pipeline_runs (one row per run) and pipeline_stage_metrics (one row per stage execution).
+    """
+    runs = Table(
+        "pipeline_runs", meta,
+        Column("run_id", String, primary_key=True),
+        Column("pipeline", String, primary_key=True),
+        Column("trigger", String),
+        Column("status", String),
+        Column("started_at", DateTime(timezone=True)),
+        Column("finished_at", DateTime(timezone=True)),
+        Column("wall_seconds", Float),
+        Column("stages_run", Integer),
+        Column("stages_skipped", Integer),
+        Column("rows_loaded", BigInteger),
+        Column("api_calls", Integer),
+        Column("bytes_received", BigInteger),
+        Column("retries", Integer),
+        Column("http_retries", Integer),
+        Column("error", Text),
+    )
+    stages = Table(
+        "pipeline_stage_metrics", meta,
+        Column("id", BigInteger, primary_key=True, autoincrement=True),
+        Column("run_id", String, index=True),
+        Column("pipeline", String),
+        Column("stage", String),
+        Column("status", String),
+        Column("started_at", DateTime(timezone=True)),
+        Column("wall_seconds", Float),
+        Column("attempts", Integer),
+        Column("retries", Integer),
+        Column("rows_in", BigInteger),
+        Column("rows_out", BigInteger),
+        Column("api_calls", Integer),
+        Column("http_retries", Integer),
+        Column("bytes_received", BigInteger),
+        Column("fetch_seconds", Float),
+        Column("decode_seconds", Float),
+        Column("rows_loaded", BigInteger),
+        Column("load_inserted", BigInteger),
+        Column("load_updated", BigInteger),
+        Column("load_unchanged", BigInteger),
+        Column("thread_cpu_seconds", Float),
+        Column("process_cpu_seconds", Float),
+        Column("peak_traced_bytes", BigInteger),
+        Column("error", Text),
+    )
+    return runs, stages
+
+# --------------------
+# Buffered Ledger Writer
+# --------------------
+class RunLedger:
+    """
+    Records pipeline runs and per-stage metrics in the logging database without slowing the pipeline.
+    - run_started, stage_finished and run_finished only put an event on a bounded queue
+    - A daemon thread batches events and writes them every `flush_seconds` (or `batch_rows` events)
+      on its own small connection pool
+    - When the queue is full or the database is unreachable, events are dropped and counted in
+      `dropped`; logging never raises into the pipeline
+    Tables are created by the writer thread on its first flush.
+    """
+
+    def __init__(self, engine, batch_rows: int = LEDGER_BATCH_ROWS, flush_seconds: float = LEDGER_FLUSH_SECONDS,
+                 max_queue: int = LEDGER_MAX_QUEUE):
+        self.engine = engine
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.meta = MetaData()
+        self.runs_table, self.stages_table = get_ledger_tables(self.meta)
+        self.events = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.tables_created = False
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self._write_loop, name="run-ledger", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Connects with LOGGING_SERVER_NAME, LOGGING_DATABASE_NAME, LOGGING_USERNAME, LOGGING_PASSWORD and LOGGING_PORT.
+        Returns None when LOGGING_SERVER_NAME is not set or RUN_LEDGER=false.
+        """
+        from connectors.db_connector import get_engine
+
+        server_name = os.getenv("LOGGING_SERVER_NAME")
+        if not server_name or os.getenv("RUN_LEDGER", "true").lower() in ("0", "false", "no"):
+            return None
+        engine = get_engine(
+            os.getenv("LOGGING_USERNAME"),
+            os.getenv("LOGGING_PASSWORD"),
+            server_name,
+            os.getenv("LOGGING_DATABASE_NAME"),
+            port=int(os.getenv("LOGGING_PORT", 5432)),
+            pool_config=PoolConfig(pool_size=1, max_overflow=0),
+        )
+        return cls(engine)
+
+    # --------------------
+    # Events
+    # --------------------
+    def _put(self, kind: str, row: dict) -> None:
+        try:
+            self.events.put_nowait((kind, row))
+        except queue.Full:
+            self.dropped += 1
+
+    def run_started(self, pipeline: str, run_id: str, started_at, trigger: str = None) -> None:
+        self._put("run", {"pipeline": pipeline, "run_id": run_id, "status": "running",
+                          "started_at": started_at, "trigger": trigger})
+
+    def stage_finished(self, pipeline: str, run_id: str, stage: str, metrics: dict) -> None:
+        self._put("stage", {"pipeline": pipeline, "run_id": run_id, "stage": stage, **metrics})
+
+    def run_finished(self, pipeline: str, run_id: str, metrics: dict) -> None:
+        self._put("run", {"pipeline": pipeline, "run_id": run_id, **metrics})
+
+    # --------------------
+    # Writer Thread
+    # --------------------
+    def _write_loop(self) -> None:
+        batch = []
+        deadline = time.monotonic() + self.flush_seconds
+        while not (self.closed.is_set() and self.events.empty()):
+            try:
+                batch.append(self.events.get(timeout=max(0.0, min(deadline - time.monotonic(), 0.5))))
+            except queue.Empty:
+                pass
+            if batch and (len(batch) >= self.batch_rows or time.monotonic() >= deadline or self.closed.is_set()):
+                self._flush(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_seconds
+        if batch:
+            self._flush(batch)
+
+    def _flush(self, batch: list) -> None:
+        """
+        Writes a batch in one transaction: run rows are merged by (run_id, pipeline), stage rows appended.
+        """
+        try:
+            with self.engine.begin() as conn:
+                if not self.tables_created:
+                    self.meta.create_all(conn)
+                    self.tables_created = True
+                for kind, row in batch:
+                    if kind == "run":
+                        row = {key: value for key, value in row.items() if key in self.runs_table.columns}
+                        statement = insert(self.runs_table).values(**row)
+                        conn.execute(statement.on_conflict_do_update(
+                            index_elements=["run_id", "pipeline"],
+                            set_={key: statement.excluded[key] for key in row if key not in ("run_id", "pipeline")},
+                        ))
+                stage_rows = [
+                    {column.name: row.get(column.name) for column in self.stages_table.columns if column.name != "id"}
+                    for kind, row in batch
+                    if kind == "stage"
+                ]
+                if stage_rows:
+                    conn.execute(self.stages_table.insert(), stage_rows)
+        except Exception as e:  # Includes an unreachable database: the pipeline must not notice
+            self.dropped += len(batch)
+            print(f"Run ledger could not write {len(batch)} event(s): {e}")
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Flushes buffered events and stops the writer thread (waiting at most `timeout` seconds).
+        """
+        self.closed.set()
+        self.thread.join(timeout)
+        if self.dropped:
+            print(f"Run ledger dropped {self.dropped} event(s).")
@@ -0,0 +1,321 @@
+# --------------------
+# Import Statements
+# --------------------
+import argparse
+import os
+import re
+import pandas as pd
+from sqlalchemy import Table, Column, String, MetaData, Float, DateTime, Index, BigInteger, Integer, SmallInteger
+from sqlalchemy import inspect, text
+
+PARTITION_GRANULARITIES = ("month", "year")
+
+# "unique_id": the string symbol_YYYY-MM-DD key; "natural": keyed on (symbol, date), no unique_id column
+TABLE_KEYS = ("unique_id", "natural")
+
+# Stored as the table comment; only consulted for a partitioned table that has no partitions yet
+PARTITION_COMMENT_PREFIX = "partition_by="
+
+# Partitioning of a table as recorded in the catalog: strategy ('r' = range) and key, e.g. RANGE (date)
+PARTITIONED_TABLE_SQL = text(
+    "SELECT c.oid, p.partstrat, pg_get_partkeydef(c.oid) AS partition_key "
+    "FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+    "WHERE c.relname = :table_name AND pg_table_is_visible(c.oid)"
+)
+
+# Bounds of every partition of a table, e.g. FOR VALUES FROM ('2025-01-01 00:00:00+00') TO ('2025-02-01 00:00:00+00')
+PARTITION_BOUNDS_SQL = text(
+    "SELECT pg_get_expr(c.relpartbound, c.oid) AS bound "
+    "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = :table_oid"
+)
+
+RANGE_BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+# --------------------
+# Table Definition
+# --------------------
+def get_stocks_table(meta, table_name="stocks", partition_by=None, key="unique_id"):
+    """
+    Defines the stocks table on the given MetaData and returns it.
+    - key="unique_id": keyed on the unique_id string (the original layout)
+    - key="natural": keyed on (symbol, date), without a unique_id column; a narrower index
+      and no per-row key string to build
+    - partition_by="month" or "year": declaratively range-partitioned on date, with a BRIN index on date.
+      Postgres requires the partition column in every unique key, so partitioned tables are always keyed
+      on (symbol, date); key="unique_id" then keeps unique_id as a plain column
+    """
+    if key not in TABLE_KEYS:
+        raise ValueError(f"key must be one of {TABLE_KEYS}, got {key!r}")
+    if partition_by is not None and partition_by not in PARTITION_GRANULARITIES:
+        raise ValueError(f"partition_by must be one of {PARTITION_GRANULARITIES}, got {partition_by!r}")
+
+    natural_key = key == "natural" or partition_by is not None
+    columns = []
+    if key == "unique_id":
+        columns.append(Column("unique_id", String, primary_key=not natural_key))
+    columns += [
+        Column("open", Float),
+        Column("close", Float),
+        Column("volume", Float),
+        Column("dividend", Float),
+        Column("symbol", String, primary_key=natural_key),
+        Column("exchange", String),
+        Column("date", DateTime(timezone=True), primary_key=natural_key),
+    ]
+
+    if partition_by is None:
+        return Table(table_name, meta, *columns)
+    return Table(
+        table_name, meta, *columns,
+        Index(f"ix_{table_name}_date_brin", "date", postgresql_using="brin"),
+        comment=f"{PARTITION_COMMENT_PREFIX}{partition_by}",
+        postgresql_partition_by="RANGE (date)",
+    )
+
+def get_bike_sales_table(meta, table_name="bike_sales"):
+    """
+    Defines the bike sales table (Kaegle/bike_sales_india.csv, snake_case columns) on the given MetaData.
+    The source has no natural key, so the table is reloaded as a whole rather than upserted.
+    """
+    return Table(
+        table_name, meta,
+        Column("state", String),
+        Column("avg_daily_distance_km", Float),
+        Column("brand", String),
+        Column("model", String),
+        Column("price_inr", BigInteger),
+        Column("year_of_manufacture", SmallInteger),
+        Column("engine_capacity_cc", Integer),
+        Column("fuel_type", String),
+        Column("mileage_km_l", Float),
+        Column("owner_type", String),
+        Column("registration_year", SmallInteger),
+        Column("insurance_status", String),
+        Column("seller_type", String),
+        Column("resale_price_inr", Float),
+        Column("city_tier", String),
+    )
+
+# --------------------
+# Partitions
+# --------------------
+def partition_granularity(bound):
+    """
+    Returns "month" or "year" for a range partition bound as printed by pg_get_expr,
+    or None for DEFAULT, MINVALUE/MAXVALUE or any other span.
+    """
+    match = RANGE_BOUND_PATTERN.search(bound or "")
+    if match is None:
+        return None
+    start, end = (pd.Timestamp(value) for value in match.groups())
+    if start.day != 1 or end.day != 1:
+        return None
+    months = (end.year - start.year) * 12 + end.month - start.month
+    return {1: "month", 12: "year"}.get(months)
+
+
+def get_partitioning(engine, table_name="stocks"):
+    """
+    Returns "month" or "year" for a partitioned stocks table, None for a plain or missing one.
+    - Partitioning is read from the catalog (pg_partitioned_table), so tables partitioned
+      outside this module are recognised too
+    - The granularity comes from the bounds of the existing partitions; a table with none yet
+      falls back to the partition_by= comment get_stocks_table sets
+    Raises ValueError for a table partitioned other than by RANGE (date) in months or years.
+    """
+    with engine.connect() as conn:
+        partitioned = conn.execute(PARTITIONED_TABLE_SQL, {"table_name": table_name}).one_or_none()
+        if partitioned is None:
+            return None
+        table_oid, strategy, partition_key = partitioned
+        if strategy != "r" or partition_key.replace('"', "") != "RANGE (date)":
+            raise ValueError(f"Table {table_name} is partitioned by {partition_key}, not RANGE (date)")
+        bounds = conn.execute(PARTITION_BOUNDS_SQL, {"table_oid": table_oid}).scalars().all()
+
+    granularities = {partition_granularity(bound) for bound in bounds} - {None}
+    if not granularities:
+        comment = inspect(engine).get_table_comment(table_name).get("text") or ""
+        if comment.startswith(PARTITION_COMMENT_PREFIX):
+            granularities = {comment[len(PARTITION_COMMENT_PREFIX):]}
+    if len(granularities) != 1 or not granularities <= set(PARTITION_GRANULARITIES):
+        raise ValueError(f"Cannot tell whether table {table_name} is partitioned by month or year")
+    return granularities.pop()
+
+
+def is_partitioned(table):
+    """
+    True for a Table defined with postgresql_partition_by.
+    """
+    return table.dialect_options["postgresql"]["partition_by"] is not None
+
+
+def get_table_key(engine, table_name="stocks"):
+    """
+    Returns "unique_id" if the stocks table has a unique_id column, "natural" if not,
+    or None when the table does not exist.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        return None
+    columns = {column["name"] for column in inspector.get_columns(table_name)}
+    return "unique_id" if "unique_id" in columns else "natural"
+
+
+def partition_bounds(date_min, date_max, partition_by):
+    """
+    Returns (suffix, start, end) for every partition covering [date_min, date_max],
+    e.g. ("p2021_01", 2021-01-01, 2021-02-01) for months or ("p2021", 2021-01-01, 2022-01-01) for years.
+    Bounds are UTC midnights; `end` is exclusive, as in FOR VALUES FROM ... TO.
+    """
+    offset = pd.offsets.MonthBegin() if partition_by == "month" else pd.offsets.YearBegin()
+    first, last = (pd.Timestamp(value) for value in (date_min, date_max))
+    first = first.tz_convert("UTC") if first.tzinfo else first.tz_localize("UTC")
+    last = last.tz_convert("UTC") if last.tzinfo else last.tz_localize("UTC")
+
+    start = pd.Timestamp(year=first.year, month=first.month if partition_by == "month" else 1, day=1, tz="UTC")
+    bounds = []
+    while start <= last:
+        suffix = start.strftime("p%Y_%m") if partition_by == "month" else start.strftime("p%Y")
+        bounds.append((suffix, start, start + offset))
+        start = start + offset
+    return bounds
+
+
+def build_create_partition_sql(preparer, parent_name, partition_name, start, end):
+    """
+    Returns the CREATE TABLE ... PARTITION OF statement of one range partition [start, end).
+    """
+    return (
+        f"CREATE TABLE IF NOT EXISTS {preparer.quote(partition_name)} "
+        f"PARTITION OF {preparer.quote(parent_name)} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def ensure_partitions(engine, table_name, date_min, date_max, partition_by=None):
+    """
+    Creates any missing partitions of a partitioned stocks table for [date_min, date_max].
+    Does nothing for a plain table. Returns the number of partitions created.
+    """
+    partition_by = partition_by or get_partitioning(engine, table_name)
+    if partition_by is None or pd.isna(date_min) or pd.isna(date_max):
+        return 0
+
+    preparer = engine.dialect.identifier_preparer
+    existing = set(inspect(engine).get_table_names())
+    created = 0
+    with engine.begin() as conn:
+        for suffix, start, end in partition_bounds(date_min, date_max, partition_by):
+            partition_name = f"{table_name}_{suffix}"
+            if partition_name in existing:
+                continue
+            conn.exec_driver_sql(build_create_partition_sql(preparer, table_name, partition_name, start, end))
+            created += 1
+    return created
+
+
+def create_stocks_table(engine, table_name="stocks", partition_by=None, key="unique_id"):
+    """
+    Creates the stocks table if it does not exist and returns its Table definition.
+    """
+    meta = MetaData()
+    stocks_table = get_stocks_table(meta, table_name, partition_by, key)
+    meta.create_all(engine)
+    return stocks_table
+
+# --------------------
+# Migration
+# --------------------
+def build_migration_copy_sql(preparer, table_name, staging_name, columns):
+    """
+    Returns the INSERT ... SELECT copying one row per (symbol, date) of the plain table into the partitioned one.
+    """
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    return (
+        f"INSERT INTO {preparer.quote(staging_name)} ({column_list}) "
+        f"SELECT DISTINCT ON (symbol, date) {column_list} FROM {preparer.quote(table_name)} "
+        f"WHERE symbol IS NOT NULL AND date IS NOT NULL "
+        f"ORDER BY symbol, date"
+    )
+
+
+def build_migration_swap_sql(preparer, table_name, staging_name, legacy_name):
+    """
+    Returns the statements renaming the plain table to `legacy_name` and the partitioned one to `table_name`,
+    then giving the new key and index the names create_stocks_table would.
+    """
+    target = preparer.quote(table_name)
+    legacy = preparer.quote(legacy_name)
+    return [
+        f"ALTER TABLE {target} RENAME TO {legacy}",
+        f"ALTER TABLE {legacy} RENAME CONSTRAINT {preparer.quote(f'{table_name}_pkey')} "
+        f"TO {preparer.quote(f'{legacy_name}_pkey')}",
+        f"ALTER TABLE {preparer.quote(staging_name)} RENAME TO {target}",
+        f"ALTER TABLE {target} RENAME CONSTRAINT {preparer.quote(f'{staging_name}_pkey')} "
+        f"TO {preparer.quote(f'{table_name}_pkey')}",
+        f"ALTER INDEX {preparer.quote(f'ix_{staging_name}_date_brin')} "
+        f"RENAME TO {preparer.quote(f'ix_{table_name}_date_brin')}",
+    ]
+
+
+def migrate_to_partitioned(engine, table_name="stocks", partition_by="month"):
+    """
+    Rebuilds a plain stocks table as a partitioned one, in a single transaction.
+    - Creates the partitioned table and every partition the existing dates need
+    - Copies one row per (symbol, date); rows without a symbol
+      or date cannot satisfy the new key and are left behind
+    - Swaps names: the old table is kept as {table_name}_legacy for verification
+    Returns (rows copied, rows left behind).
+    """
+    if get_partitioning(engine, table_name) is not None:
+        print(f"{table_name} is already partitioned.")
+        return 0, 0
+
+    preparer = engine.dialect.identifier_preparer
+    target = preparer.quote(table_name)
+    staging_name = f"{table_name}_partitioned"
+    legacy_name = f"{table_name}_legacy"
+
+    with engine.begin() as conn:
+        # Writers wait for the swap instead of writing into the table being copied
+        conn.exec_driver_sql(f"LOCK TABLE {target} IN SHARE ROW EXCLUSIVE MODE")
+        date_min, date_max, total = conn.exec_driver_sql(f"SELECT min(date), max(date), count(*) FROM {target}").one()
+
+        meta = MetaData()
+        stocks_table = get_stocks_table(meta, staging_name, partition_by, get_table_key(conn, table_name))
+        meta.create_all(conn)
+
+        for suffix, start, end in partition_bounds(date_min, date_max, partition_by) if total else []:
+            conn.exec_driver_sql(
+                build_create_partition_sql(preparer, staging_name, f"{table_name}_{suffix}", start, end)
+            )
+
+        columns = [column.name for column in stocks_table.columns]
+        copied = conn.exec_driver_sql(build_migration_copy_sql(preparer, table_name, staging_name, columns)).rowcount
+        for statement in build_migration_swap_sql(preparer, table_name, staging_name, legacy_name):
+            conn.exec_driver_sql(statement)
+
+    print(f"Migrated {table_name} to {partition_by}ly partitions: {copied} rows copied, {total - copied} left in {legacy_name}.")
+    return copied, total - copied
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from connectors.db_connector import get_engine
+
+    parser = argparse.ArgumentParser(description="Create or migrate the stocks table as a partitioned table.")
+    parser.add_argument("action", choices=["create", "migrate"])
+    parser.add_argument("--table", default="stocks")
+    parser.add_argument("--partition-by", choices=PARTITION_GRANULARITIES, default="month")
+    parser.add_argument("--key", choices=TABLE_KEYS, default="unique_id", help="Key of a newly created table")
+    args = parser.parse_args()
+
+    load_dotenv()
+    engine = get_engine(
+        os.getenv("DB_USER"), os.getenv("DB_PASSWORD"), os.getenv("DB_SERVER_NAME"), os.getenv("DB_DATABASE_NAME")
+    )
+    if args.action == "create":
+        create_stocks_table(engine, args.table, args.partition_by, args.key)
+    else:
+        migrate_to_partitioned(engine, args.table, args.partition_by)
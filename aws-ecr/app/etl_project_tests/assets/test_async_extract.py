@@ -0,0 +1,105 @@
+import threading
+from datetime import datetime
+from assets.async_extract import extract_stock_data_concurrent
+from assets.decode import EOD_COLUMNS
+from assets.extract_transform import extract_stock_data_paginated, normalize_eod_records
+from assets.rate_limit import RateLimiter
+from assets.response_cache import ResponseCache
+from benchmarks.marketstack_server import ServerConfig, serve_in_thread
+import pytest
+
+QUERY = {"symbols": "AAPL,MSFT,NFLX", "date_from": "2024-01-02", "date_to": "2024-01-31", "limit": 4}
+
+
+@pytest.fixture
+def setup_rate_limiter():
+    return RateLimiter(requests_per_second=1000, max_retries=10, base_delay=0.02, max_delay=0.1)
+
+
+@pytest.fixture
+def setup_stand_in(monkeypatch):
+    with serve_in_thread(ServerConfig(end_date="2024-01-31")) as (base_url, server):
+        monkeypatch.setenv("MARKETSTACK_BASE_URL", base_url)
+        yield server
+
+
+def sorted_rows(df):
+    return df.sort_values(["symbol", "date"]).reset_index(drop=True)
+
+
+def test_async_extract_matches_threaded_extract(setup_stand_in, setup_rate_limiter):
+    threaded = extract_stock_data_paginated("key", rate_limiter=setup_rate_limiter, **QUERY)
+    concurrent = extract_stock_data_concurrent("key", concurrency=3, rate_limiter=setup_rate_limiter, **QUERY)
+    columnar = extract_stock_data_concurrent("key", rate_limiter=setup_rate_limiter, columnar=True, **QUERY)
+
+    # 21 trading days per symbol (MLK Day is a holiday), 6 pages of up to 4 rows each
+    assert len(concurrent) == 63
+    assert list(concurrent.columns) == list(threaded.columns)
+    assert sorted_rows(concurrent).equals(sorted_rows(threaded))
+    # Grouped by symbol in the order given, each symbol's pages in offset order
+    assert list(concurrent["symbol"].unique()) == ["AAPL", "MSFT", "NFLX"]
+    assert concurrent.groupby("symbol")["date"].apply(lambda dates: dates.is_monotonic_decreasing).all()
+    assert columnar.equals(concurrent.loc[:, EOD_COLUMNS])
+
+
+def test_async_extract_uses_watermarks_per_symbol(setup_stand_in, setup_rate_limiter):
+    df = extract_stock_data_concurrent(
+        "key",
+        symbols="AAPL,MSFT",
+        date_from="2024-01-22",
+        date_to="2024-01-31",
+        watermarks={"AAPL": datetime(2024, 1, 29)},
+        overlap_days=3,
+        rate_limiter=setup_rate_limiter,
+    )
+
+    # AAPL restarts on 2024-01-26, MSFT (no watermark) on date_from
+    assert df.groupby("symbol")["date"].min().str[:10].to_dict() == {"AAPL": "2024-01-26", "MSFT": "2024-01-22"}
+    assert df["symbol"].value_counts().to_dict() == {"MSFT": 8, "AAPL": 4}
+
+
+class ThreadRecordingCache(ResponseCache):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def get(self, endpoint, params):
+        self.threads.add(threading.current_thread())
+        return super().get(endpoint, params)
+
+    def put(self, endpoint, params, payload):
+        self.threads.add(threading.current_thread())
+        return super().put(endpoint, params, payload)
+
+
+def test_async_extract_replays_from_cache(setup_stand_in, setup_rate_limiter, tmp_path):
+    server = setup_stand_in
+    recording = ThreadRecordingCache(str(tmp_path))
+    first = extract_stock_data_concurrent("key", rate_limiter=setup_rate_limiter, response_cache=recording, **QUERY)
+    requests_made = server.stats["requests"]
+
+    replaying = ThreadRecordingCache(str(tmp_path), replay_only=True)
+    replay = extract_stock_data_concurrent("key", rate_limiter=setup_rate_limiter, response_cache=replaying, **QUERY)
+
+    assert requests_made == 18
+    assert server.stats["requests"] == requests_made
+    assert replay.equals(first)
+    # Disk I/O stays off the event loop's thread (asyncio.run runs the loop on this one)
+    assert recording.threads and threading.current_thread() not in recording.threads | replaying.threads
+
+
+def test_async_extract_retries_throttled_pages(monkeypatch, setup_rate_limiter):
+    config = ServerConfig(end_date="2024-01-31", requests_per_second=50, burst=2)
+    with serve_in_thread(config) as (base_url, server):
+        monkeypatch.setenv("MARKETSTACK_BASE_URL", base_url)
+        df = extract_stock_data_concurrent("key", concurrency=8, rate_limiter=setup_rate_limiter, **QUERY)
+
+    assert len(df) == 63
+    assert server.stats["throttled"] > 0
+    assert setup_rate_limiter.retries == server.stats["throttled"]
+
+
+def test_normalize_eod_records_puts_known_fields_in_api_order():
+    df = normalize_eod_records([{"symbol": "AAPL", "close": 1.0, "note": "x"}, {"symbol": "MSFT", "dividend": 0.2, "open": 2.0}])
+
+    assert list(df.columns) == ["open", "close", "dividend", "symbol", "note"]
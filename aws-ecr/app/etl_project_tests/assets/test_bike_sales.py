@@ -0,0 +1,30 @@
+from assets.bike_sales import BIKE_SALES_COLUMNS, read_bike_sales_batches
+import pyarrow as pa
+import pytest
+
+HEADER = ",".join(BIKE_SALES_COLUMNS)
+ROWS = [
+    "Delhi,42.5,Honda,Shine,75000,2019,125,Petrol,55.2,First,2019,Active,Dealer,52000.5,Metro",
+    "Goa,18.0,Royal Enfield,Classic 350,190000,2021,349,Petrol,35.0,Second,2022,Expired,Individual,150000.0,Tier 2",
+    "Delhi,30.1,Honda,Activa,68000,2020,110,Petrol,48.9,First,2020,Active,Dealer,45000.0,Metro",
+]
+
+
+def test_read_bike_sales_batches_types_and_renames_columns(tmp_path):
+    path = tmp_path / "bike_sales.csv"
+    path.write_text("\n".join([HEADER] + ROWS) + "\n")
+
+    table = pa.Table.from_batches(list(read_bike_sales_batches(str(path))))
+
+    assert table.column_names[:3] == ["state", "avg_daily_distance_km", "brand"]
+    assert pa.types.is_dictionary(table.schema.field("city_tier").type)
+    assert table.schema.field("price_inr").type == pa.int64()
+    assert table.column("state").to_pylist() == ["Delhi", "Goa", "Delhi"]
+
+
+def test_read_bike_sales_batches_rejects_a_missing_column(tmp_path):
+    path = tmp_path / "bike_sales.csv"
+    path.write_text(HEADER.replace(",City Tier", "") + "\n")
+
+    with pytest.raises(ValueError, match="City Tier"):
+        list(read_bike_sales_batches(str(path)))
@@ -0,0 +1,42 @@
+from assets.decode import EOD_COLUMNS, decode_eod_page
+import json
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def setup_eod_page():
+    return {
+        "pagination": {"limit": 2, "offset": 0, "count": 2, "total": 9944},
+        "data": [
+            {
+                "open": 245.0, "high": 247.1, "low": 244.2, "close": 245.55, "volume": 53197400.0,
+                "adj_high": None, "split_factor": 1.0, "dividend": 0.0, "symbol": "AAPL",
+                "exchange": "XNAS", "date": "2025-02-24T00:00:00+0000",
+            },
+            {
+                "open": 408.5, "close": 404.0, "volume": None, "dividend": 0.83, "symbol": "MSFT",
+                "exchange": "XNAS", "date": "2025-02-24T00:00:00+0000",
+            },
+        ],
+    }
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_decode_eod_page_matches_json_normalize(setup_eod_page, indent):
+    page = setup_eod_page
+
+    pagination, columns = decode_eod_page(json.dumps(page, indent=indent))
+
+    assert pagination == page["pagination"]
+    expected = pd.json_normalize(page["data"]).loc[:, EOD_COLUMNS]
+    pd.testing.assert_frame_equal(columns.to_dataframe(), expected)
+    assert columns.to_arrow().num_rows == 2
+
+
+def test_decode_eod_page_with_empty_data():
+    pagination, columns = decode_eod_page('{"pagination": {"total": 0}, "data": []}')
+
+    assert pagination == {"total": 0}
+    assert len(columns) == 0
+    assert list(columns.to_dataframe().columns) == EOD_COLUMNS
@@ -0,0 +1,126 @@
+from assets.extract_transform import (
+    COMPACT_SCHEMA,
+    extract_stock_data_paginated,
+    incremental_date_from,
+    page_offsets,
+    transform_data,
+    transform_data_compact,
+)
+import json
+import pandas as pd
+from datetime import datetime, timezone
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+        self.content = json.dumps(body).encode("utf-8")
+        self.status_code = 200
+        self.headers = {}
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """
+    Serves `total` fake EOD rows, `limit` rows per page, like MarketStack's pagination block.
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.offsets = []
+
+    def get(self, url, params):
+        offset, limit = params["offset"], params["limit"]
+        self.offsets.append(offset)
+        rows = [
+            {"symbol": "AAPL", "date": f"row-{i}", "open": float(i)}
+            for i in range(offset, min(offset + limit, self.total))
+        ]
+        return FakeResponse(
+            {
+                "pagination": {"limit": limit, "offset": offset, "count": len(rows), "total": self.total},
+                "data": rows,
+            }
+        )
+
+
+@pytest.fixture
+def setup_fake_session():
+    return FakeSession(total=2345)
+
+
+def test_page_offsets():
+    assert page_offsets(total=2345, limit=1000) == [1000, 2000]
+    assert page_offsets(total=1000, limit=1000) == []
+    assert page_offsets(total=0, limit=1000) == []
+
+
+def test_extract_stock_data_paginated_fetches_every_page(setup_fake_session):
+    session = setup_fake_session
+
+    df = extract_stock_data_paginated(api_key="test", limit=1000, max_workers=3, session=session)
+
+    assert sorted(session.offsets) == [0, 1000, 2000]
+    assert len(df) == 2345
+    assert df["open"].tolist() == [float(i) for i in range(2345)]
+
+
+def test_incremental_date_from_groups_symbols_by_start_date():
+    watermarks = {
+        "AAPL": datetime(2025, 2, 24, tzinfo=timezone.utc),
+        "MSFT": datetime(2025, 2, 24, tzinfo=timezone.utc),
+        "NFLX": datetime(2025, 2, 20, tzinfo=timezone.utc),
+    }
+
+    groups = incremental_date_from("AAPL,MSFT,NFLX,GOOGL", watermarks, overlap_days=3, default_date_from="2021-01-01")
+
+    assert groups == {
+        "2021-01-01": "GOOGL",
+        "2025-02-17": "NFLX",
+        "2025-02-21": "AAPL,MSFT",
+    }
+
+
+@pytest.fixture
+def setup_extracted_frame():
+    return pd.DataFrame(
+        {
+            "open": [245.0, 408.5, 1.0, 2.0, 3.0],
+            "close": [245.55, 404.0, 1.0, 2.0, 3.0],
+            "volume": [53197400.0, None, 1.0, 2.0, 3.0],
+            "dividend": [0.0, 0.83, 0.0, 0.0, 0.0],
+            "symbol": ["AAPL", "MSFT", "", None, "NFLX"],
+            "exchange": ["XNAS", "XNAS", "XNAS", "XNAS", "XNAS"],
+            "date": [
+                "2025-02-24T00:00:00+0000",
+                "2025-02-21T00:00:00+0000",
+                "2025-02-21T00:00:00+0000",
+                "2025-02-21T00:00:00+0000",
+                "not a date",
+            ],
+            "adj_close": [245.55, 404.0, 1.0, 2.0, 3.0],
+        }
+    )
+
+
+def test_transform_data_compact_matches_transform_data(setup_extracted_frame):
+    df = setup_extracted_frame
+
+    expected = transform_data(df)
+    result = transform_data_compact(df)
+
+    assert result.dtypes.astype(str).to_dict() == COMPACT_SCHEMA
+    assert result["unique_id"].tolist() == expected["unique_id"].tolist() == ["AAPL_2025-02-24", "MSFT_2025-02-21"]
+    assert result["symbol"].astype(str).tolist() == expected["symbol"].tolist()
+    assert (result["date"] == expected["date"]).all()
+    assert result["volume"].tolist() == [53197400, pd.NA]
+
+
+def test_transform_data_compact_can_skip_unique_id(setup_extracted_frame):
+    result = transform_data_compact(setup_extracted_frame, include_unique_id=False)
+
+    assert "unique_id" not in result.columns
+    assert result["symbol"].astype(str).tolist() == ["AAPL", "MSFT"]
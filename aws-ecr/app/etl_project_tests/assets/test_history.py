@@ -0,0 +1,34 @@
+from assets.history import HistoryReader, write_history
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def setup_history_file(tmp_path):
+    df = pd.DataFrame(
+        {
+            "close": [3.0, 1.0, 2.0, 10.0, 11.0],
+            "symbol": pd.Categorical(["AAPL", "AAPL", "AAPL", "MSFT", "MSFT"]),
+            "date": pd.to_datetime(
+                ["2025-02-03", "2025-02-01", "2025-02-02", "2025-02-01", "2025-02-02"], utc=True
+            ),
+        }
+    )
+    return write_history(df, str(tmp_path / "history.arrow"))
+
+
+def test_history_reader_slices_by_symbol_and_date(setup_history_file):
+    with HistoryReader(setup_history_file) as history:
+        table = history.query(["AAPL"], date_from="2025-02-02", date_to="2025-02-03")
+
+        assert history.symbols == ["AAPL", "MSFT"]
+        assert table.column("close").to_pylist() == [2.0, 3.0]
+        assert history.column("close", "MSFT", date_to="2025-02-01").tolist() == [10.0]
+
+
+def test_history_reader_converts_to_pandas_on_request(setup_history_file):
+    with HistoryReader(setup_history_file) as history:
+        df = history.to_pandas(date_from="2025-02-02", columns=["symbol", "close"])
+
+    assert df["symbol"].astype(str).tolist() == ["AAPL", "AAPL", "MSFT"]
+    assert df["close"].tolist() == [2.0, 3.0, 11.0]
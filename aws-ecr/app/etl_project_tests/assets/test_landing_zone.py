@@ -0,0 +1,43 @@
+from assets.landing_zone import LandingZone
+from assets.extract_transform import transform_data_compact
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def setup_transformed_frame():
+    extracted = pd.DataFrame(
+        {
+            "open": [248.0, 410.1, 247.2],
+            "close": [245.55, 408.2, 249.1],
+            "volume": [53197400.0, None, 1.0],
+            "dividend": [0.0, 0.0, 0.0],
+            "symbol": ["AAPL", "MSFT", "AAPL"],
+            "exchange": ["XNAS", "XNAS", "XNAS"],
+            "date": ["2025-02-24T00:00:00+0000", "2024-12-31T00:00:00+0000", "2024-02-21T00:00:00+0000"],
+        }
+    )
+    return transform_data_compact(extracted)
+
+
+@pytest.mark.parametrize("partition_by", [("year",), ("symbol", "year")])
+def test_landing_zone_round_trips_the_transformed_frame(tmp_path, setup_transformed_frame, partition_by):
+    zone = LandingZone(str(tmp_path), partition_by)
+    zone.write(setup_transformed_frame, "transformed", "run-1")
+
+    result = zone.read("transformed")
+
+    pd.testing.assert_frame_equal(
+        result.sort_values("unique_id").reset_index(drop=True),
+        setup_transformed_frame.sort_values("unique_id").reset_index(drop=True),
+    )
+    assert zone.manifest()["runs"]["run-1"]["stages"]["transformed"]["rows"] == 3
+
+
+def test_landing_zone_prunes_by_symbol_and_year(tmp_path, setup_transformed_frame):
+    zone = LandingZone(str(tmp_path))
+    zone.write(setup_transformed_frame, "transformed", "run-1")
+
+    result = zone.read("transformed", "run-1", symbols=["AAPL"], years=[2024])
+
+    assert result["unique_id"].tolist() == ["AAPL_2024-02-21"]
@@ -0,0 +1,43 @@
+from assets.rate_limit import MarketStackError, RateLimiter, parse_retry_after
+import pytest
+
+
+@pytest.fixture
+def setup_rate_limiter():
+    return RateLimiter(requests_per_second=1000, max_retries=3, base_delay=0.001, max_delay=0.01)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"Retry-After": "2"}) == 2.0
+    assert parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0  # date in the past
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after({}) is None
+
+
+def test_rate_limiter_retries_throttled_request(setup_rate_limiter):
+    rate_limiter = setup_rate_limiter
+    answers = iter([(429, {"Retry-After": "0"}, "slow down"), (503, {}, "unavailable"), (200, {}, {"data": []})])
+
+    result = rate_limiter.call(lambda: next(answers))
+
+    assert result == {"data": []}
+    assert rate_limiter.retries == 2
+
+
+def test_rate_limiter_raises_when_retries_run_out(setup_rate_limiter):
+    rate_limiter = setup_rate_limiter
+
+    with pytest.raises(MarketStackError) as error:
+        rate_limiter.call(lambda: (429, {}, "slow down"))
+
+    assert error.value.status_code == 429
+    assert rate_limiter.retries == 3
+
+
+def test_rate_limiter_does_not_retry_client_errors(setup_rate_limiter):
+    rate_limiter = setup_rate_limiter
+
+    with pytest.raises(MarketStackError):
+        rate_limiter.call(lambda: (401, {}, "invalid_access_key"))
+
+    assert rate_limiter.retries == 0
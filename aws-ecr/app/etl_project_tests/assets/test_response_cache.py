@@ -0,0 +1,77 @@
+from assets.response_cache import ResponseCache, ResponseCacheMiss
+import os
+import pytest
+
+ENDPOINT = "https://api.marketstack.com/v1/eod"
+
+
+@pytest.fixture
+def setup_response_cache(tmp_path):
+    return ResponseCache(str(tmp_path), ttl_seconds=60, max_bytes=10_000)
+
+
+def test_response_cache_ignores_access_key(setup_response_cache):
+    response_cache = setup_response_cache
+    payload = {"data": [{"symbol": "AAPL", "close": 245.55}]}
+
+    response_cache.put(ENDPOINT, {"access_key": "one", "symbols": "AAPL", "offset": 0}, payload)
+
+    assert response_cache.get(ENDPOINT, {"offset": "0", "symbols": "AAPL", "access_key": "two"}) == payload
+    assert response_cache.get(ENDPOINT, {"symbols": "AAPL", "offset": 1000}) is None
+
+
+def test_response_cache_counts_overwritten_entries_once(setup_response_cache):
+    response_cache = setup_response_cache
+    response_cache.put(ENDPOINT, {"offset": 0}, {"data": [1, 2, 3]})
+    size = response_cache.total_bytes
+
+    response_cache.put(ENDPOINT, {"offset": 0}, {"data": [1, 2, 3]})
+
+    assert response_cache.total_bytes == size == sum(size for _, size, _ in response_cache.entries())
+
+
+def test_response_cache_expires_entries(setup_response_cache):
+    response_cache = setup_response_cache
+    response_cache.put(ENDPOINT, {"offset": 0}, {"data": []})
+    path = response_cache.path_for(response_cache.cache_key(ENDPOINT, {"offset": 0}))
+    os.utime(path, (0, 0))  # written in 1970
+
+    assert response_cache.get(ENDPOINT, {"offset": 0}) is None
+
+
+def test_response_cache_replay_only_raises_on_miss(tmp_path):
+    response_cache = ResponseCache(str(tmp_path), replay_only=True)
+
+    with pytest.raises(ResponseCacheMiss):
+        response_cache.get(ENDPOINT, {"offset": 0})
+
+
+def test_response_cache_replays_on_a_later_day(tmp_path):
+    recorded = ResponseCache(str(tmp_path))
+    params = {"access_key": "key", "symbols": "AAPL", "date_from": "2025-01-01", "offset": 0}
+    recorded.put(ENDPOINT, {**params, "date_to": "2025-02-23"}, {"data": ["older"]})
+    recorded.put(ENDPOINT, {**params, "date_to": "2025-02-24"}, {"data": ["failed run"]})
+
+    replay = ResponseCache(str(tmp_path), replay_only=True)
+
+    # The retry runs a day later, so date_to defaults to the 25th
+    assert replay.get(ENDPOINT, {**params, "date_to": "2025-02-25"}) == {"data": ["failed run"]}
+    assert replay.get(ENDPOINT, {**params, "date_to": "2025-02-23"}) == {"data": ["older"]}
+    with pytest.raises(ResponseCacheMiss):
+        replay.get(ENDPOINT, {**params, "date_to": "2025-02-20"})
+    # Outside replay-only mode a new day is still a miss, so live runs never get stale pages
+    assert recorded.get(ENDPOINT, {**params, "date_to": "2025-02-25"}) is None
+
+
+def test_response_cache_evicts_least_recently_read(setup_response_cache):
+    response_cache = setup_response_cache
+    payload = {"data": [os.urandom(16).hex() for _ in range(100)]}
+    response_cache.put(ENDPOINT, {"offset": 0}, payload)
+    response_cache.max_bytes = response_cache.total_bytes * 2.5  # room for two entries
+    for offset in range(3):
+        response_cache.put(ENDPOINT, {"offset": offset}, payload)
+        path = response_cache.path_for(response_cache.cache_key(ENDPOINT, {"offset": offset}))
+        os.utime(path, (offset, os.stat(path).st_mtime))
+
+    assert response_cache.get(ENDPOINT, {"offset": 0}) is None
+    assert response_cache.get(ENDPOINT, {"offset": 2}) == payload
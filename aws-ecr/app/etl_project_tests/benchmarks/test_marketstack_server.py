@@ -0,0 +1,45 @@
+from assets.extract_transform import extract_stock_data_paginated
+from assets.rate_limit import RateLimiter
+from benchmarks.marketstack_server import ServerConfig, serve_in_thread
+import pytest
+import requests
+
+
+@pytest.fixture
+def setup_rate_limiter():
+    return RateLimiter(requests_per_second=1000, max_retries=5, base_delay=0.05, max_delay=0.2)
+
+
+def test_extract_pages_through_stand_in(monkeypatch, setup_rate_limiter):
+    with serve_in_thread(ServerConfig(end_date="2024-01-31")) as (base_url, server):
+        monkeypatch.setenv("MARKETSTACK_BASE_URL", base_url)
+        df = extract_stock_data_paginated(
+            "key", symbols="AAPL,MSFT", date_from="2024-01-01", limit=7, rate_limiter=setup_rate_limiter
+        )
+        again = extract_stock_data_paginated(
+            "key", symbols="AAPL,MSFT", date_from="2024-01-01", limit=1000, rate_limiter=setup_rate_limiter
+        )
+
+    # January 2024 has 21 trading days (New Year's Day and MLK Day are holidays)
+    assert len(df) == 42
+    assert not df.duplicated(["symbol", "date"]).any()
+    assert df["date"].is_monotonic_decreasing
+    assert df.equals(again)
+    assert server.stats["served"] == 7
+
+
+def test_stand_in_contract_and_throttling():
+    with serve_in_thread(ServerConfig(end_date="2024-01-31", requests_per_second=0.1, burst=1)) as (base_url, server):
+        assert requests.get(f"{base_url}/eod", params={"symbols": "AAPL"}).status_code == 401
+        assert requests.get(f"{base_url}/eod", params={"access_key": "a"}).status_code == 422
+
+        page = requests.get(
+            f"{base_url}/eod", params={"access_key": "b", "symbols": "AAPL", "sort": "ASC", "date_from": "2024-01-29"}
+        )
+        throttled = requests.get(f"{base_url}/eod", params={"access_key": "b", "symbols": "AAPL"})
+
+    assert page.json()["pagination"] == {"limit": 100, "offset": 0, "count": 3, "total": 3}
+    assert [bar["date"][:10] for bar in page.json()["data"]] == ["2024-01-29", "2024-01-30", "2024-01-31"]
+    assert throttled.status_code == 429
+    assert throttled.json()["error"]["code"] == "rate_limit_reached"
+    assert server.stats["throttled"] == 1
@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+import threading
+import connectors.db_connector as db_connector
+from connectors.db_connector import (
+    LoadError, LoadResult, dataframe_to_arrays, dataframe_to_records, load_data_parallel, partition_by_symbol
+)
+from connectors.schema import get_stocks_table
+from sqlalchemy import MetaData, exc
+from sqlalchemy.dialects import postgresql
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def setup_transformed_frame():
+    return pd.DataFrame(
+        {
+            "unique_id": ["AAPL_2025-02-24", "MSFT_2025-02-24"],
+            "volume": pd.array([53197400, None], dtype="Int64"),
+            "close": [245.55, float("nan")],
+            "symbol": pd.Categorical(["AAPL", "MSFT"]),
+        }
+    )
+
+
+def test_dataframe_to_records_sends_missing_values_as_none(setup_transformed_frame):
+    records = dataframe_to_records(setup_transformed_frame)
+
+    assert records[1] == {"unique_id": "MSFT_2025-02-24", "volume": None, "close": None, "symbol": "MSFT"}
+
+
+def test_dataframe_to_arrays_returns_one_list_per_column(setup_transformed_frame):
+    arrays = dataframe_to_arrays(setup_transformed_frame, ["symbol", "volume", "close"])
+
+    assert arrays == (["AAPL", "MSFT"], [53197400, None], [245.55, None])
+
+
+def test_load_result_adds_counts():
+    result = LoadResult(inserted=2, updated=1) + LoadResult(updated=1, unchanged=5)
+
+    assert result == LoadResult(inserted=2, updated=2, unchanged=5)
+    assert result.rows == 9
+
+
+def test_partition_by_symbol_keeps_symbols_whole_and_sorted():
+    df = pd.DataFrame(
+        {
+            "symbol": pd.Categorical(["MSFT", "AAPL", "NFLX", "AAPL", "MSFT", "AAPL"]),
+            "date": pd.to_datetime(["2025-02-02", "2025-02-02", "2025-02-01", "2025-02-01", "2025-02-01", "2025-02-03"], utc=True),
+        }
+    )
+
+    partitions = partition_by_symbol(df, partition_rows=3)
+
+    assert [symbols for symbols, _ in partitions] == [["AAPL"], ["MSFT", "NFLX"]]
+    assert partitions[0][1]["date"].dt.day.tolist() == [1, 2, 3]
+    assert partitions[1][1]["symbol"].astype(str).tolist() == ["MSFT", "MSFT", "NFLX"]
+    assert partitions[1][1]["date"].dt.day.tolist() == [1, 2, 1]
+
+
+class FakePool:
+    def size(self):
+        return 2
+
+
+class FakeLoadEngine:
+    """
+    Stands in for a pooled engine: records every statement, and fails a symbol's upsert with `errors` in turn.
+    """
+
+    def __init__(self, errors):
+        self.dialect = postgresql.dialect()
+        self.pool = FakePool()
+        self.errors = errors
+        self.statements = []
+        self.upserts = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def exec_driver_sql(self, sql, parameters=None):
+        if parameters is None:
+            with self.lock:
+                self.statements.append(sql)
+            return []
+        symbols = parameters[0][5]
+        with self.lock:
+            self.upserts.append(symbols[0])
+            errors = self.errors.get(symbols[0])
+            error = errors.pop(0) if errors else None
+        if error is not None:
+            raise error
+        return [(True,)] * len(symbols)
+
+
+def dbapi_error(sqlstate):
+    return exc.DBAPIError("INSERT ...", {}, Exception({"C": sqlstate, "M": "failed"}))
+
+
+@pytest.fixture
+def setup_parallel_load(monkeypatch):
+    stocks_table = get_stocks_table(MetaData())
+    monkeypatch.setattr(db_connector, "prepare_stocks_table", lambda engine, df, table_name: stocks_table)
+    monkeypatch.setattr(db_connector.time, "sleep", lambda seconds: None)
+    return pd.DataFrame(
+        {
+            "unique_id": ["AAPL_1", "AAPL_2", "MSFT_1", "MSFT_2", "NFLX_1"],
+            "open": 1.0, "close": 1.0, "volume": 1.0, "dividend": 0.0,
+            "symbol": ["AAPL", "AAPL", "MSFT", "MSFT", "NFLX"],
+            "exchange": "XNAS",
+            "date": pd.to_datetime(["2025-02-03", "2025-02-04"] * 2 + ["2025-02-03"], utc=True),
+        }
+    )
+
+
+def test_load_data_parallel_retries_a_deadlocked_partition_once(setup_parallel_load, capsys):
+    engine = FakeLoadEngine({"AAPL": [dbapi_error("40P01")]})
+
+    result = load_data_parallel(setup_parallel_load, engine, workers=8, partition_rows=2, lock_timeout=2.5, base_delay=0)
+
+    # The AAPL partition ran twice but its rows are counted once
+    assert engine.upserts.count("AAPL") == 2
+    assert result == LoadResult(inserted=5)
+    # Every attempt sets its lock_timeout; workers are capped at the pool size
+    assert engine.statements == ["SET LOCAL lock_timeout = '2500ms'"] * 4
+    assert "finished on 2 workers: 3/3 symbols loaded" in capsys.readouterr().out
+
+
+def test_load_data_parallel_reports_committed_rows_on_a_non_retryable_error(setup_parallel_load):
+    engine = FakeLoadEngine({"MSFT": [dbapi_error("23505")]})
+
+    with pytest.raises(LoadError) as error:
+        load_data_parallel(setup_parallel_load, engine, workers=2, partition_rows=2, base_delay=0)
+
+    assert engine.upserts.count("MSFT") == 1
+    assert "MSFT" in str(error.value)
+    assert error.value.result == LoadResult(inserted=3)
@@ -0,0 +1,86 @@
+from connectors.pg_copy import build_merge_statement, build_upsert_ctes, iter_csv_chunks, iter_record_csv_chunks
+from sqlalchemy.dialects import postgresql
+import pandas as pd
+
+PREPARER = postgresql.dialect().identifier_preparer
+
+
+def test_iter_csv_chunks_writes_nulls_as_empty_fields_and_quotes_text():
+    df = pd.DataFrame(
+        {
+            "unique_id": ["AAPL_2025-02-24", "", None],
+            "volume": pd.array([53197400, None, 1], dtype="Int64"),
+            "date": pd.to_datetime(["2025-02-24T00:00:00+0000"] * 3, utc=True),
+        }
+    )
+
+    chunks = list(iter_csv_chunks(df, columns=["unique_id", "volume", "date"], chunk_rows=2))
+
+    assert chunks == [
+        '"AAPL_2025-02-24",53197400,"2025-02-24 00:00:00+00:00"\n"",,"2025-02-24 00:00:00+00:00"\n',
+        ',1,"2025-02-24 00:00:00+00:00"\n',
+    ]
+
+
+def test_iter_record_csv_chunks_reads_a_generator_in_chunks():
+    records = ({"symbol": f"S{i}", "close": i if i != 1 else None} for i in range(3))
+
+    chunks = list(iter_record_csv_chunks(records, columns=["symbol", "close", "volume"], chunk_rows=2))
+
+    assert chunks == ['"S0",0,\n"S1",,\n', '"S2",2,\n']
+
+
+def test_iter_record_csv_chunks_keeps_integers_next_to_nulls():
+    records = [
+        {"id": 1, "volume": None, "name": "", "flag": True},
+        {"id": 2, "volume": 3000000000, "name": 'a "b", c', "flag": None},
+    ]
+
+    chunks = list(iter_record_csv_chunks(records, columns=["id", "volume", "name", "flag"]))
+
+    assert chunks == ['1,,"",true\n2,3000000000,"a ""b"", c",\n']
+
+
+def test_merge_statement_skips_unchanged_rows_and_counts_keys():
+    statement = build_merge_statement(
+        PREPARER, "stocks", "stocks_staging", ["unique_id", "close", "symbol"], ["unique_id"]
+    )
+
+    # The last staged row of a duplicated key wins, as in the INSERT loaders
+    assert (
+        "SELECT DISTINCT ON (unique_id) unique_id, close, symbol FROM stocks_staging "
+        "ORDER BY unique_id, staging_row DESC"
+    ) in statement
+    assert (
+        "ON CONFLICT (unique_id) DO UPDATE SET close = EXCLUDED.close, symbol = EXCLUDED.symbol "
+        "WHERE (stocks.close, stocks.symbol) IS DISTINCT FROM (EXCLUDED.close, EXCLUDED.symbol) "
+        "RETURNING (xmax = 0) AS inserted"
+    ) in statement
+    # inserted, updated, and every staged key: the unchanged rows are the difference
+    assert statement.endswith(
+        "SELECT (SELECT count(*) FROM merged WHERE inserted), (SELECT count(*) FROM merged WHERE NOT inserted), "
+        "(SELECT count(*) FROM (SELECT DISTINCT unique_id FROM stocks_staging) AS staged_keys)"
+    )
+
+
+def test_upsert_ctes_rewrite_every_conflict_without_skip_unchanged():
+    ctes = build_upsert_ctes(
+        PREPARER, "stocks", "SELECT * FROM source", ["unique_id", "close"], ["unique_id"], skip_unchanged=False
+    )
+
+    assert "IS DISTINCT FROM" not in ctes
+    assert ctes.endswith("DO UPDATE SET close = EXCLUDED.close RETURNING (xmax = 0) AS inserted)")
+
+
+def test_upsert_ctes_probe_existing_keys_on_partitioned_tables():
+    ctes = build_upsert_ctes(
+        PREPARER, "stocks", "SELECT * FROM batch", ["close", "symbol", "date"], ["symbol", "date"], partitioned=True
+    )
+
+    assert "xmax" not in ctes
+    assert ctes.startswith("source (close, symbol, date) AS (SELECT * FROM batch), ")
+    assert "existing AS (SELECT symbol, date FROM stocks WHERE (symbol, date) IN (SELECT symbol, date FROM source))" in ctes
+    assert "WHERE (stocks.close) IS DISTINCT FROM (EXCLUDED.close) RETURNING symbol, date)" in ctes
+    assert ctes.endswith(
+        "merged AS (SELECT existing.symbol IS NULL AS inserted FROM upserted LEFT JOIN existing USING (symbol, date))"
+    )
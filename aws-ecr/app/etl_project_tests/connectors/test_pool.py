@@ -0,0 +1,42 @@
+from connectors.pool import PoolConfig, build_url, dispose_engines, get_pooled_engine, pool_metrics
+import pytest
+
+
+@pytest.fixture
+def setup_registry():
+    yield
+    dispose_engines()
+
+
+def test_get_pooled_engine_reuses_engine_per_dsn(setup_registry):
+    config = PoolConfig(pool_size=3, max_overflow=2)
+
+    engine = get_pooled_engine(build_url("postgres", "secret", "localhost", "stock"), config)
+    same_engine = get_pooled_engine(build_url("postgres", "secret", "localhost", "stock"))
+    other_engine = get_pooled_engine(build_url("postgres", "secret", "localhost", "logging"), config)
+
+    assert engine is same_engine
+    assert engine is not other_engine
+    assert engine.pool.size() == 3
+
+
+def test_get_pooled_engine_honours_an_explicit_config_for_a_registered_dsn(setup_registry):
+    url = build_url("postgres", "secret", "localhost", "logging")
+    shared = get_pooled_engine(url, PoolConfig(pool_size=5))
+
+    ledger_engine = get_pooled_engine(url, PoolConfig(pool_size=1, max_overflow=0))
+
+    assert ledger_engine is not shared
+    assert ledger_engine.pool.size() == 1
+    assert get_pooled_engine(url, PoolConfig(pool_size=1, max_overflow=0)) is ledger_engine
+    assert get_pooled_engine(url) is shared
+
+
+def test_pool_metrics_before_any_checkout(setup_registry):
+    engine = get_pooled_engine(build_url("postgres", "secret", "localhost", "stock"), PoolConfig())
+
+    metrics = pool_metrics(engine)
+
+    assert metrics["in_use"] == 0
+    assert metrics["checkouts"] == 0
+    assert metrics["avg_wait_seconds"] == 0.0
@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+from connectors.pool import dispose_engines
+from connectors.postgresql import PostgreSqlClient
+from sqlalchemy import Table, Column, Integer, String, Float, MetaData
+import pyarrow as pa
+import pytest
+
+ROWS = [(1, "AAPL", 245.5), (2, "MSFT", None), (3, "NFLX", 1000.0), (4, None, 12.0), (5, "AMZN", 212.3)]
+
+
+class FakeRow(tuple):
+    names = ()
+
+    @property
+    def _mapping(self):
+        return dict(zip(self.names, self))
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.options = {}
+        self.statements = []
+        self.partition_sizes = []
+
+    def execution_options(self, **options):
+        self.options.update(options)
+        return self
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        names = [column.name for column in statement.selected_columns]
+        positions = [["id", "symbol", "close"].index(name) for name in names]
+        row_type = type("Row", (FakeRow,), {"names": names})
+        self.result_rows = [row_type(row[position] for position in positions) for row in self.rows]
+        return self
+
+    def partitions(self, size):
+        self.partition_sizes.append(size)
+        for start in range(0, len(self.result_rows), size):
+            yield self.result_rows[start:start + size]
+
+
+class FakeEngine:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextmanager
+    def connect(self):
+        yield self.conn
+
+
+@pytest.fixture
+def setup_client():
+    table = Table("stocks", MetaData(), Column("id", Integer), Column("symbol", String), Column("close", Float))
+    client = PostgreSqlClient("localhost", "stock", "postgres", "secret")
+    conn = FakeConnection(ROWS)
+    client.engine = FakeEngine(conn)
+    yield client, conn, table
+    dispose_engines()
+
+
+def test_stream_uses_a_server_side_cursor_and_yields_dicts(setup_client):
+    client, conn, table = setup_client
+
+    rows = list(client.stream(table, columns=["symbol", "close"], where=table.c.id > 1, yield_per=2))
+
+    assert conn.options == {"stream_results": True, "max_row_buffer": 2}
+    assert conn.partition_sizes == [2]
+    assert "WHERE stocks.id >" in str(conn.statements[0])
+    assert rows[:2] == [{"symbol": "AAPL", "close": 245.5}, {"symbol": "MSFT", "close": None}]
+    assert len(rows) == 5
+
+
+def test_select_all_reads_every_row_through_stream(setup_client):
+    client, conn, table = setup_client
+
+    assert client.select_all(table) == [{"id": row[0], "symbol": row[1], "close": row[2]} for row in ROWS]
+    assert conn.options["stream_results"] is True
+
+
+def test_stream_yields_one_dataframe_per_fetch(setup_client):
+    client, _, table = setup_client
+
+    frames = list(client.stream(table, yield_per=2, output="dataframe"))
+
+    assert [len(frame) for frame in frames] == [2, 2, 1]
+    assert list(frames[0].columns) == ["id", "symbol", "close"]
+    assert frames[2]["symbol"].tolist() == ["AMZN"]
+
+
+def test_stream_yields_typed_arrow_batches(setup_client):
+    client, _, table = setup_client
+
+    batches = list(client.stream(table, yield_per=3, output="arrow"))
+
+    assert [batch.num_rows for batch in batches] == [3, 2]
+    assert batches[0].schema == pa.schema([("id", pa.int64()), ("symbol", pa.string()), ("close", pa.float64())])
+    assert batches[1].column(1).to_pylist() == [None, "AMZN"]
+
+
+def test_stream_rejects_unknown_outputs(setup_client):
+    client, _, table = setup_client
+
+    with pytest.raises(ValueError):
+        list(client.stream(table, output="csv"))
@@ -0,0 +1,72 @@
+from connectors.schema import (
+    build_create_partition_sql, build_migration_copy_sql, build_migration_swap_sql, partition_bounds,
+    partition_granularity,
+)
+from sqlalchemy.dialects import postgresql
+import pandas as pd
+import pytest
+
+
+def test_partition_bounds_cover_the_date_range_by_month():
+    bounds = partition_bounds(
+        pd.Timestamp("2025-01-31T00:00:00+0000"), pd.Timestamp("2025-03-01T00:00:00+0000"), "month"
+    )
+
+    assert [suffix for suffix, _, _ in bounds] == ["p2025_01", "p2025_02", "p2025_03"]
+    assert bounds[0][1] == pd.Timestamp("2025-01-01", tz="UTC")
+    assert bounds[-1][2] == pd.Timestamp("2025-04-01", tz="UTC")
+
+
+def test_partition_bounds_by_year():
+    bounds = partition_bounds("2024-06-30", "2025-01-02", "year")
+
+    assert bounds == [
+        ("p2024", pd.Timestamp("2024-01-01", tz="UTC"), pd.Timestamp("2025-01-01", tz="UTC")),
+        ("p2025", pd.Timestamp("2025-01-01", tz="UTC"), pd.Timestamp("2026-01-01", tz="UTC")),
+    ]
+
+
+@pytest.mark.parametrize(
+    "bound, granularity",
+    [
+        ("FOR VALUES FROM ('2025-01-01 00:00:00+00') TO ('2025-02-01 00:00:00+00')", "month"),
+        ("FOR VALUES FROM ('2024-12-01 00:00:00+00') TO ('2025-01-01 00:00:00+00')", "month"),
+        ("FOR VALUES FROM ('2024-01-01 00:00:00+00') TO ('2025-01-01 00:00:00+00')", "year"),
+        ("FOR VALUES FROM ('2025-01-01 00:00:00+00') TO ('2025-01-08 00:00:00+00')", None),
+        ("FOR VALUES FROM (MINVALUE) TO ('2025-01-01 00:00:00+00')", None),
+        ("DEFAULT", None),
+    ],
+)
+def test_partition_granularity_reads_the_bound_span(bound, granularity):
+    assert partition_granularity(bound) == granularity
+
+
+def test_build_create_partition_sql():
+    _, start, end = partition_bounds("2025-02-10", "2025-02-10", "month")[0]
+
+    sql = build_create_partition_sql(postgresql.dialect().identifier_preparer, "stocks", "stocks_p2025_02", start, end)
+
+    assert sql == (
+        "CREATE TABLE IF NOT EXISTS stocks_p2025_02 PARTITION OF stocks "
+        "FOR VALUES FROM ('2025-02-01T00:00:00+00:00') TO ('2025-03-01T00:00:00+00:00')"
+    )
+
+
+def test_build_migration_sql_copies_one_row_per_key_and_swaps_names():
+    preparer = postgresql.dialect().identifier_preparer
+
+    copy_sql = build_migration_copy_sql(preparer, "stocks", "stocks_partitioned", ["unique_id", "symbol", "date"])
+    swap_sql = build_migration_swap_sql(preparer, "stocks", "stocks_partitioned", "stocks_legacy")
+
+    assert copy_sql == (
+        "INSERT INTO stocks_partitioned (unique_id, symbol, date) "
+        "SELECT DISTINCT ON (symbol, date) unique_id, symbol, date FROM stocks "
+        "WHERE symbol IS NOT NULL AND date IS NOT NULL ORDER BY symbol, date"
+    )
+    assert swap_sql == [
+        "ALTER TABLE stocks RENAME TO stocks_legacy",
+        "ALTER TABLE stocks_legacy RENAME CONSTRAINT stocks_pkey TO stocks_legacy_pkey",
+        "ALTER TABLE stocks_partitioned RENAME TO stocks",
+        "ALTER TABLE stocks RENAME CONSTRAINT stocks_partitioned_pkey TO stocks_pkey",
+        "ALTER INDEX ix_stocks_partitioned_date_brin RENAME TO ix_stocks_date_brin",
+    ]
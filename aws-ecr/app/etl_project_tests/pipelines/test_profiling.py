@@ -0,0 +1,62 @@
+from pipelines.profiling import StageProfiler, parse_modes
+import json
+import os
+import pytest
+import tracemalloc
+
+
+def test_stage_profiler_writes_artifacts_and_metrics(tmp_path):
+    profiler = StageProfiler.from_env("run-1", modes="all", profile_dir=str(tmp_path))
+    metrics = {}
+
+    with profiler.profile("transform:0", metrics):
+        sum(range(10_000))
+
+    assert sorted(os.listdir(tmp_path / "run-1")) == [
+        "summary.jsonl", "transform_0.alloc.txt", "transform_0.prof", "transform_0.txt"
+    ]
+    assert {"thread_cpu_seconds", "process_cpu_seconds", "peak_traced_bytes"} <= set(metrics)
+    assert metrics["peak_traced_bytes"] > 0
+
+
+def test_stage_profiler_drops_peaks_of_overlapping_stages(tmp_path):
+    profiler = StageProfiler(("tracemalloc",), str(tmp_path))
+    outer, inner, alone = {}, {}, {}
+
+    with profiler.profile("extract:0", outer):
+        with profiler.profile("extract:1", inner):
+            bytearray(1_000_000)
+    with profiler.profile("load", alone):
+        bytearray(1_000_000)
+
+    assert outer["peak_traced_bytes"] is None and inner["peak_traced_bytes"] is None
+    assert alone["peak_traced_bytes"] >= 1_000_000
+    with open(tmp_path / "summary.jsonl", encoding="utf-8") as file:
+        summary = [json.loads(line) for line in file]
+    assert [line["tracemalloc_overlapped"] for line in summary] == [True, True, False]
+
+
+def test_stage_profiler_leaves_tracing_it_did_not_start_running(tmp_path):
+    profiler = StageProfiler(("tracemalloc",), str(tmp_path))
+    metrics = {}
+
+    tracemalloc.start()
+    try:
+        with profiler.profile("load", metrics):
+            bytearray(1_000_000)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    assert metrics["peak_traced_bytes"] >= 1_000_000
+    with profiler.profile("load", {}):
+        pass
+    assert not tracemalloc.is_tracing()
+
+
+def test_profiling_is_off_without_modes(monkeypatch):
+    monkeypatch.delenv("PROFILE", raising=False)
+
+    assert StageProfiler.from_env("run-1") is None
+    with pytest.raises(ValueError):
+        parse_modes("timing,perf")
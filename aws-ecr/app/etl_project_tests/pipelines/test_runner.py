@@ -0,0 +1,90 @@
+from pipelines.runner import Pipeline, PipelineError, Stage, stage_metrics
+import pandas as pd
+import pytest
+
+
+def build_pipeline(work_dir, calls, fail_load=False):
+    def extract(symbol):
+        calls.append(f"extract:{symbol}")
+        return pd.DataFrame({"symbol": [symbol, symbol], "close": [1.0, 2.0]})
+
+    def load(*frames):
+        calls.append("load")
+        if fail_load:
+            raise RuntimeError("database is down")
+        return sum(len(frame) for frame in frames)
+
+    pipeline = Pipeline("test", work_dir=str(work_dir), max_workers=2)
+    pipeline.add(Stage("extract:AAPL", lambda: extract("AAPL")))
+    pipeline.add(Stage("extract:MSFT", lambda: extract("MSFT")))
+    pipeline.add(Stage("load", load, depends_on=["extract:AAPL", "extract:MSFT"], checkpoint=None))
+    return pipeline
+
+
+def test_pipeline_resumes_from_checkpoints(tmp_path):
+    calls = []
+    with pytest.raises(PipelineError) as error:
+        build_pipeline(tmp_path, calls, fail_load=True).run("run-1")
+    assert list(error.value.failed) == ["load"]
+
+    calls.clear()
+    outputs = build_pipeline(tmp_path, calls).run("run-1")
+
+    assert outputs == {"load": 4}
+    assert calls == ["load"]
+
+
+def test_pipeline_retries_a_failed_stage():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("reset by peer")
+        return "ok"
+
+    pipeline = Pipeline("test")
+    pipeline.add(Stage("extract", flaky, retries=2, retry_delay=0))
+
+    assert pipeline.run() == {"extract": "ok"}
+    assert len(attempts) == 3
+
+
+def test_pipeline_rejects_cycles():
+    pipeline = Pipeline("test")
+    pipeline.add(Stage("a", lambda b: b, depends_on=["b"]))
+    pipeline.add(Stage("b", lambda a: a, depends_on=["a"]))
+
+    with pytest.raises(ValueError, match="cycle"):
+        pipeline.run()
+
+
+class ListLedger:
+    def __init__(self):
+        self.runs = []
+        self.stages = {}
+
+    def run_started(self, pipeline, run_id, started_at, trigger=None):
+        self.runs.append(("running", trigger))
+
+    def stage_finished(self, pipeline, run_id, stage, metrics):
+        self.stages[stage] = metrics
+
+    def run_finished(self, pipeline, run_id, metrics):
+        self.runs.append((metrics["status"], metrics["api_calls"]))
+
+
+def test_pipeline_reports_stage_metrics_to_the_ledger():
+    def extract():
+        stage_metrics().update(api_calls=3)
+        return pd.DataFrame({"close": [1.0, 2.0, 3.0]})
+
+    ledger = ListLedger()
+    pipeline = Pipeline("test", ledger=ledger)
+    pipeline.add(Stage("extract", extract))
+    pipeline.add(Stage("transform", lambda df: df.head(2), depends_on=["extract"]))
+    pipeline.run(trigger="manual")
+
+    assert ledger.runs == [("running", "manual"), ("succeeded", 3)]
+    assert ledger.stages["transform"]["rows_in"] == 3
+    assert ledger.stages["transform"]["rows_out"] == 2
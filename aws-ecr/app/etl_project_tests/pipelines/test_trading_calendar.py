@@ -0,0 +1,27 @@
+from pipelines.trading_calendar import TradingCalendar, exchange_holidays
+from datetime import date, timedelta
+import pandas as pd
+
+
+def test_exchange_holidays_2022_observed_dates():
+    holidays = exchange_holidays(2022)
+
+    assert date(2021, 12, 31) not in exchange_holidays(2021)  # New Year's Day 2022 fell on a Saturday
+    assert date(2022, 4, 15) in holidays  # Good Friday
+    assert date(2022, 6, 20) in holidays  # Juneteenth, observed on Monday
+    assert date(2022, 12, 26) in holidays  # Christmas, observed on Monday
+    assert len(holidays) == 9
+
+
+def test_next_close_skips_weekends_and_holidays():
+    calendar = TradingCalendar(extra_holidays=["2025-01-09"])
+    delay = timedelta(minutes=30)
+
+    # Friday after the trigger -> Tuesday (Monday is MLK Day)
+    assert calendar.next_close(pd.Timestamp("2025-01-17 16:45", tz="America/New_York"), delay) == pd.Timestamp(
+        "2025-01-21 16:30", tz="America/New_York"
+    )
+    # Wednesday before the trigger -> same day; an extra holiday on Thursday is skipped next
+    assert calendar.next_close(pd.Timestamp("2025-01-08 21:00", tz="UTC"), delay).day == 8
+    assert calendar.next_close(pd.Timestamp("2025-01-08 17:00", tz="America/New_York"), delay).day == 10
+    assert not calendar.is_open(pd.Timestamp("2025-07-04 12:00", tz="America/New_York"))
@@ -0,0 +1,46 @@
+# --------------------
+# Import Statements
+# --------------------
+from dotenv import load_dotenv
+import os
+from sqlalchemy import MetaData
+from assets.bike_sales import CSV_BLOCK_SIZE, read_bike_sales_batches
+from connectors.pool import pool_metrics
+from connectors.schema import get_bike_sales_table
+from connectors.db_connector import get_engine, load_batches_copy
+
+# --------------------
+# Load Environment Variables
+# --------------------
+load_dotenv()
+
+db_user = os.getenv('DB_USER')
+db_password = os.getenv('DB_PASSWORD')
+db_server_name = os.getenv('DB_SERVER_NAME')
+db_database_name = os.getenv('DB_DATABASE_NAME')
+
+# Path of bike_sales_india.csv and the table it is loaded into
+bike_sales_csv = os.getenv('BIKE_SALES_CSV')
+bike_sales_table = os.getenv('BIKE_SALES_TABLE', 'bike_sales')
+
+# Bytes of CSV parsed per batch; bounds memory however large the file grows
+csv_block_size = int(os.getenv('CSV_BLOCK_SIZE', CSV_BLOCK_SIZE))
+
+# "replace" reloads the whole table in one transaction, "append" adds the file's rows
+load_mode = os.getenv('BIKE_SALES_LOAD_MODE', 'replace').lower()
+
+if not all([bike_sales_csv, db_user, db_password, db_server_name, db_database_name]):
+    raise ValueError("One or more required environment variables are missing.")
+
+# --------------------
+# Run ETL Pipeline
+# --------------------
+if __name__ == "__main__":
+    engine = get_engine(db_user, db_password, db_server_name, db_database_name)
+
+    # Extract and type the CSV in blocks, then COPY each block as it is parsed
+    batches = read_bike_sales_batches(bike_sales_csv, block_size=csv_block_size)
+    table = get_bike_sales_table(MetaData(), bike_sales_table)
+    load_batches_copy(batches, engine, table, replace=load_mode == 'replace')
+
+    print(f"Connection pool: {pool_metrics(engine)}")
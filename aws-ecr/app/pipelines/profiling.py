@@ -0,0 +1,173 @@
+# --------------------
+# Import Statements
+# --------------------
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+PROFILE_MODES = ("timing", "cprofile", "tracemalloc")
+
+# Functions / allocation sites listed in the text summaries
+PROFILE_TOP_N = 25
+
+# tracemalloc is process-wide: it runs while at least one profiled stage needs it.
+# Maps each traced stage to whether another traced stage overlapped it
+_tracing_lock = threading.Lock()
+_tracing_stages = {}
+# Whether the profiler started tracemalloc; tracing started elsewhere (e.g. PYTHONTRACEMALLOC) is left running
+_tracing_owned = False
+
+
+def _start_tracing() -> object:
+    """
+    Starts tracing for one stage and returns its token. The peak is only reset when no other stage is traced.
+    """
+    global _tracing_owned
+    token = object()
+    with _tracing_lock:
+        if not _tracing_stages and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        overlapped = bool(_tracing_stages)
+        for other in _tracing_stages:
+            _tracing_stages[other] = True
+        _tracing_stages[token] = overlapped
+        if not overlapped:
+            tracemalloc.reset_peak()
+    return token
+
+
+def _stop_tracing(token) -> tuple:
+    """
+    Stops tracing for one stage. Returns (peak traced bytes, whether another traced stage overlapped it).
+    tracemalloc itself is only stopped after the last stage, and only if the profiler started it.
+    """
+    global _tracing_owned
+    with _tracing_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        overlapped = _tracing_stages.pop(token)
+        if not _tracing_stages and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+    return peak, overlapped
+
+
+def parse_modes(value: str) -> tuple:
+    """
+    Parses "cprofile,tracemalloc" (or "all") into profile modes. Raises ValueError on unknown modes.
+    """
+    if not value:
+        return ()
+    modes = PROFILE_MODES if value.strip().lower() == "all" else tuple(mode.strip().lower() for mode in value.split(","))
+    unknown = set(modes) - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Profile modes must be made of {PROFILE_MODES} or 'all', got {value!r}")
+    return modes
+
+# --------------------
+# Stage Profiler
+# --------------------
+class StageProfiler:
+    """
+    Opt-in instrumentation of pipeline stages, writing to one artifact directory per run.
+    - "timing": wall, thread CPU and process CPU seconds; CPU times are added to the stage metrics (and the run ledger)
+    - "cprofile": {stage}.prof (for snakeviz / pstats) and {stage}.txt with the top functions by cumulative time
+    - "tracemalloc": peak traced memory (a stage metric), plus {stage}.alloc.txt with the top allocation sites
+      added while the stage ran
+    Every stage appends one line to summary.jsonl.
+    cProfile only sees the stage's own thread, so time spent in a stage's worker pool shows as waiting; see the
+    fetch_seconds / decode_seconds metrics of extract stages for that split. tracemalloc is process-wide, so a
+    peak is only recorded for stages that ran while no other stage was traced; for overlapping stages (e.g. under
+    the thread executor) peak_traced_bytes is left empty (NULL in the run ledger), summary.jsonl marks them
+    "tracemalloc_overlapped", and their allocation sites include the other stages'. Runners without a profiler do none of this.
+    """
+
+    def __init__(self, modes: tuple, artifact_dir: str, top_n: int = PROFILE_TOP_N):
+        self.modes = parse_modes(",".join(modes)) if modes else ()
+        self.artifact_dir = artifact_dir
+        self.top_n = top_n
+
+    @classmethod
+    def from_env(cls, run_id: str, modes: str = None, profile_dir: str = None):
+        """
+        Reads PROFILE (e.g. "timing,cprofile", "all") and PROFILE_DIR (default "profiles"); arguments take precedence.
+        Returns None when no mode is enabled.
+        """
+        modes = parse_modes(modes if modes is not None else os.getenv("PROFILE", ""))
+        if not modes:
+            return None
+        profile_dir = profile_dir or os.getenv("PROFILE_DIR", "profiles")
+        return cls(modes, os.path.join(profile_dir, run_id), int(os.getenv("PROFILE_TOP_N", PROFILE_TOP_N)))
+
+    def _path(self, stage_name: str, suffix: str) -> str:
+        return os.path.join(self.artifact_dir, re.sub(r"[^\w.-]", "_", stage_name) + suffix)
+
+    @contextmanager
+    def profile(self, stage_name: str, metrics: dict):
+        """
+        Instruments the body as stage `stage_name` and adds its measurements to `metrics`.
+        """
+        os.makedirs(self.artifact_dir, exist_ok=True)
+
+        if "tracemalloc" in self.modes:
+            tracing = _start_tracing()
+            before = tracemalloc.take_snapshot()
+
+        profiler = None
+        if "cprofile" in self.modes:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        wall_start = time.perf_counter()
+        thread_cpu_start = time.thread_time()
+        process_cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            measured = {}
+            if "timing" in self.modes:
+                measured.update(
+                    wall_seconds=time.perf_counter() - wall_start,
+                    thread_cpu_seconds=time.thread_time() - thread_cpu_start,
+                    process_cpu_seconds=time.process_time() - process_cpu_start,
+                )
+
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(self._path(stage_name, ".prof"))
+                summary = io.StringIO()
+                pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(self.top_n)
+                with open(self._path(stage_name, ".txt"), "w", encoding="utf-8") as file:
+                    file.write(summary.getvalue())
+
+            if "tracemalloc" in self.modes:
+                top_stats = tracemalloc.take_snapshot().compare_to(before, "lineno")[:self.top_n]
+                peak, overlapped = _stop_tracing(tracing)
+                # Another stage's allocations (and peak resets) make an overlapped peak meaningless
+                measured["peak_traced_bytes"] = None if overlapped else peak
+                measured["tracemalloc_overlapped"] = overlapped
+                with open(self._path(stage_name, ".alloc.txt"), "w", encoding="utf-8") as file:
+                    file.write("\n".join(str(stat) for stat in top_stats) + "\n")
+
+            # The runner measures wall time itself; CPU time and memory are what profiling adds
+            metrics.update({
+                key: value for key, value in measured.items() if key not in ("wall_seconds", "tracemalloc_overlapped")
+            })
+            line = json.dumps({
+                "stage": stage_name,
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+                "thread": threading.current_thread().name,
+                "pid": os.getpid(),
+                **measured,
+            })
+            # One short write per stage; appends of a single line do not interleave between workers
+            with open(os.path.join(self.artifact_dir, "summary.jsonl"), "a", encoding="utf-8") as file:
+                file.write(line + "\n")
@@ -0,0 +1,382 @@
+# --------------------
+# Import Statements
+# --------------------
+import json
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import pandas as pd
+
+EXECUTORS = ("thread", "process")
+
+# "auto": Parquet for DataFrames, pickle for anything else; None: never checkpointed
+CHECKPOINT_FORMATS = ("auto", "parquet", "pickle")
+
+STATE_NAME = "state.json"
+
+
+class PipelineError(Exception):
+    """
+    Raised when one or more stages fail after their retries. `failed` maps stage name -> exception.
+    """
+
+    def __init__(self, message, failed):
+        super().__init__(message)
+        self.failed = failed
+
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline.
+    - `func` is called with the outputs of `depends_on`, positionally and in that order
+    - A failed call is retried `retries` times, waiting retry_delay * 2**attempt between attempts
+    - `executor="process"` runs the stage in a process pool (func, inputs and output must be picklable);
+      "thread" suits I/O-bound stages and anything holding a connection or a client
+    - `checkpoint` saves the output in the run directory so a resumed run can skip the stage
+    """
+    name: str
+    func: callable
+    depends_on: list = field(default_factory=list)
+    retries: int = 0
+    retry_delay: float = 1.0
+    executor: str = "thread"
+    checkpoint: str = "auto"
+
+    def __post_init__(self):
+        if self.executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {self.executor!r}")
+        if self.checkpoint is not None and self.checkpoint not in CHECKPOINT_FORMATS:
+            raise ValueError(f"checkpoint must be one of {CHECKPOINT_FORMATS} or None, got {self.checkpoint!r}")
+        self.depends_on = list(self.depends_on)
+
+
+_local = threading.local()
+
+
+def stage_metrics() -> dict:
+    """
+    Returns the metrics dict of the stage running on this thread, for stage functions to add counters to
+    (e.g. api_calls, bytes_received, rows_loaded). Outside a stage, returns a dict nobody reads.
+    """
+    metrics = getattr(_local, "metrics", None)
+    return metrics if metrics is not None else {}
+
+
+def count_rows(value):
+    """
+    Rows of a stage input or output: len() of a DataFrame or Arrow table, `.rows` of a load result, else None.
+    """
+    if isinstance(value, pd.DataFrame) or hasattr(value, "num_rows"):
+        return len(value)
+    rows = getattr(value, "rows", None)
+    return rows if isinstance(rows, int) else None
+
+
+def _call_with_retries(func, inputs, retries, retry_delay, name, profiler=None):
+    """
+    Runs one stage in its worker, under `profiler` if given. Module-level so process pools can pickle it.
+    Returns (output, error, attempts, seconds, metrics); `error` is the last exception once retries run out.
+    """
+    start = time.perf_counter()
+    _local.metrics = metrics = {}
+    try:
+        if profiler is None:
+            return _attempt(func, inputs, retries, retry_delay, name, start, metrics)
+        with profiler.profile(name, metrics):
+            return _attempt(func, inputs, retries, retry_delay, name, start, metrics)
+    finally:
+        _local.metrics = None
+
+
+def _attempt(func, inputs, retries, retry_delay, name, start, metrics):
+    for attempt in range(retries + 1):
+        try:
+            return func(*inputs), None, attempt + 1, time.perf_counter() - start, metrics
+        except Exception as e:
+            if attempt == retries:
+                return None, e, attempt + 1, time.perf_counter() - start, metrics
+            delay = retry_delay * 2 ** attempt
+            print(f"Stage {name} failed (attempt {attempt + 1} of {retries + 1}): {e}. Retrying in {delay:.1f}s.")
+            time.sleep(delay)
+
+# --------------------
+# Pipeline
+# --------------------
+class Pipeline:
+    """
+    A DAG of stages, run with stage-level concurrency and checkpointed outputs.
+    - Every stage whose dependencies are done is submitted at once: independent branches (datasets,
+      symbol groups) overlap on a pool of `max_workers` threads, or `process_workers` processes
+    - With a `work_dir`, outputs are checkpointed under {work_dir}/{name}/{run_id}/ and state.json
+      records the completed stages; run(run_id=...) of the same run skips them
+    - After a failure no new stage starts, but running stages finish and are checkpointed,
+      so the resumed run starts from everything that did succeed
+    - Outputs are released once every dependent stage has finished; run() returns those of
+      the sink stages (stages nothing depends on)
+    - A `ledger` (connectors.run_ledger.RunLedger) is sent the run and every finished or failed stage
+    - A `profiler` (pipelines.profiling.StageProfiler) instruments every stage that runs
+    """
+
+    def __init__(self, name: str, work_dir: str = None, max_workers: int = 4, process_workers: int = None,
+                 ledger=None, profiler=None):
+        self.name = name
+        self.work_dir = work_dir
+        self.max_workers = max_workers
+        self.process_workers = process_workers
+        self.ledger = ledger
+        self.profiler = profiler
+        self.stages = {}
+
+    def add(self, stage: Stage) -> Stage:
+        if stage.name in self.stages:
+            raise ValueError(f"Stage {stage.name} is already defined in {self.name}.")
+        self.stages[stage.name] = stage
+        return stage
+
+    def stage(self, name: str = None, depends_on: list = (), **options):
+        """
+        Decorator form of add(): @pipeline.stage("transform", depends_on=["extract"], retries=2).
+        """
+        def decorator(func):
+            self.add(Stage(name or func.__name__, func, depends_on=depends_on, **options))
+            return func
+        return decorator
+
+    def order(self) -> list:
+        """
+        Returns the stage names in dependency order. Raises ValueError on unknown dependencies or cycles.
+        """
+        ordered = []
+        visiting = set()
+
+        def visit(name, path):
+            if name in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline {self.name} has a cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage {name} depends on unknown stage {dependency}.")
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return ordered
+
+    # --------------------
+    # Checkpoints
+    # --------------------
+    def run_dir(self, run_id: str) -> str:
+        return os.path.join(self.work_dir, self.name, run_id)
+
+    def latest_run(self) -> str:
+        """
+        Returns the most recent run id in the work directory, or None.
+        """
+        root = os.path.join(self.work_dir, self.name)
+        runs = sorted(entry for entry in os.listdir(root) if os.path.isdir(os.path.join(root, entry))) if os.path.isdir(root) else []
+        return runs[-1] if runs else None
+
+    def _read_state(self, run_id: str) -> dict:
+        try:
+            with open(os.path.join(self.run_dir(run_id), STATE_NAME), encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"stages": {}}
+
+    def _write_state(self, run_id: str, state: dict) -> None:
+        directory = self.run_dir(run_id)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump(state, file, indent=2, sort_keys=True)
+        os.replace(temp_path, os.path.join(directory, STATE_NAME))
+
+    def _save_checkpoint(self, run_id: str, stage: Stage, output):
+        """
+        Writes a stage output to the run directory (atomically) and returns its file name.
+        """
+        file_format = stage.checkpoint
+        if file_format == "auto":
+            file_format = "parquet" if isinstance(output, pd.DataFrame) else "pickle"
+        file_name = re.sub(r"[^\w.-]", "_", stage.name) + (".parquet" if file_format == "parquet" else ".pkl")
+
+        directory = self.run_dir(run_id)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(file_descriptor, "wb") as file:
+            if file_format == "parquet":
+                output.to_parquet(file, index=False)
+            else:
+                pickle.dump(output, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, os.path.join(directory, file_name))
+        return file_name
+
+    def _load_checkpoint(self, run_id: str, file_name: str):
+        path = os.path.join(self.run_dir(run_id), file_name)
+        if file_name.endswith(".parquet"):
+            return pd.read_parquet(path)
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    # --------------------
+    # Run
+    # --------------------
+    def run(self, run_id: str = None, trigger: str = None) -> dict:
+        """
+        Runs every stage, or resumes `run_id` when it has checkpoints in the work directory.
+        `trigger` (e.g. "post-close") is only recorded in the ledger.
+        Returns {stage name: output} of the sink stages.
+        Raises PipelineError if any stage fails after its retries.
+        """
+        order = self.order()
+        run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        started_at = datetime.now(timezone.utc)
+        run_start = time.perf_counter()
+        totals = {}
+        if self.ledger is not None:
+            self.ledger.run_started(self.name, run_id, started_at, trigger)
+        checkpointing = self.work_dir is not None
+        state = {"stages": {}}
+        if checkpointing:
+            os.makedirs(self.run_dir(run_id), exist_ok=True)
+            state = self._read_state(run_id)
+        completed = state["stages"]
+
+        dependents = {name: [] for name in order}
+        for name in order:
+            for dependency in self.stages[name].depends_on:
+                dependents[dependency].append(name)
+
+        # A completed stage is skipped if its output can be reloaded, or if nothing that still runs needs it
+        skipped = set()
+        for name in reversed(order):
+            entry = completed.get(name)
+            if entry and (entry.get("checkpoint") or all(dependent in skipped for dependent in dependents[name])):
+                skipped.add(name)
+        if skipped:
+            print(f"Resuming {self.name} run {run_id}: skipping {len(skipped)} completed stage(s).")
+
+        outputs = {}
+        remaining_dependents = {name: len(dependents[name]) for name in order}
+        pending = [name for name in order if name not in skipped]
+        finished = set(skipped)
+        failed = {}
+        running = {}
+        submitted_at = {}
+
+        def record(stage, status, attempts, seconds, metrics, inputs_rows, output=None, error=None):
+            for key, value in metrics.items():
+                if isinstance(value, (int, float)):
+                    totals[key] = totals.get(key, 0) + value
+            totals["retries"] = totals.get("retries", 0) + attempts - 1
+            if self.ledger is not None:
+                self.ledger.stage_finished(self.name, run_id, stage.name, {
+                    "status": status,
+                    "started_at": submitted_at[stage.name],
+                    "wall_seconds": seconds,
+                    "attempts": attempts,
+                    "retries": attempts - 1,
+                    "rows_in": inputs_rows,
+                    "rows_out": count_rows(output),
+                    "error": None if error is None else repr(error)[:2000],
+                    **metrics,
+                })
+
+        thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        process_pool = None
+        if any(self.stages[name].executor == "process" for name in pending):
+            process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+
+        def inputs_of(stage):
+            for dependency in stage.depends_on:
+                if dependency not in outputs:
+                    outputs[dependency] = self._load_checkpoint(run_id, completed[dependency]["checkpoint"])
+            return [outputs[dependency] for dependency in stage.depends_on]
+
+        def release(stage):
+            for dependency in stage.depends_on:
+                remaining_dependents[dependency] -= 1
+                if remaining_dependents[dependency] == 0:
+                    outputs.pop(dependency, None)
+
+        try:
+            while pending or running:
+                if not failed:
+                    for name in [name for name in pending if all(d in finished for d in self.stages[name].depends_on)]:
+                        stage = self.stages[name]
+                        pool = process_pool if stage.executor == "process" else thread_pool
+                        inputs = inputs_of(stage)
+                        future = pool.submit(
+                            _call_with_retries, stage.func, inputs, stage.retries, stage.retry_delay, name, self.profiler
+                        )
+                        rows = [count_rows(value) for value in inputs if count_rows(value) is not None]
+                        running[future] = (stage, sum(rows) if rows else None)
+                        submitted_at[name] = datetime.now(timezone.utc)
+                        pending.remove(name)
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, inputs_rows = running.pop(future)
+                    try:
+                        output, error, attempts, seconds, metrics = future.result()
+                    except Exception as e:
+                        # The worker itself failed, e.g. a process pool that could not pickle the stage
+                        output, error, attempts, seconds, metrics = None, e, 1, 0.0, {}
+                    if error is not None:
+                        failed[stage.name] = error
+                        record(stage, "failed", attempts, seconds, metrics, inputs_rows, error=error)
+                        print(f"Stage {stage.name} failed: {error}")
+                        continue
+
+                    record(stage, "succeeded", attempts, seconds, metrics, inputs_rows, output)
+                    outputs[stage.name] = output
+                    finished.add(stage.name)
+                    release(stage)
+                    entry = {"attempts": attempts, "seconds": round(seconds, 3), "checkpoint": None}
+                    if checkpointing and stage.checkpoint is not None:
+                        entry["checkpoint"] = self._save_checkpoint(run_id, stage, output)
+                    if checkpointing:
+                        completed[stage.name] = entry
+                        self._write_state(run_id, state)
+                    print(f"Stage {stage.name} completed in {seconds:.2f}s (attempt {attempts}).")
+        finally:
+            thread_pool.shutdown(wait=True)
+            if process_pool is not None:
+                process_pool.shutdown(wait=True)
+
+        if self.ledger is not None:
+            self.ledger.run_finished(self.name, run_id, {
+                "status": "failed" if failed else "succeeded",
+                "finished_at": datetime.now(timezone.utc),
+                "wall_seconds": time.perf_counter() - run_start,
+                "stages_run": len(submitted_at),
+                "stages_skipped": len(skipped),
+                "error": "; ".join(f"{name}: {error!r}" for name, error in failed.items())[:2000] or None,
+                **totals,
+            })
+
+        if failed:
+            not_run = list(pending)
+            raise PipelineError(
+                f"Pipeline {self.name} run {run_id} failed at {', '.join(failed)}"
+                + (f"; not run: {', '.join(not_run)}" if not_run else ""),
+                failed,
+            )
+
+        print(f"Pipeline {self.name} run {run_id} completed ({len(order) - len(skipped)} stage(s) run).")
+        return {
+            name: outputs[name] if name in outputs else self._load_checkpoint(run_id, completed[name]["checkpoint"])
+            for name in order
+            if not dependents[name] and (name in outputs or completed.get(name, {}).get("checkpoint"))
+        }
@@ -0,0 +1,114 @@
+# --------------------
+# Import Statements
+# --------------------
+import os
+import signal
+import time
+from datetime import timedelta
+import requests
+import schedule
+from assets.landing_zone import new_run_id
+from connectors.pool import pool_metrics
+from pipelines.profiling import StageProfiler
+from pipelines.trading_calendar import TradingCalendar
+
+
+# --------------------
+# Market Scheduler
+# --------------------
+class MarketScheduler:
+    """
+    Resident scheduler that calls `job(reason)` on trading-calendar triggers.
+    - "post-close": once per trading day, `post_close_delay` after the session close
+      (weekends and exchange holidays never fire)
+    - "intraday": every `intraday_minutes` while the session is open, if set
+    Jobs run one at a time on the scheduler thread, so a slow run delays the next trigger instead of overlapping it.
+    A failed job is reported and the daemon keeps running.
+    """
+
+    def __init__(self, job, calendar: TradingCalendar, post_close_delay: timedelta = timedelta(minutes=30),
+                 intraday_minutes: int = None, poll_seconds: int = 30, scheduler: schedule.Scheduler = None):
+        self.job = job
+        self.calendar = calendar
+        self.post_close_delay = post_close_delay
+        self.poll_seconds = poll_seconds
+        self.scheduler = scheduler or schedule.Scheduler()
+        self.stopped = False
+        self.next_post_close = calendar.next_close(calendar.now(), post_close_delay)
+
+        # schedule has no timezone support here, so the close is checked against the exchange clock
+        self.scheduler.every(poll_seconds).seconds.do(self.check_post_close)
+        if intraday_minutes:
+            self.scheduler.every(intraday_minutes).minutes.do(self.refresh_intraday)
+
+    def trigger(self, reason: str) -> None:
+        start = time.perf_counter()
+        try:
+            self.job(reason)
+            print(f"Scheduled {reason} run completed in {time.perf_counter() - start:.1f}s.")
+        except Exception as e:
+            print(f"Scheduled {reason} run failed after {time.perf_counter() - start:.1f}s: {e}")
+
+    def check_post_close(self) -> None:
+        now = self.calendar.now()
+        if now < self.next_post_close:
+            return
+        self.trigger("post-close")
+        self.next_post_close = self.calendar.next_close(self.calendar.now(), self.post_close_delay)
+        print(f"Next post-close run at {self.next_post_close.isoformat()}.")
+
+    def refresh_intraday(self) -> None:
+        if self.calendar.is_open(self.calendar.now()):
+            self.trigger("intraday")
+
+    def stop(self, *_) -> None:
+        self.stopped = True
+
+    def run_forever(self) -> None:
+        """
+        Runs pending jobs until stop() (also installed for SIGTERM and SIGINT, as sent by ECS and Ctrl-C).
+        """
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        print(f"Scheduler started; next post-close run at {self.next_post_close.isoformat()}.")
+        while not self.stopped:
+            self.scheduler.run_pending()
+            idle_seconds = self.scheduler.idle_seconds
+            time.sleep(min(max(idle_seconds or 0, 0.1), 1.0))
+        print("Scheduler stopped.")
+
+# --------------------
+# Run Scheduler Daemon
+# --------------------
+if __name__ == "__main__":
+    # Importing the pipeline reads and validates its environment once, for the life of the process
+    import pipelines.stocks as stocks
+    from connectors.db_connector import get_engine
+    from connectors.run_ledger import RunLedger
+
+    post_close_delay = timedelta(minutes=float(os.getenv('SCHEDULER_POST_CLOSE_DELAY_MINUTES', 30)))
+    intraday_minutes = int(os.getenv('SCHEDULER_INTRADAY_MINUTES', 0)) or None
+    run_on_start = os.getenv('SCHEDULER_RUN_ON_START', 'false').lower() in ('1', 'true', 'yes')
+
+    # Warm for every run: one pooled engine and one keep-alive HTTP session
+    engine = get_engine(stocks.db_user, stocks.db_password, stocks.db_server_name, stocks.db_database_name)
+    session = requests.Session()
+    ledger = RunLedger.from_env()
+
+    def run_pipeline(reason):
+        run_id = new_run_id()
+        print(f"Starting {reason} run {run_id}.")
+        profiler = StageProfiler.from_env(run_id)
+        stocks.build_pipeline(engine, run_id, session=session, ledger=ledger, profiler=profiler).run(run_id, trigger=reason)
+        print(f"Connection pool: {pool_metrics(engine)}")
+
+    scheduler = MarketScheduler(
+        run_pipeline, TradingCalendar.from_env(), post_close_delay=post_close_delay, intraday_minutes=intraday_minutes
+    )
+    try:
+        if run_on_start:
+            scheduler.trigger("startup")
+        scheduler.run_forever()
+    finally:
+        if ledger is not None:
+            ledger.close()
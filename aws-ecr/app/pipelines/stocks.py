@@ -2,10 +2,24 @@
 # Import Statements
 # --------------------
 from dotenv import load_dotenv
+import argparse
 import os
 import pandas as pd
-from assets.extract_transform import extract_stock_data, transform_data
-from connectors.db_connector import get_engine, load_data
+from assets.extract_transform import (
+    DEFAULT_SYMBOLS, extract_stock_data_incremental, extract_stock_data_paginated, transform_data_compact
+)
+from assets.async_extract import extract_stock_data_concurrent
+from assets.rate_limit import RateLimiter
+from assets.response_cache import ResponseCache
+from assets.landing_zone import LandingZone, new_run_id
+from connectors.pool import pool_metrics
+from connectors.schema import create_stocks_table, get_table_key
+from connectors.db_connector import (
+    LoadResult, get_engine, get_high_watermarks, load_data, load_data_copy, load_data_parallel, load_data_transactional
+)
+from connectors.run_ledger import RunLedger
+from pipelines.profiling import PROFILE_MODES, StageProfiler
+from pipelines.runner import Pipeline, Stage, stage_metrics
 
 # --------------------
 # Load Environment Variables
@@ -18,23 +32,197 @@ db_password = os.getenv('DB_PASSWORD')
 db_server_name = os.getenv('DB_SERVER_NAME')
 db_database_name = os.getenv('DB_DATABASE_NAME')
 
-if not all([api_key, db_user, db_password, db_server_name, db_database_name]):
+# Incremental mode only requests the bars after each symbol's max(date) in the target table
+incremental = os.getenv('INCREMENTAL', 'false').lower() in ('1', 'true', 'yes')
+incremental_overlap_days = int(os.getenv('INCREMENTAL_OVERLAP_DAYS', 3))
+
+# Async extraction fans out per symbol and page over one shared connection pool
+async_extract = os.getenv('ASYNC_EXTRACT', 'false').lower() in ('1', 'true', 'yes')
+extract_concurrency = int(os.getenv('EXTRACT_CONCURRENCY', 8))
+
+# Columnar decoding keeps only the fields transform_data uses, in typed column buffers
+columnar_decode = os.getenv('COLUMNAR_DECODE', 'false').lower() in ('1', 'true', 'yes')
+
+# Load method: "upsert" (multi-VALUES INSERT ... ON CONFLICT), "copy" (COPY into staging, then merge)
+# "transactional" (array-bound batches in one transaction, or committed every LOAD_COMMIT_EVERY batches)
+# or "parallel" (one transaction per symbol, spread over LOAD_WORKERS pooled connections)
+load_method = os.getenv('LOAD_METHOD', 'upsert').lower()
+load_commit_every = int(os.getenv('LOAD_COMMIT_EVERY', 0)) or None
+load_workers = int(os.getenv('LOAD_WORKERS', 4))
+
+# Create the stocks table range-partitioned on date ("month" or "year") on first run;
+# existing tables are migrated with `python -m connectors.schema migrate`
+table_partition_by = os.getenv('STOCKS_PARTITION_BY') or None
+
+# Key of a newly created stocks table: "unique_id" (symbol_YYYY-MM-DD string) or "natural" (symbol, date)
+table_key = os.getenv('STOCKS_KEY', 'unique_id').lower()
+
+# Optional on-disk response cache (RESPONSE_CACHE_DIR), replayable with RESPONSE_CACHE_REPLAY_ONLY=true
+response_cache = ResponseCache.from_env()
+
+# Optional Parquet landing zone (LANDING_ZONE_DIR) for raw and transformed data.
+# LOAD_FROM_LANDING_ZONE=<run id|latest> skips extract and transform and loads a landed run
+landing_zone = LandingZone.from_env()
+load_from_landing_zone = os.getenv('LOAD_FROM_LANDING_ZONE')
+
+# Comma-separated tickers, extracted and transformed as EXTRACT_GROUPS independent groups
+symbols = os.getenv('MARKETSTACK_SYMBOLS', DEFAULT_SYMBOLS)
+extract_groups = max(1, int(os.getenv('EXTRACT_GROUPS', 1)))
+extract_retries = int(os.getenv('EXTRACT_RETRIES', 2))
+
+# Stages run on PIPELINE_WORKERS threads; TRANSFORM_EXECUTOR=process moves transforms to a process pool.
+# With PIPELINE_WORK_DIR set, stage outputs are checkpointed and PIPELINE_RUN_ID=<run id|latest> resumes a run
+pipeline_work_dir = os.getenv('PIPELINE_WORK_DIR')
+pipeline_run_id = os.getenv('PIPELINE_RUN_ID')
+pipeline_workers = int(os.getenv('PIPELINE_WORKERS', 4))
+transform_executor = os.getenv('TRANSFORM_EXECUTOR', 'thread').lower()
+
+if load_from_landing_zone and landing_zone is None:
+    raise ValueError("LOAD_FROM_LANDING_ZONE requires LANDING_ZONE_DIR.")
+
+if not all([api_key or load_from_landing_zone, db_user, db_password, db_server_name, db_database_name]):
     raise ValueError("One or more required environment variables are missing.")
 
 # --------------------
-# Create Database Connection
+# Pipeline Stages
 # --------------------
-engine = get_engine(db_user, db_password, db_server_name, db_database_name)
+def prepare_table(engine):
+    """
+    Creates the stocks table when a layout is configured. Returns its key ("unique_id" or "natural").
+    """
+    if table_partition_by or table_key != 'unique_id':
+        create_stocks_table(engine, partition_by=table_partition_by, key=table_key)
+    return get_table_key(engine) or 'unique_id'
+
+
+def extract(symbol_group, watermarks=None, session=None, rate_limiter=None):
+    """
+    Extracts one comma-separated symbol group from MarketStack.
+    A requests `session` passed in is reused (kept-alive connections); the async path opens its own.
+    Groups share the request budget of `rate_limiter`; the group's own API calls are reported as stage metrics.
+    """
+    rate_limiter = rate_limiter.shared() if rate_limiter is not None else RateLimiter.from_env()
+    options = dict(symbols=symbol_group, response_cache=response_cache, columnar=columnar_decode, rate_limiter=rate_limiter)
+    try:
+        if async_extract:
+            return extract_stock_data_concurrent(
+                api_key, watermarks=watermarks, overlap_days=incremental_overlap_days, concurrency=extract_concurrency, **options
+            )
+        if incremental:
+            return extract_stock_data_incremental(
+                api_key, watermarks, overlap_days=incremental_overlap_days, session=session, timings=stage_metrics(), **options
+            )
+        return extract_stock_data_paginated(api_key, session=session, timings=stage_metrics(), **options)
+    finally:
+        stage_metrics().update(
+            api_calls=rate_limiter.calls, http_retries=rate_limiter.retries, bytes_received=rate_limiter.bytes_received
+        )
+
+
+def transform(df, key):
+    # unique_id is only built when the target table still has that column
+    return transform_data_compact(df, include_unique_id=key != 'natural')
+
+
+def land(run_id, frames):
+    """
+    Lands the raw and transformed frames of a run; `frames` alternates raw and transformed per group.
+    """
+    raw = pd.concat(frames[0::2], ignore_index=True)
+    transformed = pd.concat(frames[1::2], ignore_index=True)
+    if not transformed.empty:
+        landing_zone.write(raw, 'raw', run_id)
+        landing_zone.write(transformed, 'transformed', run_id)
+
+
+def load(engine, df_stocks_selected):
+    if load_method == 'copy':
+        result = load_data_copy(df_stocks_selected, engine)
+    elif load_method == 'transactional':
+        result = load_data_transactional(df_stocks_selected, engine, commit_every=load_commit_every)
+    elif load_method == 'parallel':
+        result = load_data_parallel(df_stocks_selected, engine, workers=load_workers)
+    else:
+        result = load_data(df_stocks_selected, engine)
+
+    if isinstance(result, LoadResult):
+        stage_metrics().update(
+            rows_loaded=result.rows,
+            load_inserted=result.inserted,
+            load_updated=result.updated,
+            load_unchanged=result.unchanged,
+        )
+    return result
+
+
+def build_pipeline(engine, run_id, session=None, ledger=None, profiler=None):
+    """
+    prepare -> [watermarks] -> extract:N -> transform:N -> [land], load
+    Symbol groups are independent branches, so their extracts and transforms overlap.
+    """
+    pipeline = Pipeline(
+        'stocks', work_dir=pipeline_work_dir, max_workers=pipeline_workers, ledger=ledger, profiler=profiler
+    )
+    rate_limiter = RateLimiter.from_env()
+    pipeline.add(Stage('prepare', lambda: prepare_table(engine), checkpoint=None))
+
+    if load_from_landing_zone:
+        landed_run_id = None if load_from_landing_zone == 'latest' else load_from_landing_zone
+        pipeline.add(Stage('read_landing_zone', lambda: landing_zone.read('transformed', landed_run_id)))
+        pipeline.add(Stage('load', lambda df, key: load(engine, df), depends_on=['read_landing_zone', 'prepare'], checkpoint=None))
+        return pipeline
+
+    extract_depends_on = []
+    if incremental:
+        pipeline.add(Stage('watermarks', lambda key: get_high_watermarks(engine), depends_on=['prepare']))
+        extract_depends_on = ['watermarks']
+
+    symbol_list = symbols.split(',')
+    groups = [','.join(symbol_list[i::extract_groups]) for i in range(min(extract_groups, len(symbol_list)))]
+    transformed = []
+    for i, symbol_group in enumerate(groups):
+        pipeline.add(Stage(
+            f'extract:{i}', lambda *watermarks, group=symbol_group: extract(group, *watermarks, session=session, rate_limiter=rate_limiter),
+            depends_on=extract_depends_on, retries=extract_retries, retry_delay=5.0,
+        ))
+        pipeline.add(Stage(f'transform:{i}', transform, depends_on=[f'extract:{i}', 'prepare'], executor=transform_executor))
+        transformed.append(f'transform:{i}')
+
+    if landing_zone is not None:
+        landed = [name for i in range(len(groups)) for name in (f'extract:{i}', f'transform:{i}')]
+        pipeline.add(Stage('land', lambda *frames: land(run_id, frames), depends_on=landed, checkpoint=None))
+
+    pipeline.add(Stage(
+        'load', lambda *frames: load(engine, pd.concat(frames, ignore_index=True)), depends_on=transformed, checkpoint=None
+    ))
+    return pipeline
 
 # --------------------
 # Run ETL Pipeline
 # --------------------
 if __name__ == "__main__":
-    # Extract Data
-    df = extract_stock_data(api_key)
+    parser = argparse.ArgumentParser(description="Run the stocks ETL pipeline.")
+    parser.add_argument("--profile", help=f"Profile every stage: comma-separated {PROFILE_MODES} or 'all' (overrides PROFILE)")
+    parser.add_argument("--profile-dir", help="Root of the per-run profile artifacts (overrides PROFILE_DIR)")
+    args = parser.parse_args()
+
+    # Shared, pooled engine (see connectors.pool); created here rather than at import time
+    engine = get_engine(db_user, db_password, db_server_name, db_database_name)
+
+    # Run ids double as landing zone run ids; PIPELINE_RUN_ID=latest resumes the most recent run
+    run_id = pipeline_run_id
+    if run_id == 'latest':
+        run_id = Pipeline('stocks', work_dir=pipeline_work_dir).latest_run() if pipeline_work_dir else None
+    run_id = run_id or new_run_id()
 
-    # Transform Data
-    df_stocks_selected = transform_data(df)
+    # Run and stage metrics go to the logging database (LOGGING_*) when it is configured
+    ledger = RunLedger.from_env()
+    try:
+        # Opt-in stage profiling (PROFILE / --profile), written to {PROFILE_DIR}/{run_id}/
+        profiler = StageProfiler.from_env(run_id, modes=args.profile, profile_dir=args.profile_dir)
+        build_pipeline(engine, run_id, ledger=ledger, profiler=profiler).run(run_id)
+    finally:
+        if ledger is not None:
+            ledger.close()
 
-    # Load Data into Database
-    load_data(df_stocks_selected, engine)
+    print(f"Connection pool: {pool_metrics(engine)}")
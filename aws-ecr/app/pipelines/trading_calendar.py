@@ -0,0 +1,140 @@
+# --------------------
+# Import Statements
+# --------------------
+import os
+from datetime import date, time, timedelta
+from functools import lru_cache
+import pandas as pd
+
+# US equities (NYSE/Nasdaq) regular session
+DEFAULT_TIMEZONE = "America/New_York"
+DEFAULT_OPEN = "09:30"
+DEFAULT_CLOSE = "16:00"
+
+
+def easter(year: int) -> date:
+    """
+    Gregorian Easter Sunday (anonymous Gregorian algorithm).
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    day = (h + l - 7 * m + 33 * month + 19) % 32
+    return date(year, month, day)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """
+    The n-th `weekday` (Monday=0) of a month; n=-1 is the last one.
+    """
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def observed(day: date) -> date:
+    """
+    Saturday holidays are observed on Friday, Sunday holidays on Monday.
+    """
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def exchange_holidays(year: int) -> frozenset:
+    """
+    Full-day NYSE holidays of a year, by the exchange's standing rules.
+    One-off closures (national days of mourning, weather) are not rule-based; pass them as extra holidays.
+    """
+    holidays = {
+        nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        easter(year) - timedelta(days=2),  # Good Friday
+        nth_weekday(year, 5, 0, -1),  # Memorial Day
+        observed(date(year, 7, 4)),  # Independence Day
+        nth_weekday(year, 9, 0, 1),  # Labor Day
+        nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        observed(date(year, 12, 25)),  # Christmas
+    }
+    # New Year's Day on a Saturday is not moved back into the previous year
+    if date(year, 1, 1).weekday() != 5:
+        holidays.add(observed(date(year, 1, 1)))
+    if year >= 2022:
+        holidays.add(observed(date(year, 6, 19)))  # Juneteenth
+    return frozenset(holidays)
+
+# --------------------
+# Trading Calendar
+# --------------------
+class TradingCalendar:
+    """
+    Trading days and session times of an exchange.
+    - Weekends and exchange_holidays() are closed, plus any `extra_holidays`
+    - Session times are wall-clock times in the exchange timezone, so triggers follow DST
+    """
+
+    def __init__(self, timezone: str = DEFAULT_TIMEZONE, open_time: str = DEFAULT_OPEN,
+                 close_time: str = DEFAULT_CLOSE, extra_holidays: list = ()):
+        self.timezone = timezone
+        self.open_time = time.fromisoformat(open_time)
+        self.close_time = time.fromisoformat(close_time)
+        self.extra_holidays = {pd.Timestamp(day).date() for day in extra_holidays}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Reads MARKET_TIMEZONE, MARKET_OPEN, MARKET_CLOSE (HH:MM) and MARKET_HOLIDAYS (comma-separated dates).
+        """
+        extra_holidays = os.getenv("MARKET_HOLIDAYS")
+        return cls(
+            timezone=os.getenv("MARKET_TIMEZONE", DEFAULT_TIMEZONE),
+            open_time=os.getenv("MARKET_OPEN", DEFAULT_OPEN),
+            close_time=os.getenv("MARKET_CLOSE", DEFAULT_CLOSE),
+            extra_holidays=extra_holidays.split(",") if extra_holidays else (),
+        )
+
+    def now(self) -> pd.Timestamp:
+        return pd.Timestamp.now(tz=self.timezone)
+
+    def is_trading_day(self, day) -> bool:
+        day = pd.Timestamp(day).date()
+        return day.weekday() < 5 and day not in exchange_holidays(day.year) and day not in self.extra_holidays
+
+    def session_open(self, day) -> pd.Timestamp:
+        return pd.Timestamp.combine(pd.Timestamp(day).date(), self.open_time).tz_localize(self.timezone)
+
+    def session_close(self, day) -> pd.Timestamp:
+        return pd.Timestamp.combine(pd.Timestamp(day).date(), self.close_time).tz_localize(self.timezone)
+
+    def is_open(self, moment) -> bool:
+        """
+        True during the regular session of a trading day.
+        """
+        moment = pd.Timestamp(moment).tz_convert(self.timezone)
+        day = moment.date()
+        return self.is_trading_day(day) and self.session_open(day) <= moment < self.session_close(day)
+
+    def next_close(self, moment, delay: timedelta = timedelta(0)) -> pd.Timestamp:
+        """
+        Returns the first session close + `delay` strictly after `moment`.
+        """
+        moment = pd.Timestamp(moment).tz_convert(self.timezone)
+        day = moment.date()
+        while True:
+            if self.is_trading_day(day):
+                trigger = self.session_close(day) + delay
+                if trigger > moment:
+                    return trigger
+            day += timedelta(days=1)
+